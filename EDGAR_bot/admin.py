@@ -1,6 +1,6 @@
 # EDGAR_bot/admin.py
 from django.contrib import admin
-from .models import ProcessedFiling, ProcessedFile, Watchlist
+from .models import BackfillFiling, ProcessedFiling, ProcessedFile, Watchlist, XbrlFact
 
 
 @admin.register(ProcessedFiling)
@@ -44,4 +44,28 @@ class WatchlistAdmin(admin.ModelAdmin):
     list_display = ['ticker', 'earnings_date', 'is_active', 'cik']
     list_filter = ['is_active', 'earnings_date']
     search_fields = ['ticker']
-    list_editable = ['is_active']
\ No newline at end of file
+    list_editable = ['is_active']
+
+
+@admin.register(BackfillFiling)
+class BackfillFilingAdmin(admin.ModelAdmin):
+    """
+    Historical filings planned by `edgar_backfill` and their progress.
+    """
+    date_hierarchy = "filing_date"
+    list_display   = ("ticker", "form", "accession", "filing_date", "status", "attempts", "updated_at")
+    list_filter    = ("status", "form")
+    search_fields  = ("ticker", "cik", "accession")
+    ordering       = ("-filing_date",)
+
+
+@admin.register(XbrlFact)
+class XbrlFactAdmin(admin.ModelAdmin):
+    """
+    XBRL facts synced from SEC companyfacts by `edgar_xbrl_sync`.
+    """
+    date_hierarchy = "period_end"
+    list_display   = ("ticker", "concept", "unit", "period_start", "period_end", "value", "fp", "form", "filed")
+    list_filter    = ("fp", "form")
+    search_fields  = ("ticker", "cik", "concept", "accession")
+    ordering       = ("ticker", "concept", "-period_end")
@@ -0,0 +1,261 @@
+"""
+Resumable historical backfill (`manage.py edgar_backfill`).
+
+Two phases, both checkpointed in the DB so the command can be stopped
+(Ctrl‑C / SIGTERM) and re‑run with the same arguments:
+
+1. plan – per CIK, walk the submission history (`filings.recent` plus the
+   paginated `filings.files` pages overlapping the range) and insert one
+   BackfillFiling row per wanted filing. A BackfillCursor marks the CIK as
+   planned for (since, until); a resumed run skips CIKs whose cursors
+   already cover the range and only walks the days after the newest cursor
+   otherwise – `until` defaults to today, so a run resumed a day later
+   re‑walks one day, not the whole history.
+2. run  – pending / failed rows, newest first, are downloaded with bounded
+   parallelism, marked processed and queued for OpenAI ingestion exactly like
+   live filings; each row is flipped to done / skipped / failed as it ends.
+
+Budget: the backfill runs in its own process capped at
+BACKFILL_MAX_REQUESTS_PER_SECOND and reserves every request on the shared
+SEC limiter clock (rate_limiter.throttle_background), so live + backfill
+stays within SEC's per‑host budget. By default both phases sleep through
+scheduler_v2's earnings windows, so the live poller keeps the
+latency‑critical budget.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import signal
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from asgiref.sync import sync_to_async
+
+from EDGAR_bot.core import config, edgar_client, ticker_map
+from EDGAR_bot.core.ingest_queue import INGEST_QUEUE
+from EDGAR_bot.core.rate_limiter import throttle_background
+from EDGAR_bot.core.scheduler_v2 import is_earnings_period
+from EDGAR_bot.core.state import StateDB
+from EDGAR_bot.core.targets import TARGETS
+from EDGAR_bot.models import BackfillCursor, BackfillFiling
+
+LOGGER = logging.getLogger("backfill")
+
+Status = BackfillFiling.Status
+
+
+# ───────────────────────────── targets ────────────────────────────────
+def _resolve(tickers: Iterable[str] | None) -> List[tuple[str, str]]:
+    """(ticker, cik) pairs – explicit tickers via the SEC map, else the CSV universe."""
+    if not tickers:
+        return list(TARGETS.get_sync(False).work)
+
+    sec_map = ticker_map.build_ticker_to_cik_map()
+    pairs, missing = [], []
+    for t in dict.fromkeys(t.strip().upper() for t in tickers if t.strip()):
+        if t in sec_map:
+            pairs.append((t, sec_map[t]))
+        else:
+            missing.append(t)
+    if missing:
+        LOGGER.warning("Ticker(s) not found in SEC map and will be skipped: %s", ", ".join(missing))
+    return pairs
+
+
+# ───────────────────────────── plan ───────────────────────────────────
+def _save_plan(ticker: str, cik: str, since, until, rows: List[Dict]) -> None:
+    BackfillFiling.objects.bulk_create(
+        [
+            BackfillFiling(
+                cik=cik, ticker=ticker, accession=r["accession"], form=r["form"],
+                filing_date=r["filing_date"], primary_doc=r["primary_doc"],
+            )
+            for r in rows
+        ],
+        ignore_conflicts=True,              # overlapping ranges / re‑plans
+    )
+    BackfillCursor.objects.get_or_create(
+        cik=cik, since=since, until=until, defaults={"filings": len(rows)}
+    )
+
+
+async def plan(
+    work: List[tuple[str, str]],
+    since: datetime.date,
+    until: datetime.date,
+    forms: set[str],
+    workers: int,
+    stop: asyncio.Event,
+) -> int:
+    # newest planned day per CIK among cursors that start on/before *since*
+    covered: Dict[str, datetime.date] = {}
+    for cik, planned_until in await sync_to_async(
+        lambda: list(BackfillCursor.objects.filter(since__lte=since).values_list("cik", "until"))
+    )():
+        covered[cik] = max(planned_until, covered.get(cik, planned_until))
+
+    todo = [
+        (t, cik, covered[cik] + datetime.timedelta(days=1) if cik in covered else since)
+        for t, cik in work
+        if covered.get(cik, datetime.date.min) < until
+    ]
+    LOGGER.info("Planning %d CIK(s) (%d already planned for %s..%s, %d partially)",
+                len(todo), len(work) - len(todo), since, until,
+                sum(cik in covered for _, cik, _ in todo))
+
+    sem   = asyncio.Semaphore(workers)
+    total = 0
+
+    async def _one(ticker: str, cik: str, start: datetime.date) -> None:
+        nonlocal total
+        async with sem:
+            await _wait_outside_earnings(stop)
+            if stop.is_set():
+                return
+            try:
+                rows = await edgar_client.list_filing_history(cik, start, until)
+            except Exception as exc:
+                LOGGER.error("History walk failed for %s (%s): %s", ticker, cik, exc)
+                return
+            rows = [r for r in rows if r["form"] in forms]
+            await sync_to_async(_save_plan)(ticker, cik, since, until, rows)
+            total += len(rows)
+            LOGGER.info("Planned %d filing(s) for %s", len(rows), ticker)
+
+    await asyncio.gather(*(_one(t, cik, start) for t, cik, start in todo))
+    return total
+
+
+# ───────────────────────────── run ────────────────────────────────────
+async def _wait_outside_earnings(stop: asyncio.Event) -> None:
+    if not config.BACKFILL_PAUSE_IN_EARNINGS or not is_earnings_period():
+        return
+    LOGGER.info("Earnings window - backfill paused")
+    while is_earnings_period() and not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), 60)
+        except asyncio.TimeoutError:
+            pass
+    LOGGER.info("Earnings window over - backfill resumed")
+
+
+def _pending(ciks: set[str], since, until, forms: set[str]) -> List[BackfillFiling]:
+    return list(
+        BackfillFiling.objects.filter(
+            cik__in=ciks,
+            filing_date__range=(since, until),
+            form__in=forms,
+            status__in=(Status.PENDING, Status.FAILED),
+            attempts__lt=config.BACKFILL_MAX_ATTEMPTS,
+        ).order_by("-filing_date")
+    )
+
+
+def _checkpoint(pk: int, status: str, attempts: int) -> None:
+    BackfillFiling.objects.filter(pk=pk).update(status=status, attempts=attempts)
+
+
+async def _process(state: StateDB, task: BackfillFiling) -> str:
+    if await state.seen(task.cik, task.accession):
+        return Status.SKIPPED                        # the live poller (or a past run) got it
+
+    row = {
+        "accession": task.accession, "form": task.form, "filing_date": task.filing_date,
+        "primary_doc": task.primary_doc, "ticker": task.ticker,
+    }
+    paths = await edgar_client.download_filing(task.cik, row, Path(config.DATA_DIR))
+    if not paths:
+        # the 8-K gate marks non-earnings 8-Ks processed; anything else is a failure
+        return Status.SKIPPED if await state.seen(task.cik, task.accession) else Status.FAILED
+
+    await state.mark_processed(task.cik, task.ticker, task.accession, task.filing_date)
+    await INGEST_QUEUE.submit(task.ticker, task.accession, paths, task.form, filing_date=task.filing_date)
+    return Status.DONE
+
+
+async def run(tasks: List[BackfillFiling], workers: int, stop: asyncio.Event) -> Dict[str, int]:
+    queue: asyncio.Queue[BackfillFiling] = asyncio.Queue()
+    for t in tasks:
+        queue.put_nowait(t)
+
+    state  = StateDB()
+    counts = {s: 0 for s in Status.values}
+
+    async def _worker() -> None:
+        while not stop.is_set():
+            try:
+                task = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await _wait_outside_earnings(stop)
+            if stop.is_set():
+                return
+            try:
+                status = await _process(state, task)
+            except Exception as exc:
+                LOGGER.error("Backfill of %s (%s) failed: %s", task.accession, task.ticker, exc)
+                status = Status.FAILED
+            await sync_to_async(_checkpoint)(task.pk, status, task.attempts + 1)
+            counts[status] += 1
+            done = sum(counts.values())
+            if done % 50 == 0:
+                LOGGER.info("Backfill progress: %d/%d %s", done, len(tasks), counts)
+
+    await asyncio.gather(*(_worker() for _ in range(workers)))
+    state.close()
+    return counts
+
+
+# ───────────────────────────── entry point ────────────────────────────
+async def _main(
+    tickers: Iterable[str] | None,
+    since: datetime.date,
+    until: datetime.date,
+    forms: set[str],
+    workers: int,
+    plan_only: bool,
+) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, AttributeError):
+            pass
+
+    try:
+        work = await sync_to_async(_resolve)(tickers)
+        await plan(work, since, until, forms, workers, stop)
+        if plan_only or stop.is_set():
+            return
+
+        tasks = await sync_to_async(_pending)({cik for _, cik in work}, since, until, forms)
+        LOGGER.info("Backfilling %d filing(s) with %d worker(s)", len(tasks), workers)
+        counts = await run(tasks, workers, stop)
+        LOGGER.info("Backfill %s: %s", "interrupted" if stop.is_set() else "finished", counts)
+    finally:
+        await INGEST_QUEUE.drain(config.INGEST_DRAIN_TIMEOUT)
+        await edgar_client.aclose()
+        await asyncio.to_thread(StateDB.shutdown_pool)
+
+
+def main(
+    tickers: Iterable[str] | None = None,
+    since: datetime.date | None = None,
+    until: datetime.date | None = None,
+    forms: Iterable[str] | None = None,
+    workers: int | None = None,
+    rate: float | None = None,
+    plan_only: bool = False,
+) -> None:
+    throttle_background(rate or config.BACKFILL_MAX_REQUESTS_PER_SECOND, explicit=rate is not None)
+    asyncio.run(_main(
+        tickers,
+        since or config.START_DATE,
+        until or datetime.date.today(),
+        set(forms) if forms else set(config.ALLOWED_FORMS),
+        workers or config.BACKFILL_CONCURRENCY,
+        plan_only,
+    ))
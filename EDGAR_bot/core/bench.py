@@ -0,0 +1,241 @@
+"""
+Offline throughput benchmark for the EDGAR pipeline (`manage.py edgar_bench`).
+
+For each universe size it starts a fresh replay.ReplayServer, points
+edgar_client, the storage sink, the submissions cache, the ticker map and
+the OpenAI client at it / at a temp dir, seeds StockTicker + KnowledgeBase
+rows in a throw‑away test database, then times one `jobs_v2.run_once`
+followed by a full ingest‑queue drain.
+
+Reported per size:
+    filings/s        filings processed end to end per wall second
+    SEC req/s        stub SEC requests per wall second (429s included)
+    DB q/filing      ORM queries (every thread) per processed filing
+    detect p95       acceptance → primary document first served
+
+Nothing here touches sec.gov, OpenAI or the real database.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+from asgiref.sync import sync_to_async
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+
+from EDGAR_bot.core import config, edgar_client, jobs_v2, storage, ticker_map
+from EDGAR_bot.core.ingest_queue import INGEST_QUEUE
+from EDGAR_bot.core.rate_limiter import SEC_LIMITER
+from EDGAR_bot.core.replay import Fixture, ReplayServer, ReplayState
+from EDGAR_bot.core.state import StateDB
+from EDGAR_bot.core.submissions_cache import SubmissionsCache
+
+LOGGER = logging.getLogger("bench")
+
+DEFAULT_SIZES = (100, 1_000, 5_000)
+_BENCH_GROUP  = 990_001                      # vector_group_id of the bench KnowledgeBase
+
+
+@dataclass
+class BenchResult:
+    tickers:       int
+    filings:       int
+    seconds:       float
+    sec_requests:  int
+    throttled:     int
+    db_queries:    int
+    detect_p95:    float | None
+
+    @property
+    def filings_per_sec(self) -> float:
+        return self.filings / self.seconds if self.seconds else 0.0
+
+    @property
+    def sec_rps(self) -> float:
+        return self.sec_requests / self.seconds if self.seconds else 0.0
+
+    @property
+    def queries_per_filing(self) -> float:
+        return self.db_queries / self.filings if self.filings else float(self.db_queries)
+
+    def row(self) -> str:
+        p95 = "-" if self.detect_p95 is None else f"{self.detect_p95:.2f}s"
+        return (
+            f"{self.tickers:>7} {self.filings:>8} {self.seconds:>8.1f}s "
+            f"{self.filings_per_sec:>10.1f} {self.sec_rps:>10.1f} {self.throttled:>6} "
+            f"{self.queries_per_filing:>12.1f} {p95:>11}"
+        )
+
+
+HEADER = (
+    f"{'tickers':>7} {'filings':>8} {'wall':>9} {'filings/s':>10} {'SEC req/s':>10} "
+    f"{'429s':>6} {'DB q/filing':>12} {'detect p95':>11}"
+)
+
+
+# ───────────────────────────── query counter ──────────────────────────
+class _QueryCounter:
+    def __init__(self) -> None:
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self, sender=None, connection=None, **_kw) -> None:
+        conn = connection if connection is not None else sender
+        if self not in conn.execute_wrappers:
+            conn.execute_wrappers.append(self)
+
+
+# ───────────────────────────── wiring ─────────────────────────────────
+def _redirect(base_url: str, tmp: Path) -> None:
+    """Point every external dependency of the pipeline at the stub / temp dir."""
+    edgar_client._SUBMISSIONS_URL = base_url + "/submissions/CIK{cik}.json"
+    edgar_client._ARCHIVES        = base_url + "/Archives/edgar/data/{cik}/{accession}/{doc}"
+    edgar_client._ARCH            = base_url + "/Archives/edgar/data"
+
+    config.DATA_DIR = tmp / "filings"
+    config.DATA_DIR.mkdir(parents=True, exist_ok=True)
+    storage._sink = storage.LocalSink()
+    (tmp / "submissions").mkdir(exist_ok=True)
+    edgar_client.SUBMISSIONS_CACHE = SubmissionsCache(tmp / "submissions")
+
+    os.environ.setdefault("OPENAI_API_KEY", "bench")        # ingest_openai builds a client at import
+    from openai import OpenAI
+    from EDGAR_bot.core import ingest_openai
+
+    ingest_openai.CLIENT = OpenAI(api_key="bench", base_url=base_url + "/v1")
+    ingest_openai.router = ingest_openai.CLIENT.vector_stores
+
+
+def _write_universe(tmp: Path, n: int) -> list[str]:
+    tickers = [f"B{i:05d}" for i in range(n)]
+    mapping = {t: f"{9_000_000_000 + i:010d}" for i, t in enumerate(tickers)}
+
+    config.TICKER_CSV = tmp / f"companies_{n}.csv"
+    config.TICKER_CSV.write_text("\n".join(tickers) + "\n")
+    ticker_map.CACHE_PATH = tmp / f"sec_ticker_map_{n}.json"
+    ticker_map.CACHE_PATH.write_text(json.dumps(mapping))
+    return tickers
+
+
+def _seed_db(tickers: List[str]) -> None:
+    from agents.models import KnowledgeBase, StockTicker
+    from EDGAR_bot.models import ProcessedFile, ProcessedFiling
+
+    ProcessedFiling.objects.all().delete()
+    ProcessedFile.objects.all().delete()
+    StockTicker.objects.filter(vector_id=_BENCH_GROUP).delete()
+    KnowledgeBase.objects.get_or_create(
+        vector_group_id=_BENCH_GROUP,
+        defaults={"name": "edgar-bench", "display_name": "EDGAR bench", "vector_store_id": "vs_bench"},
+    )
+    StockTicker.objects.bulk_create(
+        StockTicker(
+            main_ticker=t, full_ticker=f"{t} US", company_name=t,
+            industry="Bench", sub_industry="Bench", vector_id=_BENCH_GROUP,
+        )
+        for t in tickers
+    )
+
+
+# ───────────────────────────── benchmark ──────────────────────────────
+async def _bench_one(n: int, fixture: Fixture, tmp: Path, counter: _QueryCounter,
+                     latency: float, jitter: float, p429: float, retry_after: float,
+                     warm_index: bool) -> BenchResult:
+    tickers = _write_universe(tmp, n)
+    await sync_to_async(_seed_db)(tickers)
+
+    state  = ReplayState(fixture, latency, jitter, p429, retry_after)
+    server = ReplayServer(state).start()
+    _redirect(server.base_url, tmp)
+
+    StateDB._index = None
+    if warm_index:
+        await StateDB.warm_index()
+
+    try:
+        q0 = counter.count
+        t0 = time.perf_counter()
+        await jobs_v2.run_once(is_earnings_period=False, discovery=False, adaptive=False)
+        await INGEST_QUEUE.drain(None, final=False)
+        seconds = time.perf_counter() - t0
+        queries = counter.count - q0
+    finally:
+        server.stop()
+
+    from EDGAR_bot.models import ProcessedFiling
+    filings = await ProcessedFiling.objects.acount()
+
+    published = state.published_at.timestamp()
+    lat = sorted(t - published for t in state.detected.values())
+    p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))] if lat else None
+
+    sec = sum(v for k, v in state.requests.items() if k != "openai")
+    return BenchResult(n, filings, seconds, sec, state.throttled, queries, p95)
+
+
+async def _bench_all(sizes, fixture, tmp, counter, **kw) -> list[BenchResult]:
+    results = []
+    try:
+        for n in sizes:
+            LOGGER.info("Benchmarking %d tickers...", n)
+            results.append(await _bench_one(n, fixture, tmp, counter, **kw))
+            LOGGER.info("%s\n%s", HEADER, results[-1].row())
+    finally:
+        await edgar_client.aclose()
+    return results
+
+
+def run_benchmark(
+    sizes=DEFAULT_SIZES,
+    fixtures: Path | None = None,
+    filings_per_ticker: int = 1,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    p429: float = 0.0,
+    retry_after: float = 0.0,
+    sec_rate: float = 1_000.0,
+    warm_index: bool = True,
+) -> list[BenchResult]:
+    """
+    Run the benchmark against a throw‑away test database and return one
+    BenchResult per size. *sec_rate* replaces the SEC limiter budget for the
+    run (the real 10 req/s would dominate and hide hot‑loop regressions).
+    """
+    fixture = Fixture.load(fixtures, filings_per_ticker) if fixtures else Fixture.builtin()
+
+    counter = _QueryCounter()
+    connection_created.connect(counter.install)
+    for conn in connections.all():
+        counter.install(conn)
+
+    old_rate, old_cap = SEC_LIMITER.rate, SEC_LIMITER.capacity
+    SEC_LIMITER.rate, SEC_LIMITER.capacity = float(sec_rate), max(1.0, sec_rate / 10)
+
+    old_db = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with tempfile.TemporaryDirectory(prefix="edgar-bench-") as tmp:
+            return asyncio.run(_bench_all(
+                sizes, fixture, Path(tmp), counter,
+                latency=latency, jitter=jitter, p429=p429,
+                retry_after=retry_after, warm_index=warm_index,
+            ))
+    finally:
+        StateDB.shutdown_pool()                  # pool threads hold test‑DB connections
+        connection.creation.destroy_test_db(old_db, verbosity=0)
+        connection_created.disconnect(counter.install)
+        SEC_LIMITER.rate, SEC_LIMITER.capacity = old_rate, old_cap
@@ -0,0 +1,115 @@
+"""
+Per‑ticker adaptive polling cadence (config.ADAPTIVE_POLLING).
+
+Instead of polling every target on the same interval, scheduler_v2 ticks
+every CADENCE_TICK_SECONDS and jobs_v2 only polls the tickers that are due:
+
+* reporting today / tomorrow (Watchlist.earnings_date)
+    → CADENCE_FAST_SECONDS inside an earnings window, CADENCE_NEAR_SECONDS outside
+* everyone else
+    → geometric back‑off from CADENCE_BASE_SECONDS (× CADENCE_BACKOFF per
+      empty poll) up to CADENCE_MAX_SECONDS; reset when a poll finds something
+* once the earnings 8‑K has been ingested
+    → CADENCE_MAX_SECONDS until the ticker's earnings_date moves on
+"""
+from __future__ import annotations
+
+import datetime
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping
+
+import pytz
+
+from EDGAR_bot.core import config
+
+LOGGER = logging.getLogger("cadence")
+
+EST = pytz.timezone("US/Eastern")
+
+
+@dataclass
+class _TickerState:
+    last_polled: float = float("-inf")                  # monotonic
+    backoff:     float = config.CADENCE_BASE_SECONDS
+    reported_on: datetime.date | None = None            # filing date of the ingested earnings 8‑K
+    earnings_date: datetime.date | None = None          # last Watchlist.earnings_date seen
+
+
+class Cadence:
+    def __init__(self) -> None:
+        self._state: Dict[str, _TickerState] = {}
+
+    def _get(self, ticker: str) -> _TickerState:
+        return self._state.setdefault(ticker, _TickerState())
+
+    def interval_for(
+        self,
+        ticker: str,
+        earnings_date: datetime.date | None,
+        today: datetime.date,
+        in_window: bool,
+    ) -> float:
+        """Seconds between polls for *ticker* right now."""
+        st = self._get(ticker)
+        st.earnings_date = earnings_date
+        if earnings_date is not None:
+            if st.reported_on and st.reported_on >= earnings_date - datetime.timedelta(days=1):
+                return config.CADENCE_MAX_SECONDS           # this quarter is already in
+            if 0 <= (earnings_date - today).days <= 1:
+                return config.CADENCE_FAST_SECONDS if in_window else config.CADENCE_NEAR_SECONDS
+        return st.backoff
+
+    def due(
+        self,
+        work: Iterable[tuple[str, str]],
+        earnings_dates: Mapping[str, datetime.date],
+        in_window: bool,
+    ) -> List[tuple[str, str]]:
+        """The (ticker, cik) entries whose interval has elapsed since their last poll."""
+        now   = time.monotonic()
+        today = datetime.datetime.now(EST).date()
+        return [
+            (t, cik) for t, cik in work
+            if now - self._get(t).last_polled
+            >= self.interval_for(t, earnings_dates.get(t), today, in_window)
+        ]
+
+    def record_poll(self, ticker: str, found_new: bool) -> None:
+        st = self._get(ticker)
+        st.last_polled = time.monotonic()
+        if found_new:
+            st.backoff = config.CADENCE_BASE_SECONDS
+        else:
+            st.backoff = min(config.CADENCE_MAX_SECONDS, st.backoff * config.CADENCE_BACKOFF)
+
+    def is_earnings_release(
+        self,
+        ticker: str,
+        form: str | None,
+        filing_date: datetime.date | None,
+        items: str | None = None,
+    ) -> bool:
+        """
+        True for the 8‑K announcing *ticker*'s results: Item 2.02 per the
+        submissions feed, or filed on/the day before its earnings_date. An
+        EX‑99 alone is not enough – investor decks and M&A releases match too.
+        """
+        if not (form and form.startswith("8-K")):
+            return False
+        if items and "2.02" in {i.strip() for i in items.split(",")}:
+            return True
+        earnings_date = self._get(ticker).earnings_date
+        return (
+            earnings_date is not None and filing_date is not None
+            and 0 <= (earnings_date - filing_date).days <= 1
+        )
+
+    def earnings_ingested(self, ticker: str, filing_date: datetime.date | None = None) -> None:
+        """Earnings 8‑K is in – slow this ticker down until its next earnings_date."""
+        self._get(ticker).reported_on = filing_date or datetime.datetime.now(EST).date()
+        LOGGER.info("Earnings 8-K ingested for %s - dropping to slow polling", ticker)
+
+
+CADENCE = Cadence()
@@ -30,9 +30,82 @@ HEADERS = {
 REQUEST_TIMEOUT = 30           # seconds
 REQUEST_RETRY_TOTAL = 5        # total attempts per request
 REQUEST_RETRY_BACKOFF = 1.0    # exponential‑backoff factor (1 → 1 s, 2 s, 4 s…)
-SLEEP_BETWEEN_CALLS = 0.15     # seconds; ~6–7 req/s aggregate across tasks
-MAX_CONCURRENT_TICKERS = 4     # async semaphore
+SEC_MAX_REQUESTS_PER_SECOND = float(os.getenv("EDGAR_SEC_RPS", "10"))  # SEC fair‑access budget per host
+MAX_CONCURRENT_TICKERS = 10    # async semaphore (the rate limiter is the real cap)
+MAX_CONCURRENT_EXHIBITS = 4    # per filing; still paced by the SEC limiter
+STATE_DB_THREADS = int(os.getenv("EDGAR_DB_THREADS", "4"))  # StateDB pool = DB connections held
 SCHEDULE_MINUTES       = 10          # run every 10 minutes
+DOWNLOAD_CHUNK_SIZE    = 64 * 1024   # bytes per streamed write
+ACCESSION_INDEX        = True        # keep processed accessions in memory (scheduler_v2)
+
+# ── Discovery mode (latest‑filings feed instead of per‑ticker polling) ────
+DISCOVERY_MODE = os.getenv("EDGAR_DISCOVERY", "0") == "1"
+DISCOVERY_FEED_FORMS = ("8-K", "10-K", "10-Q")   # one Atom request each (prefix match)
+DISCOVERY_FEED_COUNT = 100                       # newest N entries per feed request
+DISCOVERY_INDEX_LOOKBACK_DAYS = 3                # daily form.idx catch‑up window
+
+# ── Adaptive per‑ticker polling (cadence.py, poller.py, scheduler_v2) ─────
+POLLER_MODE          = os.getenv("EDGAR_POLLER", "interval")     # 'interval' | 'continuous' (opt-in)
+POLLER_REPORT_SECONDS = 60         # staleness summary in the log
+ADAPTIVE_POLLING     = os.getenv("EDGAR_ADAPTIVE", "0") == "1"  # interval mode only
+CADENCE_TICK_SECONDS = 10          # scheduler tick; each ticker is polled only when due
+CADENCE_FAST_SECONDS = 10          # reporting today/tomorrow, inside an earnings window
+CADENCE_NEAR_SECONDS = 60          # reporting today/tomorrow, outside the windows
+CADENCE_BASE_SECONDS = 120         # first back‑off step for everyone else
+CADENCE_BACKOFF      = 2.0         # × per poll that finds nothing new
+CADENCE_MAX_SECONDS  = 30 * 60     # slowest cadence (also once earnings are ingested)
+
+# ── Historical backfill (backfill.py, manage.py edgar_backfill) ──────────
+# Separate process, same budget: SEC's 10 req/s is per host. The backfill
+# caps itself at this rate *and* reserves every request on the shared
+# SEC_LIMITER_BACKEND clock, so the live poller (on the same clock) slows
+# down instead of the two adding up. With EDGAR_LIMITER=local there is no
+# shared clock, so the backfill / XBRL sync refuse to start unless given an
+# explicit --rate (after lowering EDGAR_SEC_RPS on the live dyno by as much).
+BACKFILL_MAX_REQUESTS_PER_SECOND = float(os.getenv("EDGAR_BACKFILL_RPS", "2"))
+BACKFILL_CONCURRENCY  = 4          # filings downloaded in parallel
+BACKFILL_MAX_ATTEMPTS = 3          # failed rows are retried on resume until this
+BACKFILL_PAUSE_IN_EARNINGS = True  # sleep through scheduler_v2's earnings windows
+
+# ── XBRL company facts (xbrl_facts.py, manage.py edgar_xbrl_sync) ────────
+# Only these concepts are stored (None = every fact SEC publishes, which is
+# tens of thousands of rows per large filer). Bare names mean "us-gaap:".
+XBRL_CONCEPTS: tuple[str, ...] | None = (
+    "Revenues",
+    "RevenueFromContractWithCustomerExcludingAssessedTax",
+    "CostOfRevenue",
+    "GrossProfit",
+    "OperatingExpenses",
+    "ResearchAndDevelopmentExpense",
+    "SellingGeneralAndAdministrativeExpense",
+    "OperatingIncomeLoss",
+    "NetIncomeLoss",
+    "EarningsPerShareBasic",
+    "EarningsPerShareDiluted",
+    "WeightedAverageNumberOfDilutedSharesOutstanding",
+    "NetCashProvidedByUsedInOperatingActivities",
+    "PaymentsToAcquirePropertyPlantAndEquipment",
+    "ShareBasedCompensation",
+    "CashAndCashEquivalentsAtCarryingValue",
+    "Assets",
+    "Liabilities",
+    "StockholdersEquity",
+    "LongTermDebt",
+    "dei:EntityCommonStockSharesOutstanding",
+)
+XBRL_SYNC_CONCURRENCY = 4          # CIKs fetched / upserted in parallel
+XBRL_MAX_REQUESTS_PER_SECOND = float(os.getenv("EDGAR_XBRL_RPS", "2"))   # shared budget, as the backfill
+
+# ── Sharded polling across worker dynos (sharding.py) ───────────────────
+# Each worker-edgar process owns a lease‑backed slice of SHARD_COUNT virtual
+# shards (hash of the CIK). SHARD_COUNT must be the same on every worker.
+SHARDING            = os.getenv("EDGAR_SHARDING", "0") == "1"
+SHARD_COUNT         = 64
+SHARD_LEASE_SECONDS = 60           # a dead worker's shards are re‑claimed after this
+WORKER_ID           = os.getenv("DYNO") or f"{os.uname().nodename}-{os.getpid()}"
+# SEC budget coordination: "local" (per process), "file" (fcntl lock, one
+# host) or "db" (row lock, every dyno). Sharded workers default to "db".
+SEC_LIMITER_BACKEND = os.getenv("EDGAR_LIMITER", "db" if SHARDING else "local")
 
 # ──────────────────────────── path handling ──────────────────────────────
 # This file lives at …/EDGAR_bot/core/config.py
@@ -58,8 +131,36 @@ else:
     for _p in (LOG_DIR, CACHE_DIR, DATA_DIR):
         _p.mkdir(exist_ok=True)
 
+# ─── Filing storage (see storage.py) ─────────────────────────────────────
+STORAGE_BACKEND     = os.getenv("EDGAR_STORAGE", "s3" if ENV == "heroku" else "local")
+S3_KEY_PREFIX       = "edgar-bot"
+S3_MULTIPART_CHUNK  = 8 * 1024 * 1024        # part size; S3 minimum is 5 MB
+S3_MAX_POOL_CONNECTIONS = 16
+LOCAL_WRITE_THROUGH = os.getenv("EDGAR_LOCAL_WRITE_THROUGH", "1") == "1"   # keep a local copy until ingested
+
+# ─── Metrics (metrics.py) ────────────────────────────────────────────────
+METRICS_FILE          = CACHE_DIR / "edgar_metrics.prom"   # Prometheus text, rewritten periodically
+METRICS_WRITE_SECONDS = 60
+METRICS_PORT          = int(os.getenv("EDGAR_METRICS_PORT", "0"))   # 0 = no HTTP endpoint
+
+# ─── Shared SEC limiter, file backend (rate_limiter.py) ──────────────────
+SEC_LIMITER_FILE = CACHE_DIR / "sec_limiter.clock"
+
+# ─── OpenAI ingestion ─────────────────────────────────────────────────────
+OPENAI_UPLOAD_CONCURRENCY = 4     # parallel file uploads per filing
+INGEST_WORKERS      = 4           # filings ingested concurrently (ingest_queue.py)
+INGEST_QUEUE_MAX    = 50          # queued filings before downloaders block
+# Heroku sends SIGKILL 30s after SIGTERM: running jobs/polls get SHUTDOWN_JOB_TIMEOUT
+# to finish, then queued ingestion gets INGEST_DRAIN_TIMEOUT – together < 30s.
+SHUTDOWN_JOB_TIMEOUT = 10         # seconds for in-flight run_once / polls on shutdown
+INGEST_DRAIN_TIMEOUT = 15         # seconds to finish queued ingestion on shutdown
+PERIODIC_EXTRACT    = True        # 10‑K/10‑Q primary doc → compact per‑Item markdown (report_extract.py)
+PERIODIC_SECTIONS: set[str] | None = None   # e.g. {"mdna", "risk_factors", "financial_statements"}; None = all
+
 # ─── Files used by the pipeline ──────────────────────────────────────────
 TICKER_CSV = resources.files("EDGAR_bot.data") / "companies.csv"
+TICKER_MAP_TTL_HOURS = 24      # refresh .cache/sec_ticker_map.json in the background after this
+TICKER_MAP_RETRY_MINUTES = 15  # after a failed background refresh, wait this long before retrying
 
 # ───────────────────────────── logging ───────────────────────────────────
 handlers: list[logging.Handler] = [logging.StreamHandler()]
@@ -72,6 +173,7 @@ logging.basicConfig(
     format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
     handlers=handlers,
 )
+logging.getLogger("httpx").setLevel(logging.WARNING)   # one INFO line per SEC request is noise
 
 # ────────────────────── filing‑type / exhibit filters ────────────────────
 ALLOWED_FORMS = {
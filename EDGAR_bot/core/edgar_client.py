@@ -5,23 +5,42 @@ Re‑written 2025‑07‑22
 
 from __future__ import annotations
 
-import logging, os, re, time, boto3, requests
-from datetime import datetime
+import asyncio, logging, re, time, httpx
+import xml.etree.ElementTree as ET
+from datetime import date, datetime
 from pathlib import Path
 from typing import Dict, List
 
-from requests.adapters import HTTPAdapter, Retry
-
 from EDGAR_bot.core import config
+from EDGAR_bot.core.metrics import METRICS
+from EDGAR_bot.core.rate_limiter import SEC_LIMITER
 from EDGAR_bot.core.state import StateDB
+from EDGAR_bot.core.storage import get_sink
+from EDGAR_bot.core.submissions_cache import SUBMISSIONS_CACHE
 from EDGAR_bot.core.utils import _as_date
 
 log = logging.getLogger("edgar_client")
 
 # ───────────────────────── constants ─────────────────────────
 _SUBMISSIONS_URL = "https://data.sec.gov/submissions/CIK{cik}.json"
+_SUBMISSIONS_PAGE_URL = "https://data.sec.gov/submissions/{name}"
+_COMPANY_FACTS_URL = "https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json"
 _ARCHIVES        = "https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/{doc}"
 _ARCH            = "https://www.sec.gov/Archives/edgar/data"
+_LATEST_FEED_URL = (
+    "https://www.sec.gov/cgi-bin/browse-edgar?action=getcurrent"
+    "&type={form}&company=&dateb=&owner=include&start=0&count={count}&output=atom"
+)
+_DAILY_INDEX_URL = "https://www.sec.gov/Archives/edgar/daily-index/{year}/QTR{qtr}/form.{ymd}.idx"
+
+_ATOM_NS   = {"a": "http://www.w3.org/2005/Atom"}
+_FEED_CIK  = re.compile(r"\((\d{10})\)")
+_FEED_ACC  = re.compile(r"accession-number=(\d{10}-\d{2}-\d{6})")
+_FEED_DATE = re.compile(r"Filed:</b>\s*(\d{4}-\d{2}-\d{2})")
+_IDX_LINE  = re.compile(
+    r"^(?P<form>\S.*?)\s{2,}.+?\s{2,}(?P<cik>\d+)\s+(?P<date>\d{8})\s+"
+    r"edgar/data/\d+/(?P<accession>\d{10}-\d{2}-\d{6})\.txt\s*$"
+)
 
 EARNINGS_PAT = re.compile(
     r"(?i)("
@@ -45,36 +64,140 @@ EX_RE = re.compile(r"(?i)ex(?:hibit)?\s*[-_\.]?\s*\d")
 ALLOWED_EXT = {".htm", ".html", ".txt", ".pdf"}
 
 # ─────────────────────── HTTP plumbing ───────────────────────
-def _build_session() -> requests.Session:
-    s = requests.Session()
-    retry = Retry(
-        total=config.REQUEST_RETRY_TOTAL,
-        backoff_factor=config.REQUEST_RETRY_BACKOFF,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET"],
-        respect_retry_after_header=True,
-    )
-    s.headers.update(config.HEADERS)
-    s.mount("https://", HTTPAdapter(max_retries=retry))
-    return s
+_RETRY_STATUS = {429, 500, 502, 503, 504}
 
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
 
-_session = _build_session()
 
+def _get_client() -> httpx.AsyncClient:
+    """
+    One pooled AsyncClient per event loop (httpx connections are bound to the
+    loop that opened them, so a fresh `asyncio.run()` gets a fresh client).
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop or _client.is_closed:
+        _client = httpx.AsyncClient(
+            headers=config.HEADERS,
+            timeout=config.REQUEST_TIMEOUT,
+            follow_redirects=True,
+        )
+        _client_loop = loop
+    return _client
+
+
+async def aclose() -> None:
+    """Close the pooled client (call on scheduler shutdown)."""
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client, _client_loop = None, None
+
+
+def _retry_delay(attempt: int, resp: httpx.Response | None) -> float:
+    if resp is not None:
+        retry_after = resp.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+    return config.REQUEST_RETRY_BACKOFF * (2 ** attempt)
+
+
+def _endpoint(url: str) -> str:
+    """Low‑cardinality metrics label for an SEC URL."""
+    if "/submissions/" in url:
+        return "submissions"
+    if "/api/xbrl/" in url:
+        return "company_facts"
+    if "browse-edgar" in url:
+        return "latest_feed"
+    if "/daily-index/" in url:
+        return "daily_index"
+    if url.endswith("/index.json"):
+        return "dir_listing"
+    if "/Archives/" in url:
+        return "document"
+    return "other"
+
+
+def _count(url: str, status: int | str) -> None:
+    ep = _endpoint(url)
+    METRICS.inc("edgar_sec_requests_total", endpoint=ep, status=str(status))
+    if status == 429:
+        METRICS.inc("edgar_sec_throttled_total", endpoint=ep)
+
+
+async def _safe_get(url: str, headers: Dict[str, str] | None = None) -> httpx.Response:
+    """
+    Rate‑limited GET with retry on 429/5xx and transport errors.
+    Every attempt (including retries) spends one token from SEC_LIMITER.
+    A 304 is returned as‑is (only possible when *headers* are conditional).
+    """
+    client = _get_client()
+    for attempt in range(config.REQUEST_RETRY_TOTAL):
+        await SEC_LIMITER.acquire()                 # global politeness budget
+        resp: httpx.Response | None = None
+        try:
+            resp = await client.get(url, headers=headers)
+        except httpx.TransportError as exc:
+            _count(url, "error")
+            if attempt == config.REQUEST_RETRY_TOTAL - 1:
+                raise
+            log.debug("Transport error on %s (%s) – retrying", url, exc)
+        else:
+            _count(url, resp.status_code)
+            if resp.status_code == 304:
+                return resp
+            if resp.status_code not in _RETRY_STATUS or attempt == config.REQUEST_RETRY_TOTAL - 1:
+                resp.raise_for_status()
+                return resp
+            log.debug("HTTP %d on %s – retrying", resp.status_code, url)
+        await asyncio.sleep(_retry_delay(attempt, resp))
+
+    raise RuntimeError(f"unreachable: retries exhausted for {url}")
 
-def _safe_get(url: str) -> requests.Response:
-    time.sleep(config.SLEEP_BETWEEN_CALLS)          # global politeness delay
-    r = _session.get(url, timeout=config.REQUEST_TIMEOUT)
-    r.raise_for_status()
-    return r
+
+async def _safe_download(url: str, dest: Path) -> Path:
+    """
+    Rate‑limited, retried GET streamed in DOWNLOAD_CHUNK_SIZE chunks into the
+    configured storage sink (local file and/or S3) – memory stays flat no
+    matter how large the document is. A failed attempt aborts its writer.
+    """
+    client = _get_client()
+    sink   = get_sink()
+    for attempt in range(config.REQUEST_RETRY_TOTAL):
+        await SEC_LIMITER.acquire()
+        retry_resp: httpx.Response | None = None
+        try:
+            async with client.stream("GET", url) as resp:
+                _count(url, resp.status_code)
+                if resp.status_code in _RETRY_STATUS and attempt < config.REQUEST_RETRY_TOTAL - 1:
+                    retry_resp = resp
+                else:
+                    resp.raise_for_status()
+                    async with sink.writer(dest) as w:
+                        async for chunk in resp.aiter_bytes(config.DOWNLOAD_CHUNK_SIZE):
+                            await w.write(chunk)
+                    return dest
+        except httpx.TransportError as exc:
+            _count(url, "error")
+            if attempt == config.REQUEST_RETRY_TOTAL - 1:
+                raise
+            log.debug("Transport error on %s (%s) – retrying", url, exc)
+        else:
+            log.debug("HTTP %d on %s – retrying", retry_resp.status_code, url)
+        await asyncio.sleep(_retry_delay(attempt, retry_resp))
+
+    raise RuntimeError(f"unreachable: retries exhausted for {url}")
 
 
 # ───────────────────────── utilities ─────────────────────────
-def _list_directory(cik: str, accession: str) -> List[Dict]:
+async def _list_directory(cik: str, accession: str) -> List[Dict]:
     cik_num          = int(cik.lstrip("0"))
     accession_nodash = accession.replace("-", "")
     url              = f"{_ARCH}/{cik_num}/{accession_nodash}/index.json"
-    return _safe_get(url).json()["directory"]["item"]
+    with METRICS.timer("edgar_stage_seconds", stage="dir_listing"):
+        return (await _safe_get(url)).json()["directory"]["item"]
 
 
 def _looks_like_earnings(text: str) -> bool:
@@ -90,29 +213,168 @@ def _dir_has_earnings(dir_items: List[Dict]) -> bool:
 
 
 # ────────────────────────── public API ───────────────────────
-def list_recent_filings(cik: str) -> List[Dict]:
-    data  = _safe_get(_SUBMISSIONS_URL.format(cik=cik)).json()
-    recent = data["filings"]["recent"]
-
-    rows = [
+def _parse_recent(recent: Dict) -> List[Dict]:
+    return [
         {
             "accession": acc,
             "form": form,
             "filing_date": datetime.strptime(fdate, "%Y-%m-%d").date(),
             "primary_doc": doc,
+            "accepted": accepted,            # acceptanceDateTime – start of the latency clock
+            "items": items,                  # 8‑K item numbers, e.g. "2.02,9.01"
         }
-        for acc, form, fdate, doc in zip(
+        for acc, form, fdate, doc, accepted, items in zip(
             recent["accessionNumber"],
             recent["form"],
             recent["filingDate"],
             recent["primaryDocument"],
+            recent.get("acceptanceDateTime") or [None] * len(recent["accessionNumber"]),
+            recent.get("items") or [""] * len(recent["accessionNumber"]),
         )
     ]
+
+
+async def list_recent_filings(cik: str) -> List[Dict]:
+    """
+    Recent filings for *cik* on/after START_DATE.
+    Revalidates against SUBMISSIONS_CACHE so an unchanged CIK costs one
+    304 round‑trip and no JSON parse.
+    """
+    cached = SUBMISSIONS_CACHE.get(cik)
+    with METRICS.timer("edgar_stage_seconds", stage="list"):
+        resp = await _safe_get(
+            _SUBMISSIONS_URL.format(cik=cik),
+            headers=cached.conditional_headers() if cached else None,
+        )
+
+    if resp.status_code == 304 and cached is not None:
+        log.debug("Submissions for %s not modified (cache hit)", cik)
+        rows = cached.copy_rows()
+    else:
+        rows = _parse_recent(resp.json()["filings"]["recent"])
+        SUBMISSIONS_CACHE.put(
+            cik,
+            resp.headers.get("ETag"),
+            resp.headers.get("Last-Modified"),
+            [dict(r) for r in rows],
+        )
+
     return [r for r in rows if r["filing_date"] >= config.START_DATE]
 
 
+async def list_filing_history(cik: str, since: date, until: date) -> List[Dict]:
+    """
+    Every filing for *cik* with since <= filing_date <= until: `filings.recent`
+    plus the paginated `filings.files` pages whose filingFrom/filingTo overlap
+    the range (pages for untouched years are never fetched). Used by the
+    backfill; bypasses SUBMISSIONS_CACHE, which only keeps `recent` rows.
+    """
+    filings = (await _safe_get(_SUBMISSIONS_URL.format(cik=cik))).json()["filings"]
+    rows    = _parse_recent(filings["recent"])
+
+    for page in filings.get("files", []):
+        if (
+            date.fromisoformat(page["filingTo"]) < since
+            or date.fromisoformat(page["filingFrom"]) > until
+        ):
+            continue
+        resp = await _safe_get(_SUBMISSIONS_PAGE_URL.format(name=page["name"]))
+        rows.extend(_parse_recent(resp.json()))
+
+    return [r for r in rows if since <= r["filing_date"] <= until]
+
+
+async def fetch_company_facts(
+    cik: str, etag: str | None = None, last_modified: str | None = None
+) -> tuple[Dict | None, str | None, str | None]:
+    """
+    XBRL companyfacts JSON for *cik*, conditional on the validators from the
+    previous fetch. Returns (facts, ETag, Last‑Modified); facts is None when
+    SEC answers 304 (unchanged) or 404 (CIK files no XBRL).
+    """
+    headers: Dict[str, str] = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    try:
+        with METRICS.timer("edgar_stage_seconds", stage="company_facts"):
+            resp = await _safe_get(_COMPANY_FACTS_URL.format(cik=cik), headers=headers or None)
+    except httpx.HTTPStatusError as exc:
+        if exc.response.status_code == 404:
+            return None, etag, last_modified
+        raise
+    if resp.status_code == 304:
+        return None, etag, last_modified
+    facts = await asyncio.to_thread(resp.json)         # multi‑MB for large filers
+    return facts, resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+
+
+def _parse_latest_feed(xml_text: str) -> List[Dict]:
+    rows: List[Dict] = []
+    for entry in ET.fromstring(xml_text).iterfind("a:entry", _ATOM_NS):
+        title   = entry.findtext("a:title", "", _ATOM_NS)
+        summary = entry.findtext("a:summary", "", _ATOM_NS)
+        m_acc   = _FEED_ACC.search(entry.findtext("a:id", "", _ATOM_NS))
+        m_cik   = _FEED_CIK.search(title)
+        cat     = entry.find("a:category", _ATOM_NS)
+        if not (m_acc and m_cik and cat is not None):
+            continue
+        m_date  = _FEED_DATE.search(summary)
+        fdate   = m_date.group(1) if m_date else entry.findtext("a:updated", "", _ATOM_NS)[:10]
+        rows.append({
+            "cik": m_cik.group(1),
+            "accession": m_acc.group(1),
+            "form": cat.get("term", ""),
+            "filing_date": datetime.strptime(fdate, "%Y-%m-%d").date(),
+        })
+    return rows
+
+
+async def list_latest_filings(forms: tuple[str, ...] = config.DISCOVERY_FEED_FORMS) -> List[Dict]:
+    """
+    Newest filings across *all* filers from EDGAR's "latest filings" Atom
+    feed – one request per form prefix. Rows carry cik/accession/form/
+    filing_date but no primary_doc (the feed does not expose it).
+    """
+    rows: List[Dict] = []
+    for form in forms:
+        url  = _LATEST_FEED_URL.format(form=form, count=config.DISCOVERY_FEED_COUNT)
+        rows.extend(_parse_latest_feed((await _safe_get(url)).text))
+    return rows
+
+
+async def list_daily_index(day: date) -> List[Dict] | None:
+    """
+    Rows from the daily form index for *day*, or None if SEC has not
+    published it yet (404 until the evening of that business day).
+    """
+    url = _DAILY_INDEX_URL.format(
+        year=day.year, qtr=(day.month - 1) // 3 + 1, ymd=day.strftime("%Y%m%d")
+    )
+    try:
+        text = (await _safe_get(url)).text
+    except httpx.HTTPStatusError as exc:
+        if exc.response.status_code in (403, 404):
+            return None
+        raise
+
+    rows: List[Dict] = []
+    for line in text.splitlines():
+        m = _IDX_LINE.match(line)
+        if m:
+            rows.append({
+                "cik": m["cik"].zfill(10),
+                "accession": m["accession"],
+                "form": m["form"].strip(),
+                "filing_date": datetime.strptime(m["date"], "%Y%m%d").date(),
+            })
+    return rows
+
+
 # ------------------------------------------------------------------
-def download_filing(cik: str, row: Dict, dest_root: Path) -> list[Path] | None:
+async def download_filing(cik: str, row: Dict, dest_root: Path) -> list[Path] | None:
     """
     Download the primary document and qualifying exhibits.
     Returns a list[Path] of saved files or None if skipped/failed.
@@ -120,15 +382,10 @@ def download_filing(cik: str, row: Dict, dest_root: Path) -> list[Path] | None:
     cik_str   = cik.lstrip("0")
     acc_clean = row["accession"].replace("-", "")
     dest_dir  = dest_root / cik_str / acc_clean
-    dest_dir.mkdir(parents=True, exist_ok=True)
-
-    if config.ENV == "heroku":
-        s3        = boto3.client("s3")
-        s3_bucket = os.environ["S3_BUCKET"]
 
     # 1. directory JSON --------------------------------------------------
     try:
-        dir_items = _list_directory(cik, row["accession"])
+        dir_items = await _list_directory(cik, row["accession"])
     except Exception as exc:
         log.error("Dir‑listing failed for %s: %s", row["accession"], exc)
         return None
@@ -137,41 +394,27 @@ def download_filing(cik: str, row: Dict, dest_root: Path) -> list[Path] | None:
     if row["form"].startswith("8-K") and not _dir_has_earnings(dir_items):
         log.info("Skip 8‑K (no earnings exhibit) %s", row["accession"])
 
-        # --- Mark it as processed, regardless of the execution context ----
-        async def _mark():
-            await StateDB().mark_processed(
-                cik,
-                row.get("ticker", ""),
-                row["accession"],
-                _as_date(row["filing_date"]),
-            )
-
-        try:
-            import asyncio
-            loop = asyncio.get_running_loop()  # ← we’re inside an async task
-            loop.create_task(_mark())  # fire‑and‑forget, non‑blocking
-        except RuntimeError:
-            # no running loop (download_filing called from sync code) ─ use sync bridge
-            from asgiref.sync import async_to_sync
-            async_to_sync(_mark)()  # runs the coroutine in a thread
-
+        await StateDB().mark_processed(
+            cik,
+            row.get("ticker", ""),
+            row["accession"],
+            _as_date(row["filing_date"]),
+        )
         return None
 
     # 2. primary ---------------------------------------------------------
+    started     = time.monotonic()
     primary_url = _ARCHIVES.format(cik=cik_str, accession=acc_clean, doc=row["primary_doc"])
     try:
-        out_path = dest_dir / row["primary_doc"]
-        out_path.write_bytes(_safe_get(primary_url).content)
+        out_path = await _safe_download(primary_url, dest_dir / row["primary_doc"])
     except Exception as exc:
         log.error("Primary download failed for %s: %s", row["accession"], exc)
         return None
 
-    if config.ENV == "heroku":
-        s3.upload_file(str(out_path), s3_bucket, f"edgar-bot/{cik_str}/{acc_clean}/{out_path.name}")
-
     saved: list[Path] = [out_path]
 
     # 3. exhibits --------------------------------------------------------
+    wanted: list[str] = []
     for item in dir_items:
         name = item["name"]
         ext  = Path(name).suffix.lower()
@@ -192,24 +435,26 @@ def download_filing(cik: str, row: Dict, dest_root: Path) -> list[Path] | None:
             if not (t.upper().startswith("EX") or desc.upper().startswith("EX") or EX_RE.search(name)):
                 continue
 
-        # 3‑C) download
-        ex_path = dest_dir / name
-        if ex_path.exists():
+        if (dest_dir / name).exists():
             continue  # already present (resume run)
-
-        try:
-            ex_url = f"{_ARCH}/{cik_str}/{acc_clean}/{name}"
-            ex_resp = _safe_get(ex_url)
-            ex_path.write_bytes(ex_resp.content)
-            saved.append(ex_path)
-            log.info("Saved exhibit %s", ex_path)
-
-            if config.ENV == "heroku":
-                ex_key = f"edgar-bot/{cik_str}/{acc_clean}/{name}"
-                s3.upload_file(str(ex_path), s3_bucket, ex_key)
-                log.info("Uploaded exhibit to s3://%s/%s", s3_bucket, ex_key)
-
-        except Exception as exc:
-            log.warning("Failed exhibit %s: %s", name, exc)
-
+        wanted.append(name)
+
+    # 3‑C) download – bounded per filing, paced globally by SEC_LIMITER
+    sem = asyncio.Semaphore(config.MAX_CONCURRENT_EXHIBITS)
+
+    async def _fetch_exhibit(name: str) -> Path | None:
+        async with sem:
+            try:
+                ex_url  = f"{_ARCH}/{cik_str}/{acc_clean}/{name}"
+                ex_path = await _safe_download(ex_url, dest_dir / name)
+                log.info("Saved exhibit %s", ex_path)
+                return ex_path
+            except Exception as exc:
+                log.warning("Failed exhibit %s: %s", name, exc)
+                return None
+
+    results = await asyncio.gather(*(_fetch_exhibit(n) for n in wanted))
+    saved.extend(p for p in results if p is not None)
+
+    METRICS.observe("edgar_stage_seconds", time.monotonic() - started, stage="download")
     return saved if saved else None
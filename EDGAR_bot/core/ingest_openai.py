@@ -6,7 +6,7 @@ linked to the ticker.
 """
 
 from __future__ import annotations
-import asyncio, logging, os, pathlib
+import asyncio, hashlib, logging, os, pathlib
 import openai
 from openai import OpenAI
 from asgiref.sync import sync_to_async
@@ -18,9 +18,10 @@ if not django.apps.apps.ready:
     django.setup()
 
 from agents.models import StockTicker, KnowledgeBase
-from EDGAR_bot.core import utils                       # normalise_for_openai
+from EDGAR_bot.core import config, report_extract, utils   # normalise_for_openai
+from EDGAR_bot.core.metrics import METRICS
 from EDGAR_bot.core.state import StateDB
-from EDGAR_bot.models import ProcessedFile
+from EDGAR_bot.core.storage import get_sink
 
 # ── globals ─────────────────────────────────────────────────────────────────
 log       = logging.getLogger("edgar_ingest")
@@ -30,145 +31,247 @@ router    = getattr(CLIENT, "vector_stores", None) or getattr(getattr(CLIENT, "b
 if router is None:
     raise RuntimeError(f"OpenAI SDK {openai.__version__} lacks vector‑store API")
 
+_PERIODIC_FORMS = {"10-K", "10-K/A", "10-Q", "10-Q/A"}
+_HASH_CHUNK     = 1 << 20             # bytes per read in _content_hash
+
 # ── helpers ────────────────────────────────────────────────────────────────
-async def _vector_store_has_file(store_id: str, vector_group_id: int, accession: str, identifier: str) -> bool:
-    """identifier may be file_id *or* filename"""
-    loop = asyncio.get_running_loop()
+# `known` is the ProcessedFile snapshot for one accession, prefetched once per
+# ingest(): {(filename, vector_group_id): file_id}. New rows are collected in
+# `new_rows` and written with a single bulk_create at the end.
+#
+# Content dedupe: every upload candidate is hashed (`_content_hash`) and the
+# hash looked up in ProcessedFile. The same press release under an 8‑K and
+# its 8‑K/A, or an exhibit re‑filed verbatim, reuses the existing file_id –
+# attached by reference to stores that lack it, skipped where it already is.
+# `by_hash` collects {sha: {vector_group_id: file_id}} for those hashes – the
+# same content may live under a different file_id in each store.
 
-    def _blocking() -> bool:
-        exists = ProcessedFile.objects.filter(filename=identifier, accession=accession, vector_group_id=vector_group_id).exists()
+def _content_hash(path: pathlib.Path) -> str:
+    """
+    Streaming SHA‑256 of *path* with line endings and runs of whitespace
+    collapsed, so re‑filed copies that differ only in formatting still match.
+
+    Reads fixed-size chunks (single-line HTML/XBRL can be many MB) and
+    carries the line / word state across chunk boundaries, so the digest is
+    identical to hashing `b" ".join(line.split()) + b"\n"` per non-blank line.
+    """
+    h = hashlib.sha256()
+    line_words = False          # a word was hashed on the current line
+    in_word    = False          # the previous chunk ended inside a word
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK), b""):
+            for k, piece in enumerate(chunk.split(b"\n")):
+                if k:                                   # a newline precedes this piece
+                    if line_words:
+                        h.update(b"\n")
+                    line_words = in_word = False
+                if not piece:
+                    continue
+                words = piece.split()
+                if words and in_word and not piece[:1].isspace():
+                    h.update(words.pop(0))              # word split across chunks
+                if words:
+                    if line_words:
+                        h.update(b" ")
+                    h.update(b" ".join(words))
+                    line_words = True
+                in_word = not piece[-1:].isspace()
+    if line_words:
+        h.update(b"\n")
+    return h.hexdigest()
 
-        if exists:
-            log.debug("File already exists in ProcessedFile (skipping OpenAI API check)")
-            return True
-        else:
-            return False
 
-        # page = router.files.list(vector_store_id=store_id)
-        # while True:
-        #     for obj in page.data:
-        #         if hasattr(obj, "file_id") and obj.file_id == identifier:
-        #             return True
-        #         if hasattr(obj, "filename") and obj.filename == identifier:
-        #             return True
-        #         if hasattr(obj, "file_id"):
-        #             meta = CLIENT.files.retrieve(obj.file_id)
-        #             if meta.filename == identifier:
-        #                 return True
-        #     if page.has_next_page():
-        #         page = page.get_next_page()
-        #     else:
-        #         break
-
-    return await loop.run_in_executor(None, _blocking)
-
-
-async def _get_or_upload_file(path: pathlib.Path, accession: str) -> str:
-    """Return OpenAI *file_id* for *path*, uploading if necessary."""
+async def _get_or_upload_file(
+    path: pathlib.Path,
+    known: dict[tuple[str, int], str],
+    sha: str,
+    by_hash: dict[str, dict[int, str]],
+) -> str:
+    """Return OpenAI *file_id* for *path*, uploading only unseen content."""
+    for (fname, _gid), fid in known.items():
+        if fname == path.name:
+            log.debug("Found file %s in ProcessedFile table with id %s", path.name, fid)
+            return fid
+
+    by_group = await STATE.files_for_hashes([sha])
+    if sha in by_group:
+        by_hash[sha] = by_group[sha]
+        fid = next(iter(by_group[sha].values()))    # for stores without it; each store keeps its own
+        METRICS.inc("edgar_upload_dedup_total")
+        log.info("Reusing %s for %s (identical content already uploaded)", fid, path.name)
+        return fid
+
     loop = asyncio.get_running_loop()
 
     def _blocking() -> str:
-        # Check ProcessedFile table first
-        pf = ProcessedFile.objects.filter(filename=path.name, accession=accession).first()
-        if pf:
-            log.debug("Found file %s in ProcessedFile table with id %s", path.name, pf.file_id)
-            return pf.file_id
-
-        # search by filename
-        # page = CLIENT.files.list(purpose="assistants")
-        # while True:
-        #     for f in page.data:
-        #         if f.filename == path.name:
-        #             return f.id
-        #     if page.has_next_page():
-        #         page = page.get_next_page()
-        #     else:
-        #         break
-
         # upload once
         with path.open("rb") as fh:
             f = CLIENT.files.create(file=fh, purpose="assistants")
             return f.id
 
-    return await loop.run_in_executor(None, _blocking)
+    with METRICS.timer("edgar_stage_seconds", stage="upload"):
+        return await loop.run_in_executor(None, _blocking)
 
 
-async def _attach_file_to_store(store_id: str, vector_group_id: int, accession: str, file_id: str, filename: str) -> None:
-    if await _vector_store_has_file(store_id, vector_group_id, accession, file_id) or await _vector_store_has_file(store_id, vector_group_id, accession, filename):
+async def _attach_files_for_store(
+    store_id: str,
+    vector_group_id: int,
+    file_map: dict[pathlib.Path, str],
+    known: dict[tuple[str, int], str],
+    hashes: dict[pathlib.Path, str],
+    by_hash: dict[str, dict[int, str]],
+    new_rows: list[tuple[str, str, str, str, int, str]],
+) -> None:
+    """Attach every not‑yet‑attached file of a filing with ONE file_batches call."""
+    attached_ids = {fid for (_fn, gid), fid in known.items() if gid == vector_group_id}
+    fresh = {
+        path: fid for path, fid in file_map.items()
+        if (path.name, vector_group_id) not in known and fid not in attached_ids
+    }
+    # identical content already in this store (via another accession), under
+    # this store's own file_id: record that id only
+    pending = {}
+    for path, fid in fresh.items():
+        own = by_hash.get(hashes.get(path, ""), {}).get(vector_group_id)
+        if own is None:
+            pending[path] = fid
+        else:
+            cik, accession, _ = path.parts[-3:]
+            new_rows.append((cik, accession, path.name, own, vector_group_id, hashes.get(path, "")))
+    if not pending:
         return
+
     loop = asyncio.get_running_loop()
-    await loop.run_in_executor(
-        None,
-        lambda: router.file_batches.create(vector_store_id=store_id, file_ids=[file_id]),
-    )
+    try:
+        with METRICS.timer("edgar_stage_seconds", stage="attach"):
+            await loop.run_in_executor(
+                None,
+                lambda: router.file_batches.create(
+                    vector_store_id=store_id,
+                    file_ids=list(dict.fromkeys(pending.values())),
+                ),
+            )
+    except Exception as exc:
+        log.warning("Attach failure %d file(s) → %s: %s", len(pending), store_id, exc)
+        return
+    log.info("Attached %s → %s", ", ".join(p.name for p in pending), store_id)
 
+    # ── remember in processed_files table (flushed by ingest) ──
+    for path, fid in pending.items():
+        cik, accession, _ = path.parts[-3:]
+        new_rows.append((cik, accession, path.name, fid, vector_group_id, hashes.get(path, "")))
 
-async def _attach_files_for_store(store_id: str, vector_group_id: int, file_map: dict[pathlib.Path, str],) -> None:
-    for path, fid in file_map.items():
-        try:
-            # ── NEW: remember in processed_files table ──
-            cik, accession, _ = path.parts[-3:]
 
-            await _attach_file_to_store(store_id, vector_group_id, accession, fid, path.name)
-            log.info("Attached %s → %s", path.name, store_id)
-
-            await STATE.add_file_id(
-                cik, accession, path.name, fid, vector_group_id
-            )
+# ── public coroutine ───────────────────────────────────────────────────────
+def _normalise(path: pathlib.Path, form: str | None, is_primary: bool) -> list[pathlib.Path]:
+    """Upload‑ready file(s) for *path*: per‑Item markdown for periodic reports."""
+    if (
+        config.PERIODIC_EXTRACT
+        and is_primary
+        and form in _PERIODIC_FORMS
+        and path.suffix.lower() in {".htm", ".html"}
+    ):
+        try:
+            return report_extract.extract_sections(path, form, config.PERIODIC_SECTIONS)
         except Exception as exc:
-            log.warning("Attach failure %s → %s: %s", path.name, store_id, exc)
+            log.warning("Section extraction failed for %s (%s) – uploading as‑is", path.name, exc)
+    return [utils.normalise_for_openai(path)]
 
 
-# ── public coroutine ───────────────────────────────────────────────────────
-async def ingest(ticker: str, accession: str, saved_paths: list[pathlib.Path]) -> None:
+async def ingest(
+    ticker: str,
+    accession: str,
+    saved_paths: list[pathlib.Path],
+    form: str | None = None,
+) -> bool:
+    """
+    *saved_paths* come from `download_filing` (primary document first);
+    *form* enables section extraction for 10‑K/10‑Q primaries.
+    Returns True if at least one file was newly attached to a vector store.
+    """
     if not saved_paths:
-        return
+        return False
+
+    sink = get_sink()
+    norm_paths: list[pathlib.Path] = []
+    try:
+        # vector_group_ids for this ticker
+        vec_ids = set(
+            await sync_to_async(
+                lambda: list(
+                    StockTicker.objects.filter(main_ticker__iexact=ticker)
+                    .values_list("vector_id", flat=True)
+                )
+            )()
+        )
+        if not vec_ids:
+            log.warning("Ticker %s not found in StockTicker", ticker)
+            return False
 
-    # vector_group_ids for this ticker
-    vec_ids = set(
-        await sync_to_async(
+        kb_rows = await sync_to_async(
             lambda: list(
-                StockTicker.objects.filter(main_ticker__iexact=ticker)
-                .values_list("vector_id", flat=True)
+                KnowledgeBase.objects.filter(
+                    vector_group_id__in = vec_ids, is_active = True
+                ).values_list("vector_store_id", "vector_group_id")
             )
         )()
-    )
-    if not vec_ids:
-        log.warning("Ticker %s not found in StockTicker", ticker)
-        return
+        store_to_group = {sid: gid for sid, gid in kb_rows}
+        store_ids = set(store_to_group)
 
-    kb_rows = await sync_to_async(
-        lambda: list(
-            KnowledgeBase.objects.filter(
-                vector_group_id__in = vec_ids, is_active = True
-            ).values_list("vector_store_id", "vector_group_id")
-        )
-    )()
-    store_to_group = {sid: gid for sid, gid in kb_rows}
-    store_ids = set(store_to_group)
+        if not store_ids:
+            log.warning("No active KnowledgeBase for %s (groups=%s)", ticker, sorted(vec_ids))
+            return False
 
-    if not store_ids:
-        log.warning("No active KnowledgeBase for %s (groups=%s)", ticker, sorted(vec_ids))
-        return
+        # Everything we already know about this accession – one query
+        acc_clean = accession.replace("-", "")
+        known     = await STATE.files_for_accession(acc_clean)
 
-    # Normalise & upload each exhibit exactly once (sequentially)
-    file_map: dict[pathlib.Path, str] = {}
-    for p in saved_paths:
-        norm = utils.normalise_for_openai(p)
-        try:
-            fid = await _get_or_upload_file(norm, accession.replace("-", ""))
-            file_map[norm] = fid             # Path → file_id
-        except Exception as exc:
-            log.warning("Upload failure %s: %s", norm.name, exc)
+        # Normalise & upload each exhibit exactly once (bounded concurrency)
+        sem = asyncio.Semaphore(config.OPENAI_UPLOAD_CONCURRENCY)
+        hashes:  dict[pathlib.Path, str]      = {}
+        by_hash: dict[str, dict[int, str]] = {}
 
-    if not file_map:
-        return
+        async def _upload(norm: pathlib.Path) -> tuple[pathlib.Path, str] | None:
+            async with sem:
+                try:
+                    hashes[norm] = await asyncio.to_thread(_content_hash, norm)
+                    return norm, await _get_or_upload_file(norm, known, hashes[norm], by_hash)
+                except Exception as exc:
+                    log.warning("Upload failure %s: %s", norm.name, exc)
+                    return None
+
+        async def _prepare(i: int, p: pathlib.Path) -> list[tuple[pathlib.Path, str] | None]:
+            try:
+                local = await sink.ensure_local(p)
+                with METRICS.timer("edgar_stage_seconds", stage="normalise"):
+                    norms = await asyncio.to_thread(_normalise, local, form, i == 0)
+            except Exception as exc:
+                log.warning("Normalise failure %s: %s", p.name, exc)
+                return []
+            norm_paths.extend(norms)
+            return await asyncio.gather(*(_upload(n) for n in norms))
 
-    tasks = [
-        _attach_files_for_store(sid, store_to_group[sid], file_map)
-        for sid in store_ids
-    ]
-    await asyncio.gather(*tasks, return_exceptions=True)
+        results = await asyncio.gather(*(_prepare(i, p) for i, p in enumerate(saved_paths)))
+        file_map: dict[pathlib.Path, str] = dict(r for rs in results for r in rs if r)   # Path → file_id
+
+        if not file_map:
+            return False
+
+        new_rows: list[tuple[str, str, str, str, int, str]] = []
+        tasks = [
+            _attach_files_for_store(sid, store_to_group[sid], file_map, known, hashes, by_hash, new_rows)
+            for sid in store_ids
+        ]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            await STATE.add_file_ids(new_rows)
+        except Exception as exc:
+            log.warning("ProcessedFile bulk write failed for %s: %s", accession, exc)
+        return bool(new_rows)
+    finally:
+        # no‑op for LocalSink; on S3 the local copies are disposable once ingested
+        sink.release({*saved_paths, *norm_paths})
 
 import atexit
 atexit.register(STATE.close)
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""
+Bounded OpenAI‑ingestion queue for the EDGAR bot.
+
+Downloaders `await INGEST_QUEUE.submit(...)`; a fixed pool of workers runs
+`ingest_openai.ingest`. When OpenAI is slow the queue fills up and submit()
+blocks, which holds the ticker's semaphore slot and so throttles the
+downloader instead of piling up unbounded tasks. `drain()` is awaited on
+shutdown so filings already marked processed are not dropped; once draining
+has started, submit() raises IngestQueueClosed on that event loop rather
+than silently starting a fresh queue that nobody would drain.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import pathlib
+import time
+from dataclasses import dataclass, field
+
+from EDGAR_bot.core import config
+from EDGAR_bot.core.cadence import CADENCE
+from EDGAR_bot.core.metrics import METRICS, seconds_since
+
+log = logging.getLogger("ingest_queue")
+
+
+class IngestQueueClosed(RuntimeError):
+    """submit() after drain() started – callers must stop producing before draining."""
+
+
+@dataclass
+class _Job:
+    ticker:    str
+    accession: str
+    paths:     list[pathlib.Path]
+    form:      str | None = None
+    accepted:  str | None = None          # SEC acceptanceDateTime, for e2e latency
+    filing_date: datetime.date | None = None
+    items:     str | None = None          # 8‑K item numbers from the submissions feed
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class IngestQueue:
+    def __init__(self, workers: int, maxsize: int) -> None:
+        self.n_workers = workers
+        self.maxsize   = maxsize
+        self._queue: asyncio.Queue[_Job] | None = None
+        self._loop:  asyncio.AbstractEventLoop | None = None
+        self._workers: list[asyncio.Task] = []
+        self._closing  = False
+
+        # metrics
+        self.in_flight    = 0
+        self.done         = 0
+        self.failed       = 0
+        self.max_depth    = 0
+        self.blocked_secs = 0.0          # total time submit() spent waiting for room
+
+    # ─────────────────────────── lifecycle ────────────────────────────
+    def _ensure_started(self) -> asyncio.Queue[_Job]:
+        """(Re)create queue + workers on the running loop (asyncio.run gives a new one)."""
+        loop = asyncio.get_running_loop()
+        if self._closing and self._loop is loop:
+            raise IngestQueueClosed("ingest queue is draining / closed")
+        if self._queue is None or self._loop is not loop:
+            self._queue   = asyncio.Queue(maxsize=self.maxsize)
+            self._loop    = loop
+            self._closing = False
+            self._workers = [
+                loop.create_task(self._worker(i), name=f"ingest-worker-{i}")
+                for i in range(self.n_workers)
+            ]
+            log.info("Started %d ingest workers (queue max %d)", self.n_workers, self.maxsize)
+        return self._queue
+
+    async def _worker(self, idx: int) -> None:
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            self.in_flight += 1
+            try:
+                from EDGAR_bot.core import ingest_openai      # heavy import (OpenAI client)
+                attached = await ingest_openai.ingest(job.ticker, job.accession, job.paths, job.form)
+                self.done += 1
+                if attached:
+                    METRICS.inc("edgar_filings_total", outcome="attached", form=job.form or "")
+                    METRICS.observe("edgar_e2e_latency_seconds", seconds_since(job.accepted))
+                if attached and CADENCE.is_earnings_release(job.ticker, job.form, job.filing_date, job.items):
+                    CADENCE.earnings_ingested(job.ticker, job.filing_date)
+                log.debug(
+                    "Ingested %s (%s) after %.1fs in queue+worker",
+                    job.accession, job.ticker, time.monotonic() - job.queued_at,
+                )
+            except Exception:
+                self.failed += 1
+                METRICS.inc("edgar_filings_total", outcome="ingest_failed", form=job.form or "")
+                log.exception("Ingestion failed for %s (%s)", job.accession, job.ticker)
+            finally:
+                self.in_flight -= 1
+                queue.task_done()
+
+    # ─────────────────────────── public API ────────────────────────────
+    async def submit(
+        self,
+        ticker: str,
+        accession: str,
+        paths: list[pathlib.Path],
+        form: str | None = None,
+        accepted: str | None = None,
+        filing_date: datetime.date | None = None,
+        items: str | None = None,
+    ) -> None:
+        queue = self._ensure_started()          # raises IngestQueueClosed while draining
+        start = time.monotonic()
+        await queue.put(_Job(ticker, accession, paths, form, accepted, filing_date, items))   # blocks when full → backpressure
+        waited = time.monotonic() - start
+        if waited > 1.0:
+            log.info("Ingest queue full – downloader waited %.1fs for %s", waited, accession)
+        self.blocked_secs += waited
+        self.max_depth = max(self.max_depth, queue.qsize())
+
+    def stats(self) -> dict:
+        return {
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "in_flight": self.in_flight,
+            "done": self.done,
+            "failed": self.failed,
+            "max_depth": self.max_depth,
+            "blocked_secs": round(self.blocked_secs, 1),
+        }
+
+    async def drain(self, timeout: float | None = None, final: bool = True) -> bool:
+        """
+        Wait until every queued job has finished (or *timeout* expires), then
+        stop the workers. Returns False – and logs what was abandoned – on timeout.
+        A *final* drain leaves the queue closed on this loop; pass final=False
+        to reuse it afterwards (bench runs several rounds on one loop).
+        """
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            return True
+
+        self._closing = True
+        log.info("Draining ingest queue: %s", self.stats())
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+            drained = True
+        except asyncio.TimeoutError:
+            drained = False
+            left = []
+            while not self._queue.empty():
+                left.append(self._queue.get_nowait().accession)
+                self._queue.task_done()
+            log.error(
+                "Ingest drain timed out after %ss – %d in flight, not ingested: %s",
+                timeout, self.in_flight, ", ".join(left) or "-",
+            )
+
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._queue, self._workers = None, []
+        if not final:
+            self._loop, self._closing = None, False
+        return drained
+
+
+INGEST_QUEUE = IngestQueue(config.INGEST_WORKERS, config.INGEST_QUEUE_MAX)
@@ -32,7 +32,7 @@ async def _handle_ticker(
     async with sem:                                 # global concurrency cap
         # ── 1. recent SEC rows ──────────────────────────────────────────
         try:
-            api_rows: List[Dict] = edgar_client.list_recent_filings(cik)
+            api_rows: List[Dict] = await edgar_client.list_recent_filings(cik)
         except Exception as exc:                    # network / SEC error
             LOGGER.error("Submissions fetch failed for %s (%s): %s", ticker, cik, exc)
             return
@@ -68,7 +68,7 @@ async def _handle_ticker(
                 ticker,
             )
 
-            paths = edgar_client.download_filing(cik, r, Path(config.DATA_DIR))
+            paths = await edgar_client.download_filing(cik, r, Path(config.DATA_DIR))
             if not paths:
                 continue
 
@@ -5,17 +5,20 @@ Includes Watchlist support during earnings periods.
 from __future__ import annotations
 
 import asyncio
+import datetime
 import logging
+import time
 from pathlib import Path
 from typing import Dict, List
 
-from django.db import models
-from asgiref.sync import sync_to_async
-
-from EDGAR_bot.core import config, edgar_client, ticker_map
+from EDGAR_bot.core import config, edgar_client
+from EDGAR_bot.core.cadence import CADENCE
+from EDGAR_bot.core.ingest_queue import INGEST_QUEUE, IngestQueueClosed
+from EDGAR_bot.core.metrics import METRICS, seconds_since
+from EDGAR_bot.core.sharding import SHARDS
 from EDGAR_bot.core.state import StateDB
+from EDGAR_bot.core.targets import TARGETS
 from EDGAR_bot.core.utils import _as_date
-from EDGAR_bot.models import Watchlist
 
 LOGGER = logging.getLogger("jobs_v2")
 
@@ -26,6 +29,12 @@ async def _handle_ticker(
     ticker: str,
     cik: str,
 ) -> None:
+    """Process one ticker under the global concurrency cap."""
+    async with sem:
+        await poll_ticker(state, ticker, cik)
+
+
+async def poll_ticker(state: StateDB, ticker: str, cik: str) -> None:
     """
     Process one ticker (list → download → ingest).
 
@@ -33,93 +42,69 @@ async def _handle_ticker(
       so that `download_filing()` and the OpenAI ingestion pipeline never
       lose that context.
     """
-    async with sem:  # global concurrency cap
-        # ── 1. recent SEC rows ──────────────────────────────────────────
-        try:
-            api_rows: List[Dict] = edgar_client.list_recent_filings(cik)
-        except Exception as exc:  # network / SEC error
-            LOGGER.error("Submissions fetch failed for %s (%s): %s", ticker, cik, exc)
-            return
-
-        # ── 2. skip already-seen or disallowed rows ────────────────────
-        rows: list[dict] = []
-        for r in api_rows:
-            if r["form"] not in config.ALLOWED_FORMS:
-                continue
-            if _as_date(r["filing_date"]) < config.START_DATE:
-                continue
-            if await state.seen(cik, r["accession"]):
-                continue
-
-            r["ticker"] = ticker  # ←★ ALWAYS attach the ticker ★
-            rows.append(r)
-
-        LOGGER.info("Found %d new filings for %s (%s)", len(rows), ticker, cik)
-
-        # ── 3. download + ingest each remaining filing ─────────────────
-        for r in rows:
-            filing_date = _as_date(r["filing_date"])
-
-            # race-safe double-check
-            if filing_date < config.START_DATE or await state.seen(cik, r["accession"]):
-                continue
-
-            LOGGER.info(
-                "Downloading %s %s %s (%s)...",
-                r["filing_date"],
-                r["form"],
-                r["accession"],
-                ticker,
-            )
-
-            paths = edgar_client.download_filing(cik, r, Path(config.DATA_DIR))
-            if not paths:
-                continue
-
-            # mark immediately so retries don't re-download
-            await state.mark_processed(cik, ticker, r["accession"], filing_date)
-
-            # fire-and-forget OpenAI ingestion
-            from EDGAR_bot.core import ingest_openai
-            asyncio.create_task(ingest_openai.ingest(ticker, r["accession"], paths))
-
-
-@sync_to_async
-def get_watchlist_tickers_sync() -> List[str]:
-    """
-    Retrieve active tickers from the Watchlist model (synchronous version).
-
-    Returns:
-        List of ticker symbols from the watchlist, or empty list if none.
-    """
+    # ── 1. recent SEC rows ──────────────────────────────────────────
     try:
-        # Query active watchlist tickers
-        watchlist_tickers = list(
-            Watchlist.objects
-            .filter(is_active=True)
-            .values_list('ticker', flat=True)
-        )
-
-        if watchlist_tickers:
-            LOGGER.info("Found %d active tickers in Watchlist", len(watchlist_tickers))
-        else:
-            LOGGER.info("No active tickers found in Watchlist")
-
-        return [t.upper() for t in watchlist_tickers]
+        api_rows: List[Dict] = await edgar_client.list_recent_filings(cik)
+    except Exception as exc:  # network / SEC error
+        LOGGER.error("Submissions fetch failed for %s (%s): %s", ticker, cik, exc)
+        CADENCE.record_poll(ticker, found_new=False)
+        return
 
-    except Exception as e:
-        LOGGER.error("Error retrieving Watchlist tickers: %s", e)
-        return []
+    # ── 2. skip already-seen or disallowed rows ────────────────────
+    candidates = [
+        r for r in api_rows
+        if r["form"] in config.ALLOWED_FORMS
+        and _as_date(r["filing_date"]) >= config.START_DATE
+    ]
+    seen = await state.seen_many(cik, (r["accession"] for r in candidates))
+
+    rows: list[dict] = []
+    for r in candidates:
+        if r["accession"] in seen:
+            continue
+
+        r["ticker"] = ticker  # ←★ ALWAYS attach the ticker ★
+        rows.append(r)
+
+    LOGGER.info("Found %d new filings for %s (%s)", len(rows), ticker, cik)
+    CADENCE.record_poll(ticker, found_new=bool(rows))
+
+    # ── 3. download + ingest each remaining filing ─────────────────
+    for r in rows:
+        filing_date = _as_date(r["filing_date"])
+
+        # race-safe double-check
+        if filing_date < config.START_DATE or await state.seen(cik, r["accession"]):
+            continue
+
+        LOGGER.info(
+            "Downloading %s %s %s (%s)...",
+            r["filing_date"],
+            r["form"],
+            r["accession"],
+            ticker,
+        )
 
+        paths = await edgar_client.download_filing(cik, r, Path(config.DATA_DIR))
+        if not paths:
+            continue
 
-async def get_watchlist_tickers() -> List[str]:
-    """
-    Retrieve active tickers from the Watchlist model (async wrapper).
+        # mark immediately so retries don't re-download
+        await state.mark_processed(cik, ticker, r["accession"], filing_date)
+        METRICS.inc("edgar_filings_total", outcome="downloaded", form=r["form"])
+        METRICS.observe("edgar_detect_latency_seconds", seconds_since(r.get("accepted")))
 
-    Returns:
-        List of ticker symbols from the watchlist, or empty list if none.
-    """
-    return await get_watchlist_tickers_sync()
+        # bounded OpenAI ingestion – blocks here when the queue is full
+        try:
+            await INGEST_QUEUE.submit(
+                ticker, r["accession"], paths, r["form"], r.get("accepted"),
+                filing_date=filing_date, items=r.get("items"),
+            )
+        except IngestQueueClosed:
+            LOGGER.error("Shutting down - %s (%s) downloaded but NOT queued for ingestion",
+                         r["accession"], ticker)
+            return
+        METRICS.set("edgar_ingest_queue_depth", INGEST_QUEUE.stats()["depth"])
 
 
 async def load_target_tickers_with_watchlist(is_earnings_period: bool) -> List[str]:
@@ -127,96 +112,137 @@ async def load_target_tickers_with_watchlist(is_earnings_period: bool) -> List[s
     Load target tickers based on the current period.
 
     During earnings period:
-    - First check Watchlist for active tickers
+    - Active Watchlist tickers (in the CSV, or carrying their own CIK)
     - If Watchlist is empty, use full CSV list
 
     During cooldown period:
     - Always use full CSV list
 
+    Thin wrapper over `targets.TARGETS`, which only reloads the CSV /
+    Watchlist when they change; run_once uses the TargetSet directly.
+
     Args:
         is_earnings_period: Whether we're currently in an earnings period
 
     Returns:
         List of ticker symbols to process
     """
-    # Always load the full CSV list first
-    full_tickers = ticker_map.load_target_tickers(config.TICKER_CSV)
+    return sorted((await TARGETS.get(is_earnings_period)).tickers)
 
-    if not is_earnings_period:
-        # Cooldown period: use full CSV list
-        LOGGER.info("Cooldown period: using full CSV list (%d tickers)", len(full_tickers))
-        return full_tickers
-
-    # Earnings period: check Watchlist first
-    watchlist_tickers = await get_watchlist_tickers()
-
-    if watchlist_tickers:
-        # Filter to only include tickers that are in both Watchlist and CSV
-        # This ensures we have valid tickers with CIK mappings
-        valid_watchlist_tickers = [
-            t for t in watchlist_tickers
-            if t in full_tickers
-        ]
-
-        if valid_watchlist_tickers:
-            LOGGER.info(
-                "Earnings period: using Watchlist tickers (%d of %d are in CSV)",
-                len(valid_watchlist_tickers),
-                len(watchlist_tickers)
-            )
 
-            # Log any watchlist tickers not in CSV
-            invalid_tickers = set(watchlist_tickers) - set(valid_watchlist_tickers)
-            if invalid_tickers:
-                LOGGER.warning(
-                    "Watchlist tickers not found in CSV and will be skipped: %s",
-                    ", ".join(sorted(invalid_tickers))
-                )
+# ───────────────────────── discovery mode ─────────────────────────
+_INDEXED_DAYS: set[datetime.date] = set()     # daily indices already swept (immutable once published)
 
-            return valid_watchlist_tickers
-        else:
-            LOGGER.warning(
-                "No Watchlist tickers found in CSV, falling back to full list"
-            )
 
-    # No valid Watchlist tickers, use full CSV list
+async def _discover_ciks(state: StateDB, tracked: frozenset[str], is_earnings_period: bool) -> set[str]:
+    """
+    Return the tracked CIKs that have at least one unseen, allowed filing.
+
+    * Every cycle: the "latest filings" Atom feed (one request per form).
+    * Cooldown cycles only: the daily form indices for the look-back window,
+      to catch anything that scrolled off the feed between cycles.
+    """
+    try:
+        candidates = await edgar_client.list_latest_filings()
+    except Exception as exc:
+        LOGGER.error("Latest-filings feed failed: %s", exc)
+        candidates = []
+
+    if not is_earnings_period:
+        today = datetime.date.today()
+        for back in range(config.DISCOVERY_INDEX_LOOKBACK_DAYS + 1):
+            day = today - datetime.timedelta(days=back)
+            if day in _INDEXED_DAYS or day.weekday() >= 5:
+                continue
+            try:
+                idx_rows = await edgar_client.list_daily_index(day)
+            except Exception as exc:
+                LOGGER.error("Daily index %s failed: %s", day, exc)
+                continue
+            if idx_rows is None:
+                continue                      # not published yet – retry next cooldown cycle
+            candidates.extend(idx_rows)
+            if day < today:
+                _INDEXED_DAYS.add(day)
+
+    by_cik: Dict[str, set[str]] = {}
+    for r in candidates:
+        if r["cik"] not in tracked:
+            continue
+        if r["form"] not in config.ALLOWED_FORMS or r["filing_date"] < config.START_DATE:
+            continue
+        by_cik.setdefault(r["cik"], set()).add(r["accession"])
+
+    hits: set[str] = set()
+    for cik, accessions in by_cik.items():
+        if accessions - await state.seen_many(cik, accessions):
+            hits.add(cik)
+
     LOGGER.info(
-        "Earnings period: using full CSV list (%d tickers) - Watchlist empty or invalid",
-        len(full_tickers)
+        "Discovery: %d feed/index rows, %d tracked CIK(s) with new filings",
+        len(candidates),
+        len(hits),
     )
-    return full_tickers
+    return hits
 
 
-async def run_once(is_earnings_period: bool = False) -> None:
+async def run_once(
+    is_earnings_period: bool = False,
+    discovery: bool | None = None,
+    adaptive: bool | None = None,
+) -> None:
     """
     Run one cycle of the EDGAR bot with period-aware ticker selection.
 
-    * Build the SEC ticker-to-CIK map
-    * Load tickers based on current period (Watchlist for earnings, full CSV for cooldown)
+    * Get the cached (ticker, cik) work list for the current period
+      (Watchlist for earnings, full CSV for cooldown)
+    * In adaptive mode, take CSV + Watchlist and keep only the tickers
+      whose per-ticker cadence says they are due (see cadence.py)
+    * In discovery mode, narrow the work list to CIKs the EDGAR feed/index says changed
     * Open the StateDB
     * Drive concurrent processing with a semaphore
 
     Args:
         is_earnings_period: Whether we're currently in an earnings period
+        discovery: Use feed-driven discovery (defaults to config.DISCOVERY_MODE).
+            Discovery always watches the full CSV universe, since the feed
+            costs the same number of requests regardless of ticker count.
+        adaptive: Per-ticker cadence driven by Watchlist.earnings_date
+            (defaults to config.ADAPTIVE_POLLING).
     """
-    # Build the SEC map (always needed for CIK lookups)
-    sec_map: Dict[str, str] = ticker_map.build_ticker_to_cik_map()
+    if discovery is None:
+        discovery = config.DISCOVERY_MODE
+    if adaptive is None:
+        adaptive = config.ADAPTIVE_POLLING
 
-    # Load tickers based on current period (now async)
-    tickers: List[str] = await load_target_tickers_with_watchlist(is_earnings_period)
-
-    # Check for missing CIK mappings
-    missing = [t for t in tickers if t not in sec_map]
-    if missing:
-        LOGGER.warning("Ticker(s) not found in SEC map and will be skipped: %s", ", ".join(missing))
-
-    # Build work list of (ticker, cik) tuples
-    work = [(t, sec_map[t]) for t in tickers if t in sec_map]
+    # Cached target set – CSV/Watchlist/SEC map are only reloaded on change
+    targets = await TARGETS.get(is_earnings_period and not discovery, universe=adaptive)
+    work: List[tuple[str, str]] = SHARDS.filter(targets.work)    # all of it unless sharded
 
     if not work:
-        LOGGER.warning("No valid tickers to process")
+        if SHARDS.enabled:
+            LOGGER.debug("No tickers in this worker's shards")
+        else:
+            LOGGER.warning("No valid tickers to process")
         return
 
+    if adaptive:
+        work = CADENCE.due(work, targets.earnings_dates, is_earnings_period)
+        if not work:
+            LOGGER.debug("No tickers due this tick")
+            return
+
+    # Open state database
+    state = StateDB()
+    LOGGER.info("Opened state DB at %s", state.db_label)
+
+    if discovery:
+        hit_ciks = await _discover_ciks(state, targets.ciks, is_earnings_period)
+        work = [(t, cik) for t, cik in work if cik in hit_ciks]
+        if not work:
+            state.close()
+            return
+
     # Log summary of what we're processing
     period_type = "EARNINGS" if is_earnings_period else "COOLDOWN"
     LOGGER.info(
@@ -225,23 +251,28 @@ async def run_once(is_earnings_period: bool = False) -> None:
         len(work)
     )
 
-    # Open state database
-    state = StateDB()
-    LOGGER.info("Opened state DB at %s", state.db_label)
-
     # Process all tickers concurrently with semaphore
+    started = time.monotonic()
     sem = asyncio.Semaphore(config.MAX_CONCURRENT_TICKERS)
     await asyncio.gather(*(_handle_ticker(sem, state, t, cik) for t, cik in work))
 
     state.close()
+    METRICS.observe("edgar_cycle_seconds", time.monotonic() - started, period=period_type.lower())
+
+    LOGGER.info("Completed %s period run (ingest queue: %s)", period_type, INGEST_QUEUE.stats())
+
 
-    LOGGER.info("Completed %s period run", period_type)
+async def _run_once_and_drain() -> None:
+    await run_once(is_earnings_period=False)
+    await INGEST_QUEUE.drain(config.INGEST_DRAIN_TIMEOUT)
+    await edgar_client.aclose()
+    await asyncio.to_thread(StateDB.shutdown_pool)
 
 
 # Synchronous entry point (for backwards compatibility)
 def main() -> None:
     """Run once in cooldown mode (default behavior)."""
-    asyncio.run(run_once(is_earnings_period=False))
+    asyncio.run(_run_once_and_drain())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,235 @@
+"""
+In‑process metrics for the EDGAR bot, rendered as Prometheus text.
+
+    METRICS.inc("edgar_sec_requests_total", endpoint="submissions", status="200")
+    with METRICS.timer("edgar_stage_seconds", stage="list"):
+        ...
+    METRICS.observe("edgar_e2e_latency_seconds", seconds_since(accepted))
+
+Exposed three ways (see scheduler_v2):
+* written atomically to config.METRICS_FILE every METRICS_WRITE_SECONDS,
+  together with a one‑line summary in the log (Heroku has no scrape path
+  into a worker dyno, so the log line is what you read there);
+* served on http://0.0.0.0:<METRICS_PORT>/metrics when METRICS_PORT is set;
+* `manage.py edgar_metrics` prints the file (local dev).
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import contextlib
+import datetime
+import logging
+import threading
+import time
+from typing import Dict, Iterator, Tuple
+
+from EDGAR_bot.core import config
+
+LOGGER = logging.getLogger("metrics")
+
+_STAGE_BUCKETS   = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+_LATENCY_BUCKETS = (5, 10, 20, 30, 60, 120, 300, 600, 1800, 3600, 3 * 3600, 12 * 3600, 86400)
+
+# name → (type, help, buckets)
+_DEFS: Dict[str, tuple[str, str, tuple[float, ...]]] = {
+    "edgar_sec_requests_total":     ("counter", "SEC HTTP attempts by endpoint and status", ()),
+    "edgar_sec_throttled_total":    ("counter", "SEC 429 responses by endpoint", ()),
+    "edgar_stage_seconds":          ("histogram", "Wall time per pipeline stage", _STAGE_BUCKETS),
+    "edgar_cycle_seconds":          ("histogram", "run_once duration by period", _STAGE_BUCKETS),
+    "edgar_cycle_interval_seconds": ("gauge", "Interval of the scheduled run_once job", ()),
+    "edgar_filings_total":          ("counter", "Filings by pipeline outcome", ()),
+    "edgar_detect_latency_seconds": ("histogram", "SEC acceptance to filing downloaded", _LATENCY_BUCKETS),
+    "edgar_e2e_latency_seconds":    ("histogram", "SEC acceptance to attached to vector store", _LATENCY_BUCKETS),
+    "edgar_poller_staleness_seconds": ("gauge", "Seconds since last completed poll (rolling poller)", ()),
+    "edgar_ingest_queue_depth":     ("gauge", "Filings waiting for OpenAI ingestion", ()),
+    "edgar_upload_dedup_total":     ("counter", "OpenAI uploads skipped by content hash", ()),
+    "edgar_shards_owned":           ("gauge", "Poller shards leased by this worker", ()),
+    "edgar_shard_workers":          ("gauge", "Live sharded poller workers", ()),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def seconds_since(accepted: str | None) -> float | None:
+    """Age of an SEC `acceptanceDateTime` ("2025-07-30T16:05:12.000Z"), or None."""
+    if not accepted:
+        return None
+    try:
+        dt = datetime.datetime.fromisoformat(accepted)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return (datetime.datetime.now(datetime.timezone.utc) - dt).total_seconds()
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts  = [0] * (len(buckets) + 1)       # last = +Inf
+        self.total   = 0.0
+        self.count   = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: Dict[str, Dict[Labels, float]] = {}
+        self._hists:  Dict[str, Dict[Labels, _Histogram]] = {}
+        self.started = time.time()
+        self._last_summary = (time.monotonic(), 0.0, 0.0)   # (when, requests, 429s)
+
+    # ─────────────────────────── recording ────────────────────────────
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+    def observe(self, name: str, value: float | None, **labels: str) -> None:
+        if value is None:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._hists.setdefault(name, {})
+            if key not in series:
+                series[key] = _Histogram(_DEFS[name][2])
+            series[key].observe(value)
+
+    @contextlib.contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - start, **labels)
+
+    # ─────────────────────────── reading ──────────────────────────────
+    def total(self, name: str) -> float:
+        with self._lock:
+            return sum(self._values.get(name, {}).values())
+
+    def quantile(self, name: str, q: float, **labels: str) -> float | None:
+        """Bucket‑interpolated quantile over every series matching *labels*."""
+        want = set(labels.items())
+        with self._lock:
+            hists = [h for k, h in self._hists.get(name, {}).items() if want <= set(k)]
+        if not hists:
+            return None
+        buckets = hists[0].buckets
+        counts  = [sum(h.counts[i] for h in hists) for i in range(len(buckets) + 1)]
+        n = sum(counts)
+        if not n:
+            return None
+        rank, seen = q * n, 0
+        for i, c in enumerate(counts):
+            if seen + c >= rank and c:
+                lo = buckets[i - 1] if i else 0.0
+                hi = buckets[i] if i < len(buckets) else buckets[-1]
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return buckets[-1]
+
+    # ─────────────────────────── export ───────────────────────────────
+    @staticmethod
+    def _fmt_labels(labels: Labels, extra: str = "") -> str:
+        parts = [f'{k}="{v}"' for k, v in labels]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name in sorted(set(self._values) | set(self._hists)):
+                kind, help_, _ = _DEFS.get(name, ("untyped", "", ()))
+                lines += [f"# HELP {name} {help_}", f"# TYPE {name} {kind}"]
+                for labels, v in sorted(self._values.get(name, {}).items()):
+                    lines.append(f"{name}{self._fmt_labels(labels)} {v:g}")
+                for labels, h in sorted(self._hists.get(name, {}).items()):
+                    cum = 0
+                    for le, c in zip((*h.buckets, "+Inf"), h.counts):
+                        cum += c
+                        le_label = f'le="{le}"'
+                        lines.append(f"{name}_bucket{self._fmt_labels(labels, le_label)} {cum}")
+                    lines.append(f"{name}_sum{self._fmt_labels(labels)} {h.total:.6f}")
+                    lines.append(f"{name}_count{self._fmt_labels(labels)} {h.count}")
+        lines.append(f"edgar_metrics_started_timestamp_seconds {self.started:.0f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        path = config.METRICS_FILE
+        tmp  = path.with_suffix(".tmp")
+        tmp.write_text(self.render(), encoding="utf-8")
+        tmp.replace(path)                                   # atomic for scrapers / readers
+
+    def summary_line(self) -> str:
+        now   = time.monotonic()
+        reqs  = self.total("edgar_sec_requests_total")
+        t429  = self.total("edgar_sec_throttled_total")
+        then, reqs0, t4290 = self._last_summary
+        self._last_summary = (now, reqs, t429)
+        rate  = (reqs - reqs0) / max(now - then, 1e-9)
+
+        def _q(name: str, q: float, **labels: str) -> str:
+            v = self.quantile(name, q, **labels)
+            return "-" if v is None else f"{v:.1f}s"
+
+        return (
+            f"SEC {rate:.1f} req/s ({t429 - t4290:.0f} x 429 since last); "
+            f"detect p50 {_q('edgar_detect_latency_seconds', .5)} p95 {_q('edgar_detect_latency_seconds', .95)}; "
+            f"e2e p50 {_q('edgar_e2e_latency_seconds', .5)} p95 {_q('edgar_e2e_latency_seconds', .95)}; "
+            f"list p95 {_q('edgar_stage_seconds', .95, stage='list')}, "
+            f"download p95 {_q('edgar_stage_seconds', .95, stage='download')}, "
+            f"attach p95 {_q('edgar_stage_seconds', .95, stage='attach')}"
+        )
+
+
+METRICS = Metrics()
+
+
+# ───────────────────────────── exporters ──────────────────────────────
+async def _serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        await reader.readline()                             # request line – every path gets metrics
+        body = METRICS.render().encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+            b"Content-Length: " + str(len(body)).encode() + b"\r\nConnection: close\r\n\r\n" + body
+        )
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def run_exporter() -> None:
+    """File (+ optional HTTP endpoint) exporter; cancel to stop."""
+    server = None
+    if config.METRICS_PORT:
+        server = await asyncio.start_server(_serve, "0.0.0.0", config.METRICS_PORT)
+        LOGGER.info("Serving metrics on :%d/metrics", config.METRICS_PORT)
+    try:
+        while True:
+            await asyncio.sleep(config.METRICS_WRITE_SECONDS)
+            try:
+                METRICS.write()
+            except OSError as exc:
+                LOGGER.warning("Could not write %s: %s", config.METRICS_FILE, exc)
+            LOGGER.info("Metrics: %s", METRICS.summary_line())
+    finally:
+        if server is not None:
+            server.close()
+        with contextlib.suppress(OSError):
+            METRICS.write()
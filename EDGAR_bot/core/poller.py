@@ -0,0 +1,232 @@
+"""
+Rolling continuous EDGAR poller (scheduler_v2, opt-in via EDGAR_POLLER=continuous).
+
+The interval job re‑walks the whole work list every run, and with
+`max_instances=1, coalesce=True` a pass that overruns the interval just
+swallows the next run – the tail of the list always waits longest. Here
+every ticker instead has its own next‑due time in a heap:
+
+* the dispatcher pops the most overdue ticker whenever a worker slot is
+  free *and* the SEC limiter has a token, so work is pulled at exactly the
+  rate the budget allows and never queues up behind the limiter;
+* after each poll the ticker is rescheduled by cadence.py
+  (earnings_date‑aware, geometric back‑off);
+* the target set is re‑synced every CADENCE_TICK_SECONDS – new tickers are
+  due immediately, removed ones are dropped, tickers whose cadence got
+  faster (e.g. an earnings window opened) are pulled forward; with
+  config.SHARDING only tickers in this worker's shards are kept;
+* per‑ticker staleness (time since last completed poll) is tracked and
+  summarised every POLLER_REPORT_SECONDS.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import heapq
+import itertools
+import logging
+import time
+from typing import Callable, Dict
+
+from EDGAR_bot.core import config, jobs_v2
+from EDGAR_bot.core.cadence import CADENCE, EST
+from EDGAR_bot.core.ingest_queue import INGEST_QUEUE
+from EDGAR_bot.core.metrics import METRICS
+from EDGAR_bot.core.rate_limiter import SEC_LIMITER
+from EDGAR_bot.core.sharding import SHARDS
+from EDGAR_bot.core.state import StateDB
+from EDGAR_bot.core.targets import TARGETS
+
+LOGGER = logging.getLogger("poller")
+_DISPATCH_ERROR_BACKOFF = 5.0              # seconds after a failed dispatch round
+
+
+class RollingPoller:
+    def __init__(self, in_window: Callable[[], bool]) -> None:
+        self.in_window = in_window                     # "are we in an earnings window?"
+        self.state     = StateDB()
+
+        self._heap: list[tuple[float, int, str]] = []  # (next_due, seq, ticker) – lazy deletes
+        self._seq  = itertools.count()
+        self._due:  Dict[str, float] = {}              # ticker → authoritative next_due (monotonic)
+        self._cik:  Dict[str, str]   = {}
+        self._earnings: Dict[str, datetime.date] = {}
+        self._last_done: Dict[str, float] = {}         # ticker → monotonic end of last poll
+        self._running: set[str] = set()
+
+        self._slots = asyncio.Semaphore(config.MAX_CONCURRENT_TICKERS)
+        self._tasks: set[asyncio.Task] = set()
+        self._wake  = asyncio.Event()
+        self._main: asyncio.Task | None = None
+
+        self.polls = 0
+
+    # ─────────────────────────── scheduling ───────────────────────────
+    def _schedule(self, ticker: str, due: float) -> None:
+        self._due[ticker] = due
+        heapq.heappush(self._heap, (due, next(self._seq), ticker))
+        self._wake.set()
+
+    def _interval(self, ticker: str) -> float:
+        today = datetime.datetime.now(EST).date()
+        return CADENCE.interval_for(ticker, self._earnings.get(ticker), today, self.in_window())
+
+    async def _sync_targets(self) -> None:
+        targets = await TARGETS.get(self.in_window(), universe=True)
+        self._earnings = dict(targets.earnings_dates)
+        now  = time.monotonic()
+        work = dict(SHARDS.filter(targets.work))
+
+        for ticker in set(self._cik) - set(work):        # dropped from CSV / Watchlist / shard
+            self._cik.pop(ticker, None)
+            self._due.pop(ticker, None)
+        for ticker, cik in work.items():
+            self._cik[ticker] = cik
+            if ticker in self._running:
+                continue
+            if ticker not in self._due:
+                self._schedule(ticker, now)
+                continue
+            # pull forward if the cadence got faster since it was scheduled
+            last = self._last_done.get(ticker)
+            if last is not None and last + self._interval(ticker) < self._due[ticker]:
+                self._schedule(ticker, last + self._interval(ticker))
+
+    def _pop_due(self) -> tuple[str | None, float]:
+        """Most overdue live ticker, or (None, seconds until the next one is due)."""
+        now = time.monotonic()
+        while self._heap:
+            due, _, ticker = self._heap[0]
+            if self._due.get(ticker) != due:             # stale heap entry
+                heapq.heappop(self._heap)
+                continue
+            if due > now:
+                return None, due - now
+            heapq.heappop(self._heap)
+            del self._due[ticker]
+            return ticker, 0.0
+        return None, config.CADENCE_TICK_SECONDS
+
+    # ─────────────────────────── workers ──────────────────────────────
+    async def _poll(self, ticker: str, cik: str) -> None:
+        try:
+            await jobs_v2.poll_ticker(self.state, ticker, cik)
+        except Exception:
+            LOGGER.exception("Poll failed for %s (%s)", ticker, cik)
+        finally:
+            self.polls += 1
+            self._running.discard(ticker)
+            self._last_done[ticker] = time.monotonic()
+            if ticker in self._cik:
+                self._schedule(ticker, self._last_done[ticker] + self._interval(ticker))
+            self._slots.release()
+
+    async def _dispatch(self) -> None:
+        next_sync = next_report = 0.0
+        while True:
+            now = time.monotonic()
+            if now >= next_sync:
+                try:
+                    await self._sync_targets()
+                except Exception:
+                    LOGGER.exception("Target sync failed - keeping previous set")
+                next_sync = now + config.CADENCE_TICK_SECONDS
+            if now >= next_report:
+                self._report()
+                next_report = now + config.POLLER_REPORT_SECONDS
+
+            holding = False
+            try:
+                # slot + token first, so the pick below reflects the heap at dispatch time
+                await self._slots.acquire()
+                holding = True
+                await SEC_LIMITER.wait_ready()     # pace dispatch to the shared SEC budget
+
+                ticker, wait = self._pop_due()
+                if ticker is None:
+                    holding = False
+                    self._slots.release()
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(
+                            self._wake.wait(), min(wait, max(0.0, next_sync - time.monotonic()))
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                self._running.add(ticker)
+                task = asyncio.create_task(self._poll(ticker, self._cik[ticker]), name=f"poll-{ticker}")
+                holding = False                    # the poll releases the slot
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                # let the poll spend its token before we peek at the bucket again
+                await asyncio.sleep(1.0 / SEC_LIMITER.rate)
+            except Exception:
+                # e.g. a db/file limiter clock hiccup – one bad round must not stop polling
+                LOGGER.exception("Poller dispatch failed - retrying in %ss", _DISPATCH_ERROR_BACKOFF)
+                if holding:
+                    self._slots.release()
+                await asyncio.sleep(_DISPATCH_ERROR_BACKOFF)
+
+    # ─────────────────────────── reporting ────────────────────────────
+    def staleness(self) -> Dict[str, float]:
+        """ticker → seconds since its last completed poll (inf = never polled)."""
+        now = time.monotonic()
+        return {t: now - self._last_done.get(t, float("-inf")) for t in self._cik}
+
+    def _report(self) -> None:
+        stale = self.staleness()
+        if not stale:
+            return
+        polled = sorted(s for s in stale.values() if s != float("inf"))
+        worst  = sorted(stale.items(), key=lambda kv: kv[1], reverse=True)[:5]
+        now    = time.monotonic()
+        if polled:
+            METRICS.set("edgar_poller_staleness_seconds", polled[len(polled) // 2], quantile="0.5")
+            METRICS.set("edgar_poller_staleness_seconds", polled[int(len(polled) * .95)], quantile="0.95")
+            METRICS.set("edgar_poller_staleness_seconds", polled[-1], quantile="1")
+        METRICS.set("edgar_ingest_queue_depth", INGEST_QUEUE.stats()["depth"])
+        LOGGER.info(
+            "Poller: %d tickers, %d polls, %d in flight, %d overdue, never polled %d; "
+            "staleness p50 %.0fs max %.0fs; stalest: %s; ingest queue: %s",
+            len(stale), self.polls, len(self._running),
+            sum(1 for d in self._due.values() if d < now),
+            len(stale) - len(polled),
+            polled[len(polled) // 2] if polled else 0.0,
+            polled[-1] if polled else 0.0,
+            ", ".join(f"{t}={s:.0f}s" if s != float("inf") else f"{t}=never" for t, s in worst),
+            INGEST_QUEUE.stats(),
+        )
+
+    # ─────────────────────────── lifecycle ────────────────────────────
+    @staticmethod
+    def _dispatcher_done(task: asyncio.Task) -> None:
+        if task.cancelled():
+            return                                 # normal shutdown
+        if task.exception() is not None:
+            LOGGER.error("Poller dispatcher died - polling has STOPPED", exc_info=task.exception())
+        else:
+            LOGGER.error("Poller dispatcher exited - polling has STOPPED")
+
+    def start(self) -> None:
+        self._main = asyncio.create_task(self._dispatch(), name="edgar-poller")
+        self._main.add_done_callback(self._dispatcher_done)
+        LOGGER.info(
+            "Rolling poller started (%d slots, %s req/s SEC budget)",
+            config.MAX_CONCURRENT_TICKERS, SEC_LIMITER.rate,
+        )
+
+    async def shutdown(self, timeout: float | None = config.SHUTDOWN_JOB_TIMEOUT) -> None:
+        """Stop dispatching, let in-flight polls finish (cancel after *timeout*), then drain ingestion."""
+        if self._main is not None:
+            self._main.cancel()
+            await asyncio.gather(self._main, return_exceptions=True)
+        if self._tasks:
+            LOGGER.info("Waiting for %d in-flight poll(s)", len(self._tasks))
+            done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self.state.close()
+        await INGEST_QUEUE.drain(config.INGEST_DRAIN_TIMEOUT)
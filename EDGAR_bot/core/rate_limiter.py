@@ -0,0 +1,251 @@
+"""
+Process‑wide token bucket for SEC fair‑access limits.
+
+Every coroutine that talks to sec.gov awaits `SEC_LIMITER.acquire()` first,
+so the aggregate request rate never exceeds `config.SEC_MAX_REQUESTS_PER_SECOND`
+no matter how many tickers are in flight.
+
+Several processes (sharded worker dynos) share one budget by attaching a
+*shared clock* – `SEC_LIMITER.use_shared(make_clock("db"))`. The clock keeps
+GCRA state (the earliest epoch time the next request may start) in a file
+under fcntl.flock ("file", one host) or in a SharedRateClock row under
+SELECT … FOR UPDATE ("db", every dyno); each reservation is one tiny
+critical section, and requests are evenly paced at the bucket's rate.
+
+Background processes (backfill, XBRL sync) call `throttle_background(rate)`:
+their own bucket caps them at *rate* while each request is also charged to
+the shared clock at the full SEC budget, so live + background stays within it.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+
+from EDGAR_bot.core import config
+
+LOGGER = logging.getLogger("rate_limiter")
+
+
+class FileClock:
+    """GCRA clock in an 8‑byte file guarded by flock – processes on one host."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _update(self, rate: float, tokens: float, take: bool) -> float:
+        import fcntl
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.pread(fd, 8, 0)
+            tat = struct.unpack("d", raw)[0] if len(raw) == 8 else 0.0
+            now = time.time()
+            start = max(tat, now)
+            if take:
+                os.pwrite(fd, struct.pack("d", start + tokens / rate), 0)
+            return start - now
+        finally:
+            os.close(fd)                                # releases the lock
+
+    def reserve(self, rate: float, tokens: float = 1.0) -> float:
+        return self._update(rate, tokens, take=True)
+
+    def ready_in(self, rate: float) -> float:
+        return self._update(rate, 0.0, take=False)
+
+    async def areserve(self, rate: float, tokens: float = 1.0) -> float:
+        return self.reserve(rate, tokens)               # microseconds – fine on the loop
+
+    async def aready_in(self, rate: float) -> float:
+        return self.ready_in(rate)
+
+
+class DBClock:
+    """GCRA clock in a SharedRateClock row – every process on the database."""
+
+    def __init__(self, name: str = "sec") -> None:
+        self.name = name
+
+    def _update(self, rate: float, tokens: float, take: bool) -> float:
+        from django.db import transaction
+        from EDGAR_bot.models import SharedRateClock
+
+        with transaction.atomic():
+            row, _ = SharedRateClock.objects.select_for_update().get_or_create(name=self.name)
+            now   = time.time()
+            start = max(row.tat, now)
+            if take:
+                row.tat = start + tokens / rate
+                row.save(update_fields=["tat"])
+            return start - now
+
+    def reserve(self, rate: float, tokens: float = 1.0) -> float:
+        return self._update(rate, tokens, take=True)
+
+    def ready_in(self, rate: float) -> float:
+        return self._update(rate, 0.0, take=False)
+
+    async def areserve(self, rate: float, tokens: float = 1.0) -> float:
+        from EDGAR_bot.core.state import StateDB
+        return await StateDB._run(self.reserve, rate, tokens)
+
+    async def aready_in(self, rate: float) -> float:
+        from EDGAR_bot.core.state import StateDB
+        return await StateDB._run(self.ready_in, rate)
+
+
+def make_clock(backend: str) -> FileClock | DBClock | None:
+    """Shared clock for config.SEC_LIMITER_BACKEND ("local" → None)."""
+    if backend == "file":
+        return FileClock(config.SEC_LIMITER_FILE)
+    if backend == "db":
+        return DBClock()
+    if backend == "local":
+        return None
+    raise ValueError(f"unknown SEC limiter backend {backend!r} (local, file or db)")
+
+
+class TokenBucket:
+    """
+    Reservation‑style token bucket.
+
+    The bookkeeping is guarded by a *threading* lock (not an asyncio one) so a
+    single bucket can be shared by several event loops / threads in the same
+    process.  Callers reserve a slot under the lock and then sleep outside it.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        self.rate     = float(rate)                     # tokens per second
+        self.capacity = float(capacity)                 # 1 → evenly paced, no bursts
+        self._tokens  = self.capacity
+        self._stamp   = time.monotonic()
+        self._lock    = threading.Lock()
+        self._shared: FileClock | DBClock | None = None
+        self._shared_rate: float | None = None          # None → shared clock paced at self.rate
+
+    # ─────────────────────────── helpers ──────────────────────────────
+    def _reserve(self, tokens: float) -> float:
+        """Take *tokens* from the bucket; return seconds to wait before use."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp  = now
+            self._tokens -= tokens                      # may go negative = queued
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def _local_ready_in(self) -> float:
+        with self._lock:
+            tokens = min(self.capacity, self._tokens + (time.monotonic() - self._stamp) * self.rate)
+            return 0.0 if tokens >= 1.0 else (1.0 - tokens) / self.rate
+
+    def ready_in(self) -> float:
+        """Seconds until one token is free – peek only, nothing is reserved."""
+        if self._shared is None:
+            return self._local_ready_in()
+        if self._shared_rate is None:
+            return self._shared.ready_in(self.rate)
+        return max(self._shared.ready_in(self._shared_rate), self._local_ready_in())
+
+    # ─────────────────────────── public API ────────────────────────────
+    def set_rate(self, rate: float) -> None:
+        """Re‑budget the bucket (e.g. a backfill process running below the live budget)."""
+        with self._lock:
+            self.rate = float(rate)
+
+    def use_shared(self, clock: FileClock | DBClock | None, rate: float | None = None) -> None:
+        """
+        Coordinate through *clock* (None = back to the in‑process bucket).
+        The shared clock paces evenly at `rate`; `capacity` no longer applies.
+        With *rate* the clock is charged at that (global) rate instead and the
+        bucket's own rate still caps this process – see throttle_background.
+        """
+        self._shared = clock
+        self._shared_rate = rate if clock is not None else None
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        if self._shared is None:
+            wait = self._reserve(tokens)
+        elif self._shared_rate is None:
+            wait = await self._shared.areserve(self.rate, tokens)
+        else:
+            local = self._reserve(tokens)               # own cap first, then the shared slot
+            if local > 0:
+                await asyncio.sleep(local)
+            wait = await self._shared.areserve(self._shared_rate, tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def wait_ready(self) -> None:
+        """
+        Sleep until a token is free without taking it – lets a dispatcher pace
+        itself to the budget while the actual request still pays via acquire().
+        """
+        while True:
+            if self._shared is None:
+                wait = self.ready_in()
+            elif self._shared_rate is None:
+                wait = await self._shared.aready_in(self.rate)
+            else:
+                wait = max(await self._shared.aready_in(self._shared_rate), self._local_ready_in())
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, tokens: float = 1.0) -> None:
+        if self._shared is None:
+            wait = self._reserve(tokens)
+        elif self._shared_rate is None:
+            wait = self._shared.reserve(self.rate, tokens)
+        else:
+            local = self._reserve(tokens)
+            if local > 0:
+                time.sleep(local)
+            wait = self._shared.reserve(self._shared_rate, tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+
+# one bucket per process – shared by every SEC caller
+SEC_LIMITER = TokenBucket(config.SEC_MAX_REQUESTS_PER_SECOND)
+
+
+class SharedBudgetRequired(RuntimeError):
+    """A background SEC job would add to the live poller's rate instead of sharing it."""
+
+
+def throttle_background(rate: float, explicit: bool = False) -> None:
+    """
+    Run this (non‑live) process at *rate* req/s inside the shared SEC budget:
+    the local bucket caps it, and every request is also reserved on the
+    config.SEC_LIMITER_BACKEND clock at the full SEC rate, so the live poller
+    attached to the same clock yields the difference.
+
+    With EDGAR_LIMITER=local there is no shared clock and the two rates add
+    up, so this refuses (SharedBudgetRequired) unless the caller passed an
+    *explicit* rate – the operator's statement that the live dyno's
+    EDGAR_SEC_RPS was lowered to leave room for it.
+    """
+    clock = make_clock(config.SEC_LIMITER_BACKEND)
+    if clock is None:
+        if not explicit:
+            raise SharedBudgetRequired(
+                "EDGAR_LIMITER=local: a background job would exceed SEC's budget on top of the "
+                "live poller - set EDGAR_LIMITER=file|db on both processes, or lower EDGAR_SEC_RPS "
+                "on the live dyno and pass an explicit --rate that fits in the difference"
+            )
+        LOGGER.warning(
+            "EDGAR_LIMITER=local: running at an explicit %.1f req/s outside the shared budget - "
+            "the live poller's EDGAR_SEC_RPS must leave room for it", rate,
+        )
+    SEC_LIMITER.set_rate(rate)
+    SEC_LIMITER.use_shared(clock, config.SEC_MAX_REQUESTS_PER_SECOND)
+
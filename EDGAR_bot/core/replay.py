@@ -0,0 +1,236 @@
+"""
+Offline SEC + OpenAI stub server for benchmarking (see bench.py).
+
+Serves, on 127.0.0.1:<port>:
+
+* GET  /submissions/CIK##########.json            – submissions JSON
+* GET  /Archives/edgar/data/<cik>/<acc>/index.json – directory listing
+* GET  /Archives/edgar/data/<cik>/<acc>/<doc>      – document bodies
+* POST /v1/files, /v1/vector_stores/<id>/file_batches – fake OpenAI files /
+  vector‑store API (enough for ingest_openai)
+
+Responses are built from a *fixture* – either recorded SEC responses in a
+directory (submissions.json, index.json, docs/*) or a small built‑in 8‑K –
+and stamped per CIK with unique accession numbers, today's filing date and
+`acceptanceDateTime = published_at`. Every request can be delayed
+(`latency` ± `jitter` seconds) and a fraction answered with 429 to exercise
+the client's back‑off. The server records when each filing's primary
+document was first served, which is what bench.py uses as "detected".
+"""
+from __future__ import annotations
+
+import datetime
+import itertools
+import json
+import logging
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+
+LOGGER = logging.getLogger("replay")
+
+_SUBMISSIONS_RE = re.compile(r"^/submissions/CIK(\d{10})\.json$")
+_ARCHIVE_RE     = re.compile(r"^/Archives/edgar/data/(\d+)/(\d{18})/(.+)$")
+
+_BUILTIN_PRIMARY = b"<html><body><p>Item 2.02 Results of Operations and Financial Condition.</p></body></html>"
+_BUILTIN_EX99    = (
+    b"<html><body><h1>Press release: quarterly results</h1>"
+    + b"<table>" + b"<tr><td>Revenue</td><td>$</td><td>1,234</td></tr>" * 200 + b"</table>"
+    + b"</body></html>"
+)
+
+
+@dataclass
+class Fixture:
+    """One filing template: submissions rows, directory listing and bodies."""
+    recent:  Dict[str, list]                     # filings.recent column arrays
+    items:   List[dict]                          # index.json directory items
+    docs:    Dict[str, bytes] = field(default_factory=dict)
+    default_body: bytes = _BUILTIN_PRIMARY
+
+    @classmethod
+    def builtin(cls) -> "Fixture":
+        return cls(
+            recent={
+                "accessionNumber": ["0000000000-25-000001"],
+                "form": ["8-K"],
+                "filingDate": [""],
+                "primaryDocument": ["form8-k.htm"],
+                "acceptanceDateTime": [""],
+            },
+            items=[
+                {"name": "form8-k.htm", "type": "8-K", "description": "FORM 8-K"},
+                {"name": "ex99-1.htm", "type": "EX-99.1", "description": "PRESS RELEASE"},
+            ],
+            docs={"form8-k.htm": _BUILTIN_PRIMARY, "ex99-1.htm": _BUILTIN_EX99},
+        )
+
+    @classmethod
+    def load(cls, root: Path, filings: int) -> "Fixture":
+        """submissions.json (first *filings* recent rows), index.json, docs/<name>."""
+        recent = json.loads((root / "submissions.json").read_text())["filings"]["recent"]
+        recent = {k: v[:filings] for k, v in recent.items() if isinstance(v, list)}
+        items  = json.loads((root / "index.json").read_text())["directory"]["item"]
+        docs   = {p.name: p.read_bytes() for p in (root / "docs").glob("*") if p.is_file()}
+        return cls(recent, items, docs)
+
+
+class ReplayState:
+    def __init__(self, fixture: Fixture, latency: float, jitter: float,
+                 p429: float, retry_after: float) -> None:
+        self.fixture      = fixture
+        self.latency      = latency
+        self.jitter       = jitter
+        self.p429         = p429
+        self.retry_after  = retry_after
+        self.published_at = datetime.datetime.now(datetime.timezone.utc)
+
+        self._lock    = threading.Lock()
+        self._rng     = random.Random(42)
+        self._file_id = itertools.count(1)
+        self.requests: Dict[str, int] = {}          # endpoint → count
+        self.throttled = 0
+        self.detected: Dict[str, float] = {}        # accession → time.time() primary first served
+
+    # ── per‑CIK view of the fixture ───────────────────────────────────
+    def accessions(self, cik: str) -> List[str]:
+        n = len(self.fixture.recent["accessionNumber"])
+        return [f"{cik}-25-{i + 1:06d}" for i in range(n)]
+
+    def submissions(self, cik: str) -> dict:
+        recent = dict(self.fixture.recent)
+        n      = len(recent["accessionNumber"])
+        recent["accessionNumber"]    = self.accessions(cik)
+        recent["filingDate"]         = [self.published_at.date().isoformat()] * n
+        recent["acceptanceDateTime"] = [self.published_at.isoformat(timespec="milliseconds")] * n
+        return {"cik": cik, "filings": {"recent": recent}}
+
+    def primary_doc(self, accession_nodash: str) -> str | None:
+        idx = int(accession_nodash[-6:]) - 1
+        docs = self.fixture.recent["primaryDocument"]
+        return docs[idx] if 0 <= idx < len(docs) else None
+
+    # ── bookkeeping ───────────────────────────────────────────────────
+    def hit(self, endpoint: str) -> bool:
+        """Count a request; return True if it should be answered with 429."""
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            throttle = self.p429 > 0 and self._rng.random() < self.p429
+            if throttle:
+                self.throttled += 1
+            return throttle
+
+    def delay(self) -> None:
+        if self.latency or self.jitter:
+            with self._lock:
+                d = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+            time.sleep(max(0.0, d))
+
+    def next_file_id(self) -> str:
+        with self._lock:
+            return f"file-bench{next(self._file_id)}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"                   # keep‑alive, like sec.gov
+    server: "ReplayServer"
+
+    def log_message(self, *_a) -> None:             # silence per‑request stderr lines
+        return None
+
+    def _send(self, status: int, body: bytes, ctype: str = "application/json",
+              headers: Dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, obj) -> None:
+        self._send(200, json.dumps(obj).encode())
+
+    def _throttled(self, endpoint: str) -> bool:
+        st = self.server.state
+        st.delay()
+        if st.hit(endpoint):
+            self._send(429, b"{}", headers={"Retry-After": f"{st.retry_after:g}"})
+            return True
+        return False
+
+    def do_GET(self) -> None:
+        st   = self.server.state
+        path = self.path.split("?", 1)[0]
+
+        if m := _SUBMISSIONS_RE.match(path):
+            if not self._throttled("submissions"):
+                self._json(st.submissions(m.group(1)))
+            return
+
+        if m := _ARCHIVE_RE.match(path):
+            _cik, acc, name = m.groups()
+            if name == "index.json":
+                if not self._throttled("dir_listing"):
+                    self._json({"directory": {"item": st.fixture.items}})
+                return
+            if self._throttled("document"):
+                return
+            if name == st.primary_doc(acc):
+                key = f"{acc[:10]}-{acc[10:12]}-{acc[12:]}"
+                with st._lock:
+                    st.detected.setdefault(key, time.time())
+            self._send(200, st.fixture.docs.get(name, st.fixture.default_body), "text/html")
+            return
+
+        self._send(404, b"{}")
+
+    def do_POST(self) -> None:
+        st = self.server.state
+        self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+        path = self.path.split("?", 1)[0]
+        st.hit("openai")
+        now = int(time.time())
+
+        if path.endswith("/files"):
+            self._json({
+                "id": st.next_file_id(), "object": "file", "bytes": 0, "created_at": now,
+                "filename": "upload", "purpose": "assistants", "status": "processed",
+            })
+        elif path.endswith("/file_batches"):
+            vs_id = path.split("/")[-2]
+            self._json({
+                "id": f"vsfb_{now}", "object": "vector_store.files_batch", "created_at": now,
+                "vector_store_id": vs_id, "status": "completed",
+                "file_counts": {"in_progress": 0, "completed": 1, "failed": 0, "cancelled": 0, "total": 1},
+            })
+        else:
+            self._send(404, b"{}")
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, state: ReplayState, port: int = 0) -> None:
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.state = state
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        LOGGER.info("Replay server on %s", self.base_url)
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,210 @@
+"""
+Compact, section‑aware text for 10‑K / 10‑Q primary documents.
+
+A 10‑K's inline‑XBRL HTML is mostly markup: hidden fact headers, inline
+styles, spacer cells. Instead of uploading it raw, we stream it through an
+lxml HTMLParser *target* (SAX‑style – no tree is ever built), keep only the
+visible text, render tables as `a | b | c` rows, and split the result by
+Item into small markdown files (mdna, risk_factors, financial_statements …).
+
+    extract_sections(path, "10-K")                     → every Item
+    extract_sections(path, "10-K", {"mdna", "risk_factors"})
+"""
+from __future__ import annotations
+
+import logging
+import pathlib
+import re
+from typing import Iterable
+
+from lxml import etree
+
+LOGGER = logging.getLogger("report_extract")
+
+CHUNK_SIZE = 256 * 1024
+
+_SKIP_TAGS  = {"head", "script", "style", "title", "ix:header", "noscript"}
+_BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "table", "section", "article",
+    "h1", "h2", "h3", "h4", "h5", "h6", "center", "blockquote", "pre", "hr",
+}
+_CELL_TAGS  = {"td", "th"}
+_HIDDEN_RE  = re.compile(r"display\s*:\s*none", re.I)
+
+_WS_RE      = re.compile(r"\s+")
+_BOILER_RE  = re.compile(
+    r"^(?:\d{1,3}|page\s+\d+|[-–—]?\s*\d{1,3}\s*[-–—]?|table\s+of\s+contents|index)$", re.I
+)
+_PART_RE    = re.compile(r"^PART\s+(I{1,3}|IV)\b", re.I)
+_ITEM_RE    = re.compile(r"^ITEM\s+(\d{1,2}[A-C]?)\s*[.:\-–—]?\s*(.*)$", re.I)
+
+# Canonical section keys – (part, item) for 10‑Q, item only for 10‑K
+_10K_ITEMS = {
+    "1": "business", "1A": "risk_factors", "1B": "unresolved_staff_comments",
+    "1C": "cybersecurity", "2": "properties", "3": "legal_proceedings",
+    "4": "mine_safety", "5": "market_for_equity", "6": "reserved",
+    "7": "mdna", "7A": "market_risk", "8": "financial_statements",
+    "9": "accountant_changes", "9A": "controls", "9B": "other_information",
+    "9C": "foreign_inspections", "10": "directors", "11": "executive_compensation",
+    "12": "security_ownership", "13": "relationships", "14": "accountant_fees",
+    "15": "exhibits", "16": "form_summary",
+}
+_10Q_ITEMS = {
+    ("I", "1"): "financial_statements", ("I", "2"): "mdna",
+    ("I", "3"): "market_risk", ("I", "4"): "controls",
+    ("II", "1"): "legal_proceedings", ("II", "1A"): "risk_factors",
+    ("II", "2"): "equity_sales", ("II", "3"): "senior_defaults",
+    ("II", "4"): "mine_safety", ("II", "5"): "other_information",
+    ("II", "6"): "exhibits",
+}
+
+
+class _CompactTextTarget:
+    """lxml parser target: visible text only, one output line per block / table row."""
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self._buf:  list[str] = []
+        self._cells: list[str] | None = None
+        self._stack: list[bool] = []        # per open element: does it start a skip?
+        self._skip = 0
+
+    # helpers
+    def _flush(self) -> None:
+        text = _WS_RE.sub(" ", "".join(self._buf)).strip()
+        self._buf.clear()
+        if not text:
+            return
+        if self._cells is not None:
+            self._cells.append(text)
+        elif not _BOILER_RE.match(text):
+            self.lines.append(text)
+
+    def _flush_row(self) -> None:
+        self._flush()
+        merged: list[str] = []
+        for c in self._cells or []:
+            if merged and merged[-1] in {"$", "(", "$("}:
+                merged[-1] += c
+            elif merged and c in {")", "%", ")%", "%)"}:
+                merged[-1] += c
+            else:
+                merged.append(c)
+        if merged:
+            self.lines.append(" | ".join(merged))
+
+    # parser target API
+    def start(self, tag: str, attrib) -> None:
+        skip = tag in _SKIP_TAGS or bool(_HIDDEN_RE.search(attrib.get("style", "")))
+        self._stack.append(skip)
+        if skip:
+            self._skip += 1
+        if self._skip:
+            return
+        if tag == "tr":
+            self._flush()
+            self._cells = []
+        elif tag in _BLOCK_TAGS or tag in _CELL_TAGS:
+            self._flush()
+
+    def end(self, tag: str) -> None:
+        skip = self._stack.pop() if self._stack else False
+        if self._skip:
+            if skip:
+                self._skip -= 1
+            return
+        if tag == "tr":
+            self._flush_row()
+            self._cells = None
+        elif tag in _BLOCK_TAGS or tag in _CELL_TAGS:
+            self._flush()
+
+    def data(self, text: str) -> None:
+        if not self._skip:
+            self._buf.append(text)
+
+    def close(self) -> list[str]:
+        self._flush()
+        return self.lines
+
+
+def compact_lines(path: pathlib.Path) -> list[str]:
+    """Stream *path* through the parser target; return the visible text lines."""
+    parser = etree.HTMLParser(target=_CompactTextTarget(), huge_tree=True, encoding="utf-8")
+    with path.open("rb") as fh:
+        while chunk := fh.read(CHUNK_SIZE):
+            parser.feed(chunk)
+    return parser.close()
+
+
+def _size(lines: list[str]) -> int:
+    return sum(len(ln) for ln in lines)
+
+
+def _split_items(lines: list[str], form: str) -> dict[str, tuple[str, list[str]]]:
+    """
+    {section_key: (heading, lines)}. The table of contents repeats every
+    Item heading, so for each key the *longest* body wins (ties → the later
+    occurrence, since the TOC comes first).
+    """
+    is_10q = form.upper().startswith("10-Q")
+    part   = "I"
+    sections: dict[str, tuple[str, list[str]]] = {}
+    key, heading, body = "cover", "Cover", []
+
+    def _close() -> None:
+        if body and (key not in sections or _size(body) >= _size(sections[key][1])):
+            sections[key] = (heading, body)
+
+    for line in lines:
+        if len(line) < 200:
+            m_part = _PART_RE.match(line)
+            if m_part:
+                part = m_part.group(1).upper()
+            m_item = _ITEM_RE.match(line)
+            if m_item:
+                item = m_item.group(1).upper()
+                new_key = _10Q_ITEMS.get((part, item)) if is_10q else _10K_ITEMS.get(item)
+                if new_key:
+                    _close()
+                    key, heading, body = new_key, line, []
+                    continue
+        body.append(line)
+    _close()
+    return sections
+
+
+def extract_sections(
+    path: pathlib.Path,
+    form: str,
+    only: Iterable[str] | None = None,
+) -> list[pathlib.Path]:
+    """
+    Write `<stem>.<section>.md` files next to *path* and return them.
+    *only* restricts output to those section keys; if no Items are found
+    the whole document is written as one compact `<stem>.md`.
+    """
+    lines    = compact_lines(path)
+    sections = _split_items(lines, form)
+    wanted   = set(only) if only else None
+
+    if set(sections) <= {"cover"}:
+        out = path.with_suffix(".md")
+        out.write_text("\n".join(lines), encoding="utf-8")
+        LOGGER.info("No Items found in %s – wrote compact text (%d lines)", path.name, len(lines))
+        return [out]
+
+    written: list[pathlib.Path] = []
+    for key, (heading, body) in sections.items():
+        if wanted is not None and key not in wanted:
+            continue
+        out = path.with_name(f"{path.stem}.{key}.md")
+        out.write_text(f"# {heading}\n\n" + "\n".join(body), encoding="utf-8")
+        written.append(out)
+
+    LOGGER.info(
+        "Extracted %d/%d section(s) from %s (%d → %d bytes)",
+        len(written), len(sections), path.name,
+        path.stat().st_size, sum(p.stat().st_size for p in written),
+    )
+    return written
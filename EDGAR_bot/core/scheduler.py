@@ -17,7 +17,7 @@ import datetime
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from EDGAR_bot.core import config
-from EDGAR_bot.core import jobs
+from EDGAR_bot.core import edgar_client, jobs
 
 LOGGER = logging.getLogger("scheduler")
 
@@ -70,6 +70,7 @@ async def _runner() -> None:
 
     LOGGER.info("Shutdown signal received – stopping scheduler …")
     scheduler.shutdown(wait=False)
+    await edgar_client.aclose()
 
 
 # ───────────────────────────────────────── script entry‑point ─────────────
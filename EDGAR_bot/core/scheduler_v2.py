@@ -10,6 +10,14 @@ Cooldown periods (30-minute intervals):
 
 During earnings periods, uses Watchlist tickers if available, otherwise full CSV.
 During cooldown periods, always uses full CSV list.
+
+With config.ADAPTIVE_POLLING a single job ticks every CADENCE_TICK_SECONDS
+and each ticker is polled on its own cadence (see cadence.py).
+
+config.POLLER_MODE = "continuous" (EDGAR_POLLER, opt-in) replaces the
+interval jobs with the rolling per-ticker poller in poller.py. It always
+polls the whole universe on cadence.py's schedule, so EDGAR_DISCOVERY and
+the Watchlist-per-earnings-tick behaviour above do not apply.
 """
 from __future__ import annotations
 
@@ -23,7 +31,12 @@ from apscheduler.triggers.interval import IntervalTrigger
 import pytz
 
 from EDGAR_bot.core import config
-from EDGAR_bot.core import jobs_v2
+from EDGAR_bot.core import edgar_client, jobs_v2, metrics
+from EDGAR_bot.core.ingest_queue import INGEST_QUEUE
+from EDGAR_bot.core.poller import RollingPoller
+from EDGAR_bot.core.rate_limiter import SEC_LIMITER, make_clock
+from EDGAR_bot.core.sharding import SHARDS
+from EDGAR_bot.core.state import StateDB
 
 LOGGER = logging.getLogger("scheduler_v2")
 
@@ -95,6 +108,11 @@ def get_next_transition_time() -> datetime.datetime:
     return datetime.datetime.combine(tomorrow, EARNINGS_PERIODS[0][0], tzinfo=EST)
 
 
+async def _adaptive_run() -> None:
+    """Adaptive tick – the earnings window is re-evaluated on every run."""
+    await jobs_v2.run_once(is_earnings_period(), adaptive=True)
+
+
 class DynamicScheduler:
     """
     Manages dynamic scheduling based on earnings/cooldown periods.
@@ -105,6 +123,16 @@ class DynamicScheduler:
         self.scheduler = AsyncIOScheduler(event_loop=loop)
         self.current_job = None
         self.is_earnings_mode = None
+        self._running: set[asyncio.Task] = set()      # job runs in flight (see _tracked)
+
+    async def _tracked(self, fn, *args) -> None:
+        """Run a polling job so shutdown() can wait for it (APScheduler only cancels)."""
+        task = asyncio.current_task()
+        self._running.add(task)
+        try:
+            await fn(*args)
+        finally:
+            self._running.discard(task)
 
     def start(self):
         """Start the scheduler with initial configuration."""
@@ -125,6 +153,26 @@ class DynamicScheduler:
 
     def _update_schedule(self):
         """Update the job schedule based on current period."""
+        if config.ADAPTIVE_POLLING:
+            if self.current_job is None:
+                self.scheduler.add_job(
+                    self._tracked,
+                    trigger="interval",
+                    seconds=config.CADENCE_TICK_SECONDS,
+                    id="edgar_job_adaptive",
+                    args=[_adaptive_run],
+                    next_run_time=datetime.datetime.now(datetime.UTC),
+                    coalesce=True,
+                    max_instances=1,
+                )
+                self.current_job = "edgar_job_adaptive"
+                metrics.METRICS.set("edgar_cycle_interval_seconds", config.CADENCE_TICK_SECONDS)
+                LOGGER.info(
+                    "ADAPTIVE polling - ticking every %d seconds, per-ticker cadence",
+                    config.CADENCE_TICK_SECONDS,
+                )
+            return
+
         is_earnings = is_earnings_period()
 
         # Only update if period has changed
@@ -158,17 +206,18 @@ class DynamicScheduler:
 
         # Schedule the job with the appropriate run_once variant
         self.scheduler.add_job(
-            jobs_v2.run_once,
+            self._tracked,
             trigger="interval",
             seconds=interval_seconds,
             id=job_id,
-            args=[is_earnings],  # Pass period type to jobs
+            args=[jobs_v2.run_once, is_earnings],  # Pass period type to jobs
             next_run_time=datetime.datetime.now(datetime.UTC),
             coalesce=True,
             max_instances=1,
         )
 
         self.current_job = job_id
+        metrics.METRICS.set("edgar_cycle_interval_seconds", interval_seconds)
 
         # Log next transition time
         next_transition = get_next_transition_time()
@@ -178,22 +227,49 @@ class DynamicScheduler:
         """Periodically check if we need to update the schedule."""
         self._update_schedule()
 
-    def shutdown(self):
-        """Shutdown the scheduler."""
+    async def shutdown(self):
+        """
+        Stop scheduling new runs, let a running run_once finish (cancelled after
+        SHUTDOWN_JOB_TIMEOUT), and only then drain queued OpenAI ingestion –
+        nothing can submit to the queue once the drain has started.
+        """
+        self.scheduler.pause()
+        if self._running:
+            LOGGER.info("Waiting for %d running job(s)", len(self._running))
+            _done, pending = await asyncio.wait(set(self._running), timeout=config.SHUTDOWN_JOB_TIMEOUT)
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
         self.scheduler.shutdown(wait=False)
+        await INGEST_QUEUE.drain(config.INGEST_DRAIN_TIMEOUT)
 
 
 async def _runner() -> None:
     """
     Main async runner that manages the dynamic scheduler.
 
-    * Spin up the dynamic scheduler
+    * Attach the shared SEC limiter and claim shard leases (config.SHARDING)
+    * Warm the in-memory accession index (config.ACCESSION_INDEX)
+    * Spin up the rolling poller, or the dynamic interval scheduler
+    * Start the metrics exporter (file + optional HTTP endpoint)
     * Register signal handlers for clean shutdown
     * Park on an Event to keep the loop alive
     """
     loop = asyncio.get_running_loop()
-    scheduler = DynamicScheduler(loop)
+
+    SEC_LIMITER.use_shared(make_clock(config.SEC_LIMITER_BACKEND))
+    if SHARDS.enabled:
+        await SHARDS.start()
+
+    if config.ACCESSION_INDEX:
+        await StateDB.warm_index()
+
+    if config.POLLER_MODE == "continuous":
+        scheduler = RollingPoller(is_earnings_period)
+    else:
+        scheduler = DynamicScheduler(loop)
     scheduler.start()
+    exporter = asyncio.create_task(metrics.run_exporter(), name="metrics-exporter")
 
     # Event that we set() when a termination signal arrives
     stop_event = asyncio.Event()
@@ -207,7 +283,13 @@ async def _runner() -> None:
     await stop_event.wait()  # Blocks here until set()
 
     LOGGER.info("Shutdown signal received - stopping scheduler...")
-    scheduler.shutdown()
+    await scheduler.shutdown()
+    if SHARDS.enabled:
+        await SHARDS.stop()
+    exporter.cancel()
+    await asyncio.gather(exporter, return_exceptions=True)
+    await edgar_client.aclose()
+    await asyncio.to_thread(StateDB.shutdown_pool)
 
 
 def main() -> None:
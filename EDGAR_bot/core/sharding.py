@@ -0,0 +1,185 @@
+"""
+Sharded EDGAR polling across worker dynos (config.SHARDING).
+
+Every CIK hashes (blake2b, stable across processes and deploys) onto one of
+SHARD_COUNT virtual shards. Shards are WorkerLease rows ("edgar-shard-N")
+that a worker holds by renewing them every SHARD_LEASE_SECONDS / 3:
+
+* each worker also keeps a heartbeat lease ("edgar-worker-<WORKER_ID>"), so
+  live workers can be counted and the fair share is ceil(shards / workers);
+* a worker above its share releases the surplus, one below it claims
+  unowned or expired shards – adding a dyno moves ~1/n of the shards, a
+  dead dyno's shards are picked up once its leases expire;
+* claims and renewals are compare‑and‑set UPDATEs, so two workers can never
+  both win the same lease;
+* a worker fences itself: if its leases were last renewed more than
+  SHARD_LEASE_SECONDS − 1/3 lease ago (DB trouble, a stalled loop) it stops
+  treating any shard as owned, before a peer can claim the expired leases.
+
+jobs_v2.run_once and the rolling poller keep only the (ticker, cik) pairs
+whose shard this worker owns; with SHARDING off `owns()` is always True.
+The SEC budget is shared separately (rate_limiter.make_clock).
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import hashlib
+import logging
+import math
+import time
+from typing import Iterable, List
+
+from django.db.models import Q
+from django.utils import timezone
+
+from EDGAR_bot.core import config
+from EDGAR_bot.core.metrics import METRICS
+from EDGAR_bot.core.state import StateDB
+from EDGAR_bot.models import WorkerLease
+
+LOGGER = logging.getLogger("sharding")
+
+_SHARD  = "edgar-shard-{}"
+_WORKER = "edgar-worker-"
+
+
+def shard_of(cik: str, shards: int | None = None) -> int:
+    """Stable shard number for *cik* (leading zeros ignored)."""
+    digest = hashlib.blake2b(cik.lstrip("0").encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % (shards or config.SHARD_COUNT)
+
+
+# ───────────────────────────── lease primitives (sync, DB thread) ─────
+def _claim(name: str, owner: str, ttl: float) -> bool:
+    """Take or renew *name* if free, expired or already ours."""
+    now = timezone.now()
+    WorkerLease.objects.get_or_create(name=name)
+    return bool(
+        WorkerLease.objects
+        .filter(name=name)
+        .filter(Q(owner=owner) | Q(owner="") | Q(expires_at__isnull=True) | Q(expires_at__lt=now))
+        .update(owner=owner, expires_at=now + datetime.timedelta(seconds=ttl))
+    )
+
+
+def _release(names: Iterable[str], owner: str) -> None:
+    WorkerLease.objects.filter(name__in=list(names), owner=owner).update(owner="", expires_at=None)
+
+
+def _live_workers() -> int:
+    return WorkerLease.objects.filter(
+        name__startswith=_WORKER, expires_at__gte=timezone.now()
+    ).count()
+
+
+def _rebalance(owner: str, owned: set[int], shards: int, ttl: float) -> set[int]:
+    """One lease round: heartbeat, renew, shed surplus, claim up to the fair share."""
+    _claim(_WORKER + owner, owner, ttl)
+    fair = math.ceil(shards / max(1, _live_workers()))
+
+    owned = {s for s in owned if _claim(_SHARD.format(s), owner, ttl)}      # lost = someone took it
+    if len(owned) > fair:
+        surplus = sorted(owned)[fair:]
+        _release((_SHARD.format(s) for s in surplus), owner)
+        owned -= set(surplus)
+
+    if len(owned) < fair:
+        # start at a worker‑specific offset so newcomers don't all race for shard 0
+        offset = shard_of(owner, shards)
+        for i in range(shards):
+            s = (offset + i) % shards
+            if s in owned:
+                continue
+            if _claim(_SHARD.format(s), owner, ttl):
+                owned.add(s)
+                if len(owned) >= fair:
+                    break
+    return owned
+
+
+# ───────────────────────────── manager ────────────────────────────────
+class ShardManager:
+    def __init__(self) -> None:
+        self.owner  = config.WORKER_ID
+        self.shards = config.SHARD_COUNT
+        self.ttl    = config.SHARD_LEASE_SECONDS
+        self.owned: set[int] = set()
+        self._renewed_at = float("-inf")           # monotonic start of the last good refresh
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return config.SHARDING
+
+    def _leases_valid(self) -> bool:
+        """False once our leases may have expired – a peer could own the shards now."""
+        return time.monotonic() - self._renewed_at < self.ttl - self.ttl / 3
+
+    def _fence(self) -> None:
+        if self.owned:
+            LOGGER.error(
+                "Shard leases not renewed for %.0fs - dropping %d shard(s) until renewal succeeds",
+                time.monotonic() - self._renewed_at, len(self.owned),
+            )
+            self.owned = set()
+            METRICS.set("edgar_shards_owned", 0)
+
+    def owns(self, cik: str) -> bool:
+        if not self.enabled:
+            return True
+        return self._leases_valid() and shard_of(cik, self.shards) in self.owned
+
+    def filter(self, work: Iterable[tuple[str, str]]) -> List[tuple[str, str]]:
+        """The (ticker, cik) pairs this worker is responsible for."""
+        if not self.enabled:
+            return list(work)
+        if not self._leases_valid():
+            self._fence()
+            return []
+        return [(t, c) for t, c in work if shard_of(c, self.shards) in self.owned]
+
+    async def refresh(self) -> set[int]:
+        before  = self.owned
+        started = time.monotonic()                 # leases run from before the UPDATEs, not after
+        self.owned = await StateDB._run(_rebalance, self.owner, set(self.owned), self.shards, self.ttl)
+        self._renewed_at = started
+        if self.owned != before:
+            LOGGER.info(
+                "Worker %s now owns %d/%d shard(s) (+%d / -%d)",
+                self.owner, len(self.owned), self.shards,
+                len(self.owned - before), len(before - self.owned),
+            )
+        METRICS.set("edgar_shards_owned", len(self.owned))
+        METRICS.set("edgar_shard_workers", await StateDB._run(_live_workers))
+        return self.owned
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                await self.refresh()
+            except Exception:
+                if self._leases_valid():
+                    LOGGER.exception("Shard lease refresh failed - keeping %d shard(s) for now", len(self.owned))
+                else:
+                    LOGGER.exception("Shard lease refresh failed")
+                    self._fence()
+
+    async def start(self) -> None:
+        """Claim an initial share, then keep the leases renewed in the background."""
+        await self.refresh()
+        self._task = asyncio.create_task(self._loop(), name="edgar-shards")
+
+    async def stop(self) -> None:
+        """Stop renewing and hand every lease back so peers take over at once."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        names = [_SHARD.format(s) for s in self.owned] + [_WORKER + self.owner]
+        await StateDB._run(_release, names, self.owner)
+        LOGGER.info("Worker %s released %d shard(s)", self.owner, len(self.owned))
+        self.owned = set()
+
+
+SHARDS = ShardManager()
@@ -1,13 +1,19 @@
 """
 StateDB – wraps the Django ORM but is SAFE inside asyncio code.
+
+ORM calls run on a dedicated pool of STATE_DB_THREADS threads rather than
+`sync_to_async(thread_sensitive=True)`, which funnels every query from
+every ticker task through one shared thread. Each pool thread keeps its
+own Django connection (connections are thread‑local), recycled with
+`close_old_connections()` around every call exactly like a request cycle,
+so CONN_MAX_AGE and broken‑connection handling behave as in the web app.
 """
 from __future__ import annotations
-import datetime, logging, os
-from typing import Any
+import asyncio, concurrent.futures, datetime, logging, os, queue, threading
+from typing import Any, Callable, Iterable
 
 import django
-from asgiref.sync import sync_to_async   # ← thread‑pool helper
-from django.db import close_old_connections
+from django.db import close_old_connections, connections
 
 if not django.apps.apps.ready:
     os.environ.setdefault("DJANGO_SETTINGS_MODULE", "gamma-intelligence.settings")
@@ -19,14 +25,84 @@ from EDGAR_bot.core import config
 log = logging.getLogger("state")
 
 
+class _DBExecutor:
+    """Fixed pool of DB threads; each closes its own connections on shutdown."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._q: queue.SimpleQueue = queue.SimpleQueue()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"edgar-db-{i}", daemon=True)
+            for i in range(size)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def _worker(self) -> None:
+        while True:
+            item = self._q.get()
+            if item is None:
+                connections.close_all()            # this thread's connections only
+                return
+            fut, func, args, kwargs = item
+            if not fut.set_running_or_notify_cancel():
+                continue
+            close_old_connections()                # drop expired / broken connections
+            try:
+                fut.set_result(func(*args, **kwargs))
+            except BaseException as exc:
+                fut.set_exception(exc)
+            finally:
+                close_old_connections()
+
+    def submit(self, func: Callable, *args: Any, **kwargs: Any) -> concurrent.futures.Future:
+        fut: concurrent.futures.Future = concurrent.futures.Future()
+        self._q.put((fut, func, args, kwargs))
+        return fut
+
+    def shutdown(self) -> None:
+        """Finish queued calls, close every thread's connection, join."""
+        for _ in self._threads:
+            self._q.put(None)
+        for t in self._threads:
+            t.join()
+
+
+_executor: _DBExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> _DBExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # SQLite has a single writer (and shared‑cache test DBs ignore the
+            # busy timeout), so extra threads only trade waits for lock errors
+            size = 1 if connections["default"].vendor == "sqlite" else config.STATE_DB_THREADS
+            _executor = _DBExecutor(max(1, size))
+            log.debug("Started %d StateDB thread(s)", _executor.size)
+        return _executor
+
+
 class StateDB:
     """
     Async‑capable API:
         await state.seen(...)
+        await state.seen_many(...)
         await state.mark_processed(...)
-        await state.add_file_id(...)
+        await state.add_file_id(...) / await state.add_file_ids(...)
+        await state.files_for_accession(...)
+        await state.files_for_hashes(...)
+
+    Optional accession index: after `await StateDB.warm_index()` every
+    instance answers "already processed" from a process‑lifetime set of
+    (cik, accession) pairs. Misses still go to the DB (another process may
+    have written the row) and any DB hit is folded back into the set.
     """
 
+    _index: set[tuple[str, str]] | None = None      # shared by all instances
+    _index_lock = threading.Lock()
+
     def __init__(self, *_a: Any, **_kw: Any) -> None:
         self.db_label = f"Django‑ORM ({config.ENV})"
         log.debug("Opened state DB via %s", self.db_label)
@@ -34,14 +110,56 @@ class StateDB:
     # ─────────────────────────── helpers ──────────────────────────────
     @staticmethod
     def _run(func, *args, **kwargs):
-        """Run blocking ORM code in the thread‑pool."""
-        return sync_to_async(func, thread_sensitive=True)(*args, **kwargs)
+        """Run blocking ORM code on the StateDB thread‑pool."""
+        return asyncio.wrap_future(_get_executor().submit(func, *args, **kwargs))
+
+    @classmethod
+    def _remember(cls, cik: str, accessions: Iterable[str]) -> None:
+        if cls._index is None:
+            return
+        with cls._index_lock:
+            cls._index.update((cik, acc) for acc in accessions)
+
+    @classmethod
+    def _known(cls, cik: str, accessions: Iterable[str]) -> set[str]:
+        if cls._index is None:
+            return set()
+        with cls._index_lock:
+            return {acc for acc in accessions if (cik, acc) in cls._index}
+
+    # ─────────────────────────── index ─────────────────────────────────
+    @classmethod
+    async def warm_index(cls) -> int:
+        """Load every processed (cik, accession) into memory; return the count."""
+        pairs = await cls._run(
+            lambda: set(ProcessedFiling.objects.values_list("cik", "accession"))
+        )
+        with cls._index_lock:
+            cls._index = pairs if cls._index is None else cls._index | pairs
+        log.info("Warmed accession index (%d filings)", len(pairs))
+        return len(pairs)
 
     # ─────────────────────────── public API ────────────────────────────
     async def seen(self, cik: str, accession: str) -> bool:
-        return await self._run(
-            lambda: ProcessedFiling.objects.filter(cik=cik, accession=accession).exists()
+        return accession in await self.seen_many(cik, [accession])
+
+    async def seen_many(self, cik: str, accessions: Iterable[str]) -> set[str]:
+        """Subset of *accessions* already processed for *cik* (≤ 1 query)."""
+        wanted = set(accessions)
+        hits   = self._known(cik, wanted)
+        missing = wanted - hits
+        if not missing:
+            return hits
+
+        found = await self._run(
+            lambda: set(
+                ProcessedFiling.objects
+                .filter(cik=cik, accession__in=missing)
+                .values_list("accession", flat=True)
+            )
         )
+        self._remember(cik, found)
+        return hits | found
 
     async def mark_processed(
         self,
@@ -56,6 +174,7 @@ class StateDB:
             accession=accession,
             defaults={"ticker": ticker, "filing_date": filing_date},
         )
+        self._remember(cik, [accession])
 
     async def add_file_id(
         self,
@@ -74,6 +193,63 @@ class StateDB:
             defaults={"file_id": file_id},
         )
 
+    async def files_for_accession(self, accession: str) -> dict[tuple[str, int], str]:
+        """{(filename, vector_group_id): file_id} for one accession – one query."""
+        return await self._run(
+            lambda: {
+                (fn, gid): fid
+                for fn, gid, fid in ProcessedFile.objects
+                .filter(accession=accession)
+                .values_list("filename", "vector_group_id", "file_id")
+            }
+        )
+
+    async def files_for_hashes(self, hashes: Iterable[str]) -> dict[str, dict[int, str]]:
+        """{content_sha256: {vector_group_id: file_id}} for already uploaded content – one query."""
+        wanted = {h for h in hashes if h}
+        if not wanted:
+            return {}
+
+        def _query() -> dict[str, dict[int, str]]:
+            out: dict[str, dict[int, str]] = {}
+            for sha, gid, fid in (
+                ProcessedFile.objects
+                .filter(content_sha256__in=wanted)
+                .values_list("content_sha256", "vector_group_id", "file_id")
+            ):
+                out.setdefault(sha, {})[gid] = fid
+            return out
+
+        return await self._run(_query)
+
+    async def add_file_ids(self, rows: Iterable[tuple[str, str, str, str, int, str]]) -> None:
+        """
+        Bulk add_file_id: rows of
+        (cik, accession, filename, file_id, vector_group_id, content_sha256).
+        """
+        objs = [
+            ProcessedFile(
+                cik=cik, accession=acc, filename=fn, file_id=fid,
+                vector_group_id=gid, content_sha256=sha,
+            )
+            for cik, acc, fn, fid, gid, sha in rows
+        ]
+        if objs:
+            await self._run(ProcessedFile.objects.bulk_create, objs, ignore_conflicts=True)
+
     # housekeeping (no‑op in async world, but keeps old callers happy)
     def close(self) -> None:                # noqa: D401
         close_old_connections()
+
+    @staticmethod
+    def shutdown_pool() -> None:
+        """
+        Close the pool's DB connections at process exit. Blocks until queued
+        calls finish, so call it after the ingest queue has drained; a later
+        StateDB call simply starts a fresh pool.
+        """
+        global _executor
+        with _executor_lock:
+            ex, _executor = _executor, None
+        if ex is not None:
+            ex.shutdown()
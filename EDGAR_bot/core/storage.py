@@ -0,0 +1,261 @@
+"""
+Filing storage sinks – where downloaded SEC documents end up.
+
+* LocalSink – plain files under DATA_DIR (local dev).
+* S3Sink    – streams HTTP bodies straight into S3 (multipart once a body
+              outgrows one part) through one pooled boto3 client per process.
+              A local copy is written through only if LOCAL_WRITE_THROUGH is
+              set; `release()` drops it again once ingestion is done, so dyno
+              disk usage stays bounded.
+
+Every sink is addressed by the *local* Path a file would have; the S3 key
+is derived from its last three parts (cik/accession/filename), matching
+what ingest_openai already relies on.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Iterable
+
+from EDGAR_bot.core import config
+
+log = logging.getLogger("storage")
+
+
+# ───────────────────────────── local ──────────────────────────────────
+class _LocalWriter:
+    """Write to <path>.part, rename on success, delete on failure."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._tmp = path.with_name(path.name + ".part")
+        self._fh  = None
+
+    def open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = self._tmp.open("wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._fh.write(chunk)
+
+    def commit(self) -> None:
+        self._fh.close()
+        self._tmp.replace(self.path)
+
+    def abort(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+class FilingSink:
+    """Base sink: local files only."""
+
+    keeps_local = True
+
+    def writer(self, path: Path) -> "_SinkWriter":
+        return _SinkWriter(self, path)
+
+    # hooks used by _SinkWriter
+    def _local_writer(self, path: Path) -> _LocalWriter | None:
+        return _LocalWriter(path)
+
+    async def _remote_write(self, state: dict, chunk: bytes) -> None:
+        return None
+
+    async def _remote_commit(self, state: dict) -> None:
+        return None
+
+    async def _remote_abort(self, state: dict) -> None:
+        return None
+
+    def _remote_state(self, path: Path) -> dict:
+        return {}
+
+    # used by ingestion
+    async def ensure_local(self, path: Path) -> Path:
+        return path
+
+    def release(self, paths: Iterable[Path]) -> None:
+        return None
+
+
+class LocalSink(FilingSink):
+    pass
+
+
+class _SinkWriter:
+    """
+    Async context manager handed out by `FilingSink.writer()`:
+
+        async with sink.writer(path) as w:
+            async for chunk in resp.aiter_bytes():
+                await w.write(chunk)
+
+    Commits on clean exit, aborts (local .part + S3 multipart) on error.
+    """
+
+    def __init__(self, sink: FilingSink, path: Path) -> None:
+        self.sink   = sink
+        self.path   = path
+        self._local = sink._local_writer(path)
+        self._state = sink._remote_state(path)
+
+    async def __aenter__(self) -> "_SinkWriter":
+        if self._local is not None:
+            self._local.open()
+        return self
+
+    async def write(self, chunk: bytes) -> None:
+        if self._local is not None:
+            self._local.write(chunk)
+        await self.sink._remote_write(self._state, chunk)
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.sink._remote_commit(self._state)
+            if self._local is not None:
+                self._local.commit()
+            return
+        if self._local is not None:
+            self._local.abort()
+        await self.sink._remote_abort(self._state)
+
+
+# ───────────────────────────── S3 ─────────────────────────────────────
+_s3 = None
+_s3_lock = threading.Lock()
+
+
+def s3_client():
+    """One pooled (thread‑safe) boto3 S3 client per process."""
+    global _s3
+    with _s3_lock:
+        if _s3 is None:
+            import boto3
+            from botocore.config import Config
+
+            _s3 = boto3.client(
+                "s3",
+                config=Config(max_pool_connections=config.S3_MAX_POOL_CONNECTIONS),
+            )
+        return _s3
+
+
+class S3Sink(FilingSink):
+    def __init__(self, bucket: str, prefix: str, write_through: bool) -> None:
+        self.bucket      = bucket
+        self.prefix      = prefix.rstrip("/")
+        self.keeps_local = write_through
+        self.part_size   = config.S3_MULTIPART_CHUNK
+
+    def key_for(self, path: Path) -> str:
+        return "/".join((self.prefix, *path.parts[-3:]))
+
+    # ── writer hooks ──────────────────────────────────────────────────
+    def _local_writer(self, path: Path) -> _LocalWriter | None:
+        return _LocalWriter(path) if self.keeps_local else None
+
+    def _remote_state(self, path: Path) -> dict:
+        return {
+            "key": self.key_for(path),
+            "buf": bytearray(),
+            "upload_id": None,
+            "parts": [],
+            "inflight": None,          # at most one part uploading while we keep reading
+        }
+
+    async def _upload_part(self, st: dict) -> None:
+        client = s3_client()
+        if st["upload_id"] is None:
+            resp = await asyncio.to_thread(
+                client.create_multipart_upload, Bucket=self.bucket, Key=st["key"]
+            )
+            st["upload_id"] = resp["UploadId"]
+
+        if st["inflight"] is not None:
+            st["parts"].append(await st["inflight"])
+
+        number   = len(st["parts"]) + 1
+        body     = bytes(st["buf"])
+        st["buf"].clear()
+
+        async def _send() -> dict:
+            resp = await asyncio.to_thread(
+                client.upload_part,
+                Bucket=self.bucket, Key=st["key"], UploadId=st["upload_id"],
+                PartNumber=number, Body=body,
+            )
+            return {"PartNumber": number, "ETag": resp["ETag"]}
+
+        st["inflight"] = asyncio.ensure_future(_send())
+
+    async def _remote_write(self, st: dict, chunk: bytes) -> None:
+        st["buf"] += chunk
+        if len(st["buf"]) >= self.part_size:
+            await self._upload_part(st)
+
+    async def _remote_commit(self, st: dict) -> None:
+        client = s3_client()
+        if st["upload_id"] is None:                 # small body → one PUT
+            await asyncio.to_thread(
+                client.put_object, Bucket=self.bucket, Key=st["key"], Body=bytes(st["buf"])
+            )
+        else:
+            if st["buf"]:
+                await self._upload_part(st)         # last part may be < 5 MB
+            st["parts"].append(await st["inflight"])
+            await asyncio.to_thread(
+                client.complete_multipart_upload,
+                Bucket=self.bucket, Key=st["key"], UploadId=st["upload_id"],
+                MultipartUpload={"Parts": st["parts"]},
+            )
+        log.info("Stored s3://%s/%s", self.bucket, st["key"])
+
+    async def _remote_abort(self, st: dict) -> None:
+        if st["inflight"] is not None:
+            await asyncio.gather(st["inflight"], return_exceptions=True)
+        if st["upload_id"] is not None:
+            try:
+                await asyncio.to_thread(
+                    s3_client().abort_multipart_upload,
+                    Bucket=self.bucket, Key=st["key"], UploadId=st["upload_id"],
+                )
+            except Exception as exc:
+                log.warning("Abort multipart %s failed: %s", st["key"], exc)
+
+    # ── ingestion hooks ───────────────────────────────────────────────
+    async def ensure_local(self, path: Path) -> Path:
+        if path.exists():
+            return path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(
+            s3_client().download_file, self.bucket, self.key_for(path), str(path)
+        )
+        return path
+
+    def release(self, paths: Iterable[Path]) -> None:
+        """S3 is the source of truth – drop local copies once ingested."""
+        for p in paths:
+            p.unlink(missing_ok=True)
+
+
+# ───────────────────────────── factory ────────────────────────────────
+_sink: FilingSink | None = None
+
+
+def get_sink() -> FilingSink:
+    global _sink
+    if _sink is None:
+        if config.STORAGE_BACKEND == "s3":
+            _sink = S3Sink(
+                os.environ["S3_BUCKET"], config.S3_KEY_PREFIX, config.LOCAL_WRITE_THROUGH
+            )
+        else:
+            _sink = LocalSink()
+        log.info("Filing storage: %s", type(_sink).__name__)
+    return _sink
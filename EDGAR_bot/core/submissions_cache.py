@@ -0,0 +1,108 @@
+"""
+Conditional‑GET cache for SEC submissions JSON.
+
+Keeps the validators (ETag / Last‑Modified) and the already‑parsed
+`filings.recent` rows per CIK – in memory, written through to
+CACHE_DIR/submissions/CIK##########.json so a restart stays warm.
+On a 304 the caller reuses the cached rows and skips download + parse.
+"""
+from __future__ import annotations
+
+import datetime
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List
+
+from EDGAR_bot.core import config
+
+log = logging.getLogger("submissions_cache")
+
+CACHE_ROOT = Path(config.CACHE_DIR) / "submissions"
+CACHE_ROOT.mkdir(parents=True, exist_ok=True)
+
+
+@dataclass
+class CachedSubmissions:
+    etag:          str | None
+    last_modified: str | None
+    rows:          List[Dict] = field(default_factory=list)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        hdrs: Dict[str, str] = {}
+        if self.etag:
+            hdrs["If-None-Match"] = self.etag
+        if self.last_modified:
+            hdrs["If-Modified-Since"] = self.last_modified
+        return hdrs
+
+    def copy_rows(self) -> List[Dict]:
+        """Fresh dicts – callers annotate rows (e.g. row["ticker"])."""
+        return [dict(r) for r in self.rows]
+
+
+class SubmissionsCache:
+    """Two‑level (dict → disk) cache keyed by 10‑digit CIK."""
+
+    def __init__(self, root: Path = CACHE_ROOT) -> None:
+        self.root   = root
+        self._mem: Dict[str, CachedSubmissions] = {}
+        self._lock  = threading.Lock()
+
+    # ─────────────────────────── helpers ──────────────────────────────
+    def _path(self, cik: str) -> Path:
+        return self.root / f"CIK{cik}.json"
+
+    def _load(self, cik: str) -> CachedSubmissions | None:
+        path = self._path(cik)
+        if not path.exists():
+            return None
+        try:
+            with path.open(encoding="utf-8") as fh:
+                raw = json.load(fh)
+            rows = [
+                {**r, "filing_date": datetime.date.fromisoformat(r["filing_date"])}
+                for r in raw["rows"]
+            ]
+            return CachedSubmissions(raw.get("etag"), raw.get("last_modified"), rows)
+        except Exception:
+            log.warning("Submissions cache for %s corrupted – ignoring", cik)
+            return None
+
+    def _dump(self, cik: str, entry: CachedSubmissions) -> None:
+        payload = {
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "rows": [{**r, "filing_date": r["filing_date"].isoformat()} for r in entry.rows],
+        }
+        tmp = self._path(cik).with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            json.dump(payload, fh)
+        tmp.replace(self._path(cik))                # atomic swap
+
+    # ─────────────────────────── public API ────────────────────────────
+    def get(self, cik: str) -> CachedSubmissions | None:
+        with self._lock:
+            entry = self._mem.get(cik)
+        if entry is not None:
+            return entry
+        entry = self._load(cik)
+        if entry is not None:
+            with self._lock:
+                self._mem[cik] = entry
+        return entry
+
+    def put(self, cik: str, etag: str | None, last_modified: str | None, rows: List[Dict]) -> None:
+        entry = CachedSubmissions(etag, last_modified, rows)
+        with self._lock:
+            self._mem[cik] = entry
+        if etag or last_modified:                   # nothing to revalidate with otherwise
+            try:
+                self._dump(cik, entry)
+            except OSError as exc:
+                log.warning("Could not persist submissions cache for %s: %s", cik, exc)
+
+
+SUBMISSIONS_CACHE = SubmissionsCache()
@@ -0,0 +1,192 @@
+"""
+Change‑aware target‑ticker provider for jobs_v2.
+
+The CSV master list is re‑read only when the file changes, the Watchlist
+only when its (max(updated_at), row count) fingerprint changes or a
+Watchlist save/delete signal fires in this process. Callers get a frozen
+TargetSet with a precomputed (ticker, cik) work list, so per‑cycle
+planning is one cheap aggregate query.
+"""
+from __future__ import annotations
+
+import csv
+import datetime
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Mapping
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from EDGAR_bot.core import config, ticker_map
+from EDGAR_bot.models import Watchlist
+
+LOGGER = logging.getLogger("targets")
+
+
+@dataclass(frozen=True)
+class TargetSet:
+    tickers: frozenset[str]
+    work:    tuple[tuple[str, str], ...]      # (ticker, cik) – one entry per CIK
+    ciks:    frozenset[str]
+    source:  str                              # "watchlist" | "csv" | "universe"
+    earnings_dates: Mapping[str, datetime.date]   # active Watchlist ticker → earnings_date
+
+
+class TargetProvider:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+        self._csv_stamp: tuple[int, int] | None = None
+        self._csv_order: tuple[str, ...] = ()
+        self._csv_set:   frozenset[str] = frozenset()
+
+        self._wl_stamp: tuple | None = None
+        self._wl_dirty = True
+        self._wl_rows:  tuple[tuple[str, str | None], ...] = ()   # active (ticker, cik)
+        self._wl_dates: Dict[str, datetime.date] = {}
+
+        self._sec_map: Dict[str, str] | None = None
+        self._built:   Dict[tuple[bool, bool], TargetSet] = {}
+
+    # ─────────────────────────── sources ──────────────────────────────
+    def _refresh_csv(self) -> bool:
+        st    = os.stat(config.TICKER_CSV)
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._csv_stamp:
+            return False
+
+        order: list[str] = []
+        seen:  set[str]  = set()
+        with config.TICKER_CSV.open() as fh:
+            for row in csv.reader(fh):
+                t = row[0].strip().upper() if row else ""
+                if t and t not in seen:
+                    seen.add(t)
+                    order.append(t)
+
+        self._csv_stamp = stamp
+        self._csv_order = tuple(sorted(order))
+        self._csv_set   = frozenset(order)
+        LOGGER.info("Loaded %d tickers from %s", len(order), config.TICKER_CSV.name)
+        return True
+
+    def _refresh_watchlist(self) -> bool:
+        try:
+            stamp = tuple(
+                Watchlist.objects.aggregate(m=Max("updated_at"), n=Count("id")).values()
+            )
+            if stamp == self._wl_stamp and not self._wl_dirty:
+                return False
+
+            active = list(
+                Watchlist.objects.filter(is_active=True)
+                .values_list("ticker", "cik", "earnings_date")
+            )
+        except Exception as e:
+            LOGGER.error("Error retrieving Watchlist tickers: %s", e)
+            return False                    # keep serving the last good snapshot
+
+        self._wl_stamp = stamp
+        self._wl_dirty = False
+        self._wl_rows  = tuple((t.upper(), c) for t, c, _d in active)
+        self._wl_dates = {t.upper(): d for t, _c, d in active if d}
+        LOGGER.info("Loaded %d active Watchlist tickers", len(active))
+        return True
+
+    def invalidate_watchlist(self) -> None:
+        self._wl_dirty = True
+
+    # ─────────────────────────── planning ─────────────────────────────
+    def _plan(self, pairs: List[tuple[str, str | None]], source: str) -> TargetSet:
+        sec_map = self._sec_map or {}
+        work: list[tuple[str, str]] = []
+        by_cik: Dict[str, str] = {}
+        missing: list[str] = []
+
+        for t, cik in pairs:
+            cik = cik.zfill(10) if cik else sec_map.get(t)
+            if cik is None:
+                missing.append(t)
+                continue
+            if cik in by_cik:
+                LOGGER.debug(
+                    "CIK %s shared by %s - polling once as %s",
+                    cik, ", ".join(ticker_map.cik_to_tickers().get(cik, ())), by_cik[cik],
+                )
+                continue
+            by_cik[cik] = t
+            work.append((t, cik))
+
+        if missing:
+            LOGGER.warning(
+                "Ticker(s) not found in SEC map and will be skipped: %s", ", ".join(missing)
+            )
+        return TargetSet(
+            tickers=frozenset(t for t, _ in pairs),
+            work=tuple(work),
+            ciks=frozenset(by_cik),
+            source=source,
+            earnings_dates=dict(self._wl_dates),
+        )
+
+    def _build(self, is_earnings_period: bool, universe: bool) -> TargetSet:
+        csv_pairs = [(t, None) for t in self._csv_order]
+        if not (is_earnings_period or universe):
+            return self._plan(csv_pairs, "csv")
+
+        # Watchlist rows are valid if they're in the CSV or carry their own CIK
+        valid   = [(t, c) for t, c in self._wl_rows if t in self._csv_set or c]
+        invalid = sorted(t for t, c in self._wl_rows if not (t in self._csv_set or c))
+        if invalid:
+            LOGGER.warning(
+                "Watchlist tickers not found in CSV (and no CIK) will be skipped: %s",
+                ", ".join(invalid),
+            )
+        if universe:
+            # Watchlist entries first so their stored CIK wins the per‑CIK dedupe
+            in_wl = {t for t, _ in valid}
+            extra = [(t, None) for t in self._csv_order if t not in in_wl]
+            return self._plan(sorted(valid) + extra, "universe")
+        if valid:
+            return self._plan(sorted(valid), "watchlist")
+
+        LOGGER.info("Watchlist empty or invalid - using full CSV list")
+        return self._plan(csv_pairs, "csv")
+
+    def get_sync(self, is_earnings_period: bool, universe: bool = False) -> TargetSet:
+        """
+        Cached TargetSet for the period. *universe* = CSV ∪ Watchlist
+        regardless of period (used by adaptive per‑ticker polling).
+        """
+        with self._lock:
+            changed  = self._refresh_csv()
+            changed |= (is_earnings_period or universe) and self._refresh_watchlist()
+
+            sec_map = ticker_map.build_ticker_to_cik_map()
+            if sec_map is not self._sec_map:
+                self._sec_map = sec_map
+                changed = True
+
+            if changed:
+                self._built.clear()
+            key = (is_earnings_period, universe)
+            if key not in self._built:
+                self._built[key] = self._build(is_earnings_period, universe)
+            return self._built[key]
+
+    async def get(self, is_earnings_period: bool, universe: bool = False) -> TargetSet:
+        return await sync_to_async(self.get_sync)(is_earnings_period, universe)
+
+
+TARGETS = TargetProvider()
+
+
+@receiver(post_save, sender=Watchlist)
+@receiver(post_delete, sender=Watchlist)
+def _watchlist_changed(**_kw) -> None:
+    TARGETS.invalidate_watchlist()
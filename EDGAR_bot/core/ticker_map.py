@@ -7,6 +7,8 @@ import csv
 import json
 import logging
 import re
+import threading
+import time
 from pathlib import Path
 from typing import Dict
 from importlib import resources
@@ -14,6 +16,7 @@ from importlib import resources
 import requests
 
 from EDGAR_bot.core import config
+from EDGAR_bot.core.rate_limiter import SEC_LIMITER
 
 LOGGER = logging.getLogger("ticker_map")
 
@@ -46,6 +49,7 @@ def _parse_line(line: str) -> tuple[str, str] | None:
 def _download_sec_ticker_file() -> Dict[str, str]:
     """Primary txt → fallback JSON, with verbose logging."""
     def _fetch(u: str) -> str:
+        SEC_LIMITER.acquire_sync()          # same sec.gov budget as the async clients
         r = requests.get(u, headers=config.HEADERS, timeout=config.REQUEST_TIMEOUT)
         r.raise_for_status()
         return r.text
@@ -65,21 +69,105 @@ def _download_sec_ticker_file() -> Dict[str, str]:
     return mapping
 
 
+# ───────────────────────── process‑level memo ─────────────────────────────
+_memo_lock   = threading.Lock()
+_memo: Dict[str, str] = {}
+_reverse: Dict[str, tuple[str, ...]] = {}
+_memo_mtime: float | None = None
+_refreshing  = False
+_failed_at: float | None = None     # monotonic time of the last failed background refresh
+
+
+def _write_cache(mapping: Dict[str, str]) -> None:
+    tmp = CACHE_PATH.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as fh:
+        json.dump(mapping, fh)
+    tmp.replace(CACHE_PATH)                 # atomic – readers never see half a file
+    LOGGER.info("Cached SEC ticker map (%d rows)", len(mapping))
+
+
+def _install(mapping: Dict[str, str], mtime: float | None) -> None:
+    global _memo, _reverse, _memo_mtime
+    reverse: Dict[str, list[str]] = {}
+    for t, c in mapping.items():
+        reverse.setdefault(c, []).append(t)
+    with _memo_lock:
+        _memo       = mapping
+        _reverse    = {c: tuple(sorted(ts)) for c, ts in reverse.items()}
+        _memo_mtime = mtime
+
+
+def _refresh_in_background() -> None:
+    """Re‑download the SEC map on a daemon thread; callers keep the old memo meanwhile."""
+    global _refreshing
+    with _memo_lock:
+        if _refreshing:
+            return
+        if _failed_at is not None and time.monotonic() - _failed_at < config.TICKER_MAP_RETRY_MINUTES * 60:
+            return                          # SEC down / blocking us – don't retry on every lookup
+        _refreshing = True
+
+    def _work() -> None:
+        global _refreshing, _failed_at
+        try:
+            _write_cache(_download_sec_ticker_file())
+            _failed_at = None
+        except Exception:
+            _failed_at = time.monotonic()
+            LOGGER.exception(
+                "Background SEC ticker map refresh failed – retrying in %d min",
+                config.TICKER_MAP_RETRY_MINUTES,
+            )
+        finally:
+            with _memo_lock:
+                _refreshing = False
+
+    threading.Thread(target=_work, name="ticker-map-refresh", daemon=True).start()
+
+
 def build_ticker_to_cik_map() -> Dict[str, str]:
-    if CACHE_PATH.exists():
+    """
+    TICKER → 10‑digit CIK, memoised per process.
+
+    * The cache file is only re‑read when its mtime changes.
+    * Once the file is older than TICKER_MAP_TTL_HOURS a background refresh
+      rewrites it (new listings get picked up); the current map keeps
+      serving until the new file lands. A failed refresh is retried after
+      TICKER_MAP_RETRY_MINUTES, not on the next lookup.
+    * Only a missing / corrupt cache blocks on a download.
+    """
+    try:
+        mtime = CACHE_PATH.stat().st_mtime
+    except FileNotFoundError:
+        mtime = None
+
+    if mtime is not None and mtime == _memo_mtime:
+        if time.time() - mtime > config.TICKER_MAP_TTL_HOURS * 3600:
+            _refresh_in_background()
+        return _memo
+
+    if mtime is not None:
         try:
             with CACHE_PATH.open(encoding="utf-8") as fh:
                 cached = json.load(fh)
+            _install(cached, mtime)
             LOGGER.info("Loaded SEC ticker map from cache (%d rows)", len(cached))
-            return cached
+            if time.time() - mtime > config.TICKER_MAP_TTL_HOURS * 3600:
+                _refresh_in_background()
+            return _memo
         except Exception:
             LOGGER.exception("Cache corrupted – refreshing")
 
     mapping = _download_sec_ticker_file()
-    with CACHE_PATH.open("w", encoding="utf-8") as fh:
-        json.dump(mapping, fh)
-    LOGGER.info("Cached SEC ticker map (%d rows)", len(mapping))
-    return mapping
+    _write_cache(mapping)
+    _install(mapping, CACHE_PATH.stat().st_mtime)
+    return _memo
+
+
+def cik_to_tickers() -> Dict[str, tuple[str, ...]]:
+    """Reverse index CIK → all tickers sharing it (GOOG/GOOGL, share classes)."""
+    build_ticker_to_cik_map()
+    return _reverse
 
 
 def load_target_tickers(csv_path: Path) -> list[str]:
@@ -0,0 +1,239 @@
+"""
+Local XBRL fact store built from SEC companyfacts (`manage.py edgar_xbrl_sync`).
+
+Sync – per CIK, one conditional GET of
+`data.sec.gov/api/xbrl/companyfacts/CIK##########.json` (validators kept in
+XbrlSync, so an unchanged company costs a 304 and nothing else). A changed
+document is parsed off the event loop, narrowed to config.XBRL_CONCEPTS and
+to facts filed on/after the CIK's stored `last_filed`, de‑duplicated to the
+latest filed value per (concept, unit, period) and bulk‑upserted into
+XbrlFact – restatements overwrite, everything older is left untouched.
+The sync runs in its own process capped at XBRL_MAX_REQUESTS_PER_SECOND and
+inside the shared SEC budget (rate_limiter.throttle_background), like the
+backfill, so it never adds to the live poller's request rate.
+
+Query – plain indexed ORM reads, safe to call from request handlers or agent
+tools without touching sec.gov:
+
+    series("AAPL", "Revenues")                 # quarterly, oldest → newest
+    series("AAPL", "Revenues", period="FY")
+    latest("AAPL", "dei:EntityCommonStockSharesOutstanding", unit="shares", period="I")
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+
+from asgiref.sync import sync_to_async
+
+from EDGAR_bot.core import config, edgar_client, ticker_map
+from EDGAR_bot.core.rate_limiter import throttle_background
+from EDGAR_bot.core.state import StateDB
+from EDGAR_bot.core.targets import TARGETS
+from EDGAR_bot.models import XbrlFact, XbrlSync
+
+LOGGER = logging.getLogger("xbrl_facts")
+
+# period classification by duration in days
+_QUARTER = range(80, 101)
+_NINE_MO = range(260, 281)
+_YEAR    = range(350, 381)
+
+_UPSERT_FIELDS = ["ticker", "value", "fy", "fp", "form", "filed", "accession"]
+
+
+def _qualify(concept: str) -> str:
+    return concept if ":" in concept else f"us-gaap:{concept}"
+
+
+# ───────────────────────────── sync ───────────────────────────────────
+def _extract(data: Dict, since: datetime.date | None) -> Dict[tuple, Dict]:
+    """(concept, unit, start, end) → latest‑filed fact dict, filed >= *since*."""
+    wanted = {_qualify(c) for c in config.XBRL_CONCEPTS} if config.XBRL_CONCEPTS else None
+    out: Dict[tuple, Dict] = {}
+    for taxonomy, concepts in (data.get("facts") or {}).items():
+        for name, body in concepts.items():
+            concept = f"{taxonomy}:{name}"
+            if wanted is not None and concept not in wanted:
+                continue
+            for unit, facts in body.get("units", {}).items():
+                for f in facts:
+                    try:
+                        filed = datetime.date.fromisoformat(f["filed"])
+                        end   = datetime.date.fromisoformat(f["end"])
+                        start = datetime.date.fromisoformat(f["start"]) if f.get("start") else end
+                    except (KeyError, ValueError):
+                        continue
+                    if since is not None and filed < since:
+                        continue
+                    key  = (concept, unit[:30], start, end)
+                    prev = out.get(key)
+                    if prev is None or filed >= prev["filed"]:
+                        out[key] = {
+                            "value": float(f["val"]), "fy": f.get("fy"), "fp": f.get("fp") or "",
+                            "form": f.get("form") or "", "filed": filed, "accession": f.get("accn", ""),
+                        }
+    return out
+
+
+def _upsert(ticker: str, cik: str, facts: Dict[tuple, Dict],
+            etag: str | None, last_modified: str | None) -> None:
+    XbrlFact.objects.bulk_create(
+        [
+            XbrlFact(cik=cik, ticker=ticker, concept=concept, unit=unit,
+                     period_start=start, period_end=end, **f)
+            for (concept, unit, start, end), f in facts.items()
+        ],
+        batch_size=2_000,
+        update_conflicts=True,
+        unique_fields=["cik", "concept", "unit", "period_start", "period_end"],
+        update_fields=_UPSERT_FIELDS,
+    )
+    cursor, _ = XbrlSync.objects.get_or_create(cik=cik)
+    cursor.etag          = etag or ""
+    cursor.last_modified = last_modified or ""
+    if facts:
+        cursor.last_filed = max([f["filed"] for f in facts.values()] + [cursor.last_filed or datetime.date.min])
+    cursor.facts = XbrlFact.objects.filter(cik=cik).count()
+    cursor.save()
+
+
+async def sync_cik(ticker: str, cik: str) -> int:
+    """Fetch + upsert one company; returns the number of facts written."""
+    cursor = await XbrlSync.objects.filter(cik=cik).afirst()
+    data, etag, last_modified = await edgar_client.fetch_company_facts(
+        cik,
+        cursor.etag if cursor else None,
+        cursor.last_modified if cursor else None,
+    )
+    if data is None:
+        LOGGER.debug("companyfacts for %s (%s) unchanged / absent", ticker, cik)
+        return 0
+
+    facts = await asyncio.to_thread(_extract, data, cursor.last_filed if cursor else None)
+    await sync_to_async(_upsert)(ticker, cik, facts, etag, last_modified)
+    LOGGER.info("XBRL %s (%s): %d fact(s) upserted", ticker, cik, len(facts))
+    return len(facts)
+
+
+async def sync_all(work: Iterable[tuple[str, str]], workers: int | None = None) -> int:
+    sem   = asyncio.Semaphore(workers or config.XBRL_SYNC_CONCURRENCY)
+    total = 0
+
+    async def _one(ticker: str, cik: str) -> None:
+        nonlocal total
+        async with sem:
+            try:
+                total += await sync_cik(ticker, cik)
+            except Exception as exc:
+                LOGGER.error("XBRL sync failed for %s (%s): %s", ticker, cik, exc)
+
+    # several tickers can share a CIK (share classes) – fetch each CIK once
+    unique = {cik: ticker for ticker, cik in reversed(list(work))}
+    await asyncio.gather(*(_one(t, cik) for cik, t in unique.items()))
+    return total
+
+
+def main(tickers: Iterable[str] | None = None, workers: int | None = None,
+         rate: float | None = None) -> int:
+    throttle_background(rate or config.XBRL_MAX_REQUESTS_PER_SECOND, explicit=rate is not None)
+
+    async def _run() -> int:
+        try:
+            if tickers:
+                sec_map = await sync_to_async(ticker_map.build_ticker_to_cik_map)()
+                work = [(t, sec_map[t]) for t in tickers if t in sec_map]
+            else:
+                work = list((await TARGETS.get(False, universe=True)).work)
+            LOGGER.info("Syncing XBRL company facts for %d ticker(s)", len(work))
+            return await sync_all(work, workers)
+        finally:
+            await edgar_client.aclose()
+            await asyncio.to_thread(StateDB.shutdown_pool)     # DBClock reservations use it
+
+    return asyncio.run(_run())
+
+
+# ───────────────────────────── query ──────────────────────────────────
+@dataclass(frozen=True)
+class Fact:
+    concept:   str
+    unit:      str
+    start:     datetime.date
+    end:       datetime.date
+    value:     float
+    fy:        int | None
+    fp:        str
+    form:      str
+    filed:     datetime.date
+    accession: str
+
+    @property
+    def days(self) -> int:
+        """Period length; 0 for instant facts."""
+        return (self.end - self.start).days
+
+
+def _rows(ticker: str, concept: str, unit: str) -> List[Fact]:
+    qs = XbrlFact.objects.filter(ticker=ticker.upper(), concept=concept, unit=unit)
+    if not qs.exists():
+        cik = ticker_map.build_ticker_to_cik_map().get(ticker.upper())
+        if cik is None:
+            return []
+        qs = XbrlFact.objects.filter(cik=cik, concept=concept, unit=unit)
+    return [
+        Fact(concept, unit, r.period_start, r.period_end, r.value,
+             r.fy, r.fp, r.form, r.filed, r.accession)
+        for r in qs.order_by("period_end", "period_start")
+    ]
+
+
+def _derive_q4(facts: List[Fact]) -> List[Fact]:
+    """Q4 = FY − nine‑month YTD, for fiscal years that only report the annual value."""
+    nine = {(f.start, f.end): f for f in facts if f.days in _NINE_MO}
+    have = {f.end for f in facts if f.days in _QUARTER}
+    out  = []
+    for fy in (f for f in facts if f.days in _YEAR and f.end not in have):
+        ytd = max((v for (s, _e), v in nine.items() if s == fy.start), key=lambda v: v.end, default=None)
+        if ytd is None:
+            continue
+        out.append(Fact(fy.concept, fy.unit, ytd.end + datetime.timedelta(days=1), fy.end,
+                        fy.value - ytd.value, fy.fy, "Q4", fy.form, fy.filed, fy.accession))
+    return out
+
+
+def series(
+    ticker: str,
+    concept: str,
+    unit: str = "USD",
+    period: str | None = "Q",
+    derive_q4: bool = True,
+) -> List[Fact]:
+    """
+    Facts for *ticker* / *concept*, oldest period first.
+
+    period: "Q" (≈3‑month durations), "FY" (≈12‑month), "I" (instants,
+    e.g. balance‑sheet items) or None (everything stored). With period="Q"
+    a missing fourth quarter is derived as FY minus the nine‑month YTD value.
+    """
+    facts = _rows(ticker, _qualify(concept), unit)
+    if period is None:
+        return facts
+    if period == "I":
+        return [f for f in facts if f.days == 0]
+    if period == "FY":
+        return [f for f in facts if f.days in _YEAR]
+    if period == "Q":
+        quarters = [f for f in facts if f.days in _QUARTER]
+        if derive_q4:
+            quarters = sorted(quarters + _derive_q4(facts), key=lambda f: (f.end, f.start))
+        return quarters
+    raise ValueError(f"unknown period {period!r} (expected 'Q', 'FY', 'I' or None)")
+
+
+def latest(ticker: str, concept: str, unit: str = "USD", period: str | None = "Q") -> Fact | None:
+    facts = series(ticker, concept, unit, period)
+    return facts[-1] if facts else None
@@ -0,0 +1,44 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from EDGAR_bot.core import backfill
+from EDGAR_bot.core.rate_limiter import SharedBudgetRequired
+
+
+class Command(BaseCommand):
+    help = (
+        "Resumable historical EDGAR backfill: walks paginated submission history, plans "
+        "filings in the DB and downloads/ingests them on a reduced SEC budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickers", default="",
+                            help="Comma-separated tickers (default: full CSV universe)")
+        parser.add_argument("--since", type=datetime.date.fromisoformat, default=None,
+                            help="First filing date, YYYY-MM-DD (default: config.START_DATE)")
+        parser.add_argument("--until", type=datetime.date.fromisoformat, default=None,
+                            help="Last filing date, YYYY-MM-DD (default: today)")
+        parser.add_argument("--forms", default="",
+                            help="Comma-separated forms (default: config.ALLOWED_FORMS)")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Parallel CIKs/filings (default: config.BACKFILL_CONCURRENCY)")
+        parser.add_argument("--rate", type=float, default=None,
+                            help="SEC requests/s for this process (default: config.BACKFILL_MAX_REQUESTS_PER_SECOND; "
+                                 "required with EDGAR_LIMITER=local)")
+        parser.add_argument("--plan-only", action="store_true",
+                            help="Walk history and record the plan, download nothing")
+
+    def handle(self, *args, **opts):
+        try:
+            backfill.main(
+                tickers=[t for t in opts["tickers"].split(",") if t.strip()] or None,
+                since=opts["since"],
+                until=opts["until"],
+                forms=[f.strip() for f in opts["forms"].split(",") if f.strip()] or None,
+                workers=opts["workers"],
+                rate=opts["rate"],
+                plan_only=opts["plan_only"],
+            )
+        except SharedBudgetRequired as e:
+            raise CommandError(str(e))
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from EDGAR_bot.core import bench
+
+
+class Command(BaseCommand):
+    help = (
+        "Offline EDGAR pipeline benchmark: replays SEC/OpenAI responses from a local stub "
+        "server and reports filings/s, SEC req/s, DB queries per filing and p95 detection latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default=",".join(map(str, bench.DEFAULT_SIZES)),
+                            help="Comma-separated universe sizes (default: 100,1000,5000)")
+        parser.add_argument("--fixtures", type=Path, default=None,
+                            help="Dir with recorded submissions.json, index.json and docs/ (default: built-in 8-K)")
+        parser.add_argument("--filings", type=int, default=1,
+                            help="Recent filings per ticker taken from the fixture")
+        parser.add_argument("--latency", type=float, default=0.0, help="Per-request stub latency (s)")
+        parser.add_argument("--jitter", type=float, default=0.0, help="± latency jitter (s)")
+        parser.add_argument("--p429", type=float, default=0.0, help="Fraction of requests answered 429")
+        parser.add_argument("--retry-after", type=float, default=0.0, help="Retry-After sent with 429s (s)")
+        parser.add_argument("--sec-rate", type=float, default=1000.0,
+                            help="SEC limiter budget for the run (req/s)")
+        parser.add_argument("--cold-index", action="store_true",
+                            help="Do not warm the in-memory accession index first")
+
+    def handle(self, *args, **opts):
+        results = bench.run_benchmark(
+            sizes=[int(s) for s in opts["sizes"].split(",") if s.strip()],
+            fixtures=opts["fixtures"],
+            filings_per_ticker=opts["filings"],
+            latency=opts["latency"],
+            jitter=opts["jitter"],
+            p429=opts["p429"],
+            retry_after=opts["retry_after"],
+            sec_rate=opts["sec_rate"],
+            warm_index=not opts["cold_index"],
+        )
+        self.stdout.write(bench.HEADER)
+        for r in results:
+            self.stdout.write(r.row())
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from EDGAR_bot.core import config
+
+
+class Command(BaseCommand):
+    help = "Print the EDGAR bot's latest Prometheus metrics snapshot (written by edgar_scheduler_2)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grep", default="",
+            help="Only show metric lines containing this substring (e.g. e2e_latency)",
+        )
+
+    def handle(self, *args, **opts):
+        path = config.METRICS_FILE
+        if not path.exists():
+            self.stderr.write(f"No metrics snapshot at {path} - is edgar_scheduler_2 running?")
+            return
+
+        age = time.time() - path.stat().st_mtime
+        self.stdout.write(f"# {path} (written {age:.0f}s ago)")
+        for line in path.read_text(encoding="utf-8").splitlines():
+            if opts["grep"] in line:
+                self.stdout.write(line)
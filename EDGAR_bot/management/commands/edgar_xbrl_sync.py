@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from EDGAR_bot.core import xbrl_facts
+from EDGAR_bot.core.rate_limiter import SharedBudgetRequired
+
+
+class Command(BaseCommand):
+    help = (
+        "Sync SEC XBRL companyfacts into the local XbrlFact table (conditional GET per CIK, "
+        "incremental upsert of facts filed since the last run)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickers", default="",
+                            help="Comma-separated tickers (default: Watchlist + CSV universe)")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="CIKs synced in parallel (default: config.XBRL_SYNC_CONCURRENCY)")
+        parser.add_argument("--rate", type=float, default=None,
+                            help="SEC requests/s for this process (default: config.XBRL_MAX_REQUESTS_PER_SECOND; "
+                                 "required with EDGAR_LIMITER=local)")
+
+    def handle(self, *args, **opts):
+        tickers = [t.strip().upper() for t in opts["tickers"].split(",") if t.strip()]
+        try:
+            n = xbrl_facts.main(tickers or None, opts["workers"], opts["rate"])
+        except SharedBudgetRequired as e:
+            raise CommandError(str(e))
+        self.stdout.write(f"{n} XBRL fact(s) upserted")
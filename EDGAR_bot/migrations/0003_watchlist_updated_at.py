@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-16 22:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EDGAR_bot', '0002_watchlist'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='watchlist',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
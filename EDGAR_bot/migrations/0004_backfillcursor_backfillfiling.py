@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EDGAR_bot', '0003_watchlist_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackfillCursor',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('cik', models.CharField(max_length=10)),
+                ('since', models.DateField()),
+                ('until', models.DateField()),
+                ('filings', models.PositiveIntegerField(default=0)),
+                ('planned_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'backfill_cursors',
+                'unique_together': {('cik', 'since', 'until')},
+            },
+        ),
+        migrations.CreateModel(
+            name='BackfillFiling',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('cik', models.CharField(max_length=10)),
+                ('ticker', models.CharField(max_length=12)),
+                ('accession', models.CharField(max_length=20)),
+                ('form', models.CharField(max_length=20)),
+                ('filing_date', models.DateField()),
+                ('primary_doc', models.CharField(max_length=260)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('skipped', 'Skipped'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'backfill_filings',
+                'ordering': ['-filing_date'],
+                'indexes': [models.Index(fields=['status', 'filing_date'], name='backfill_fi_status_d024d4_idx'), models.Index(fields=['ticker'], name='backfill_fi_ticker_bdd0f5_idx')],
+                'unique_together': {('cik', 'accession')},
+            },
+        ),
+    ]
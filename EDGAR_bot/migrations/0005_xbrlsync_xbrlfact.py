@@ -0,0 +1,51 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EDGAR_bot', '0004_backfillcursor_backfillfiling'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='XbrlSync',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('cik', models.CharField(max_length=10, unique=True)),
+                ('etag', models.CharField(blank=True, max_length=200)),
+                ('last_modified', models.CharField(blank=True, max_length=100)),
+                ('last_filed', models.DateField(blank=True, null=True)),
+                ('facts', models.PositiveIntegerField(default=0)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'xbrl_sync',
+            },
+        ),
+        migrations.CreateModel(
+            name='XbrlFact',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('cik', models.CharField(max_length=10)),
+                ('ticker', models.CharField(max_length=12)),
+                ('concept', models.CharField(max_length=150)),
+                ('unit', models.CharField(max_length=30)),
+                ('period_start', models.DateField()),
+                ('period_end', models.DateField()),
+                ('value', models.FloatField()),
+                ('fy', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('fp', models.CharField(blank=True, max_length=4)),
+                ('form', models.CharField(blank=True, max_length=20)),
+                ('filed', models.DateField()),
+                ('accession', models.CharField(max_length=20)),
+            ],
+            options={
+                'db_table': 'xbrl_facts',
+                'indexes': [models.Index(fields=['ticker', 'concept', 'period_end'], name='xbrl_facts_ticker_05ceae_idx'), models.Index(fields=['cik', 'concept', 'period_end'], name='xbrl_facts_cik_e69ba6_idx')],
+                'unique_together': {('cik', 'concept', 'unit', 'period_start', 'period_end')},
+            },
+        ),
+    ]
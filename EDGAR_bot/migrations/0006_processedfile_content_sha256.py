@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EDGAR_bot', '0005_xbrlsync_xbrlfact'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processedfile',
+            name='content_sha256',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='processedfile',
+            index=models.Index(fields=['content_sha256'], name='processed_f_content_c225bc_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EDGAR_bot', '0006_processedfile_content_sha256'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SharedRateClock',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('tat', models.FloatField(default=0.0)),
+            ],
+            options={
+                'db_table': 'edgar_rate_clocks',
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkerLease',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('owner', models.CharField(blank=True, max_length=100)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'edgar_leases',
+            },
+        ),
+    ]
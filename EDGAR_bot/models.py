@@ -35,6 +35,7 @@ class ProcessedFile(models.Model):
     filename  = models.CharField(max_length=260)
     file_id   = models.CharField(max_length=100)
     vector_group_id = models.PositiveIntegerField()
+    content_sha256  = models.CharField(max_length=64, blank=True, default="")  # of the uploaded (normalised) bytes
 
     class Meta:
         db_table        = "processed_files"
@@ -42,6 +43,7 @@ class ProcessedFile(models.Model):
         indexes = [
             models.Index(fields=["cik", "accession"]),
             models.Index(fields=["file_id"]),
+            models.Index(fields=["content_sha256"]),
         ]
 
     def __str__(self) -> str:
@@ -57,6 +59,7 @@ class Watchlist(models.Model):
     earnings_date = models.DateField(null=True, blank=True)
     cik           = models.CharField(max_length=10, null=True, blank=True)  # Optional: store CIK for quick lookups
     is_active     = models.BooleanField(default=True)  # Allow toggling on/off
+    updated_at    = models.DateTimeField(auto_now=True)  # change detection for the EDGAR scheduler
 
     class Meta:
         db_table = "watchlist"
@@ -68,4 +71,143 @@ class Watchlist(models.Model):
         ]
 
     def __str__(self) -> str:
-        return f"{self.ticker}" + (f" (Earnings: {self.earnings_date})" if self.earnings_date else "")
\ No newline at end of file
+        return f"{self.ticker}" + (f" (Earnings: {self.earnings_date})" if self.earnings_date else "")
+
+class BackfillCursor(models.Model):
+    """
+    One row per CIK whose submission history has been planned for a
+    backfill date range – lets a resumed `edgar_backfill` skip re‑walking it.
+    """
+    id         = models.BigAutoField(primary_key=True)
+    cik        = models.CharField(max_length=10)
+    since      = models.DateField()
+    until      = models.DateField()
+    filings    = models.PositiveIntegerField(default=0)      # rows planned
+    planned_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table        = "backfill_cursors"
+        unique_together = [("cik", "since", "until")]
+
+    def __str__(self) -> str:
+        return f"{self.cik} {self.since}..{self.until}"
+
+
+class BackfillFiling(models.Model):
+    """
+    One historical filing planned by `edgar_backfill`; *status* is the
+    resume checkpoint.
+    """
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        DONE    = "done", "Done"
+        SKIPPED = "skipped", "Skipped"
+        FAILED  = "failed", "Failed"
+
+    id          = models.BigAutoField(primary_key=True)
+    cik         = models.CharField(max_length=10)
+    ticker      = models.CharField(max_length=12)
+    accession   = models.CharField(max_length=20)
+    form        = models.CharField(max_length=20)
+    filing_date = models.DateField()
+    primary_doc = models.CharField(max_length=260)
+    status      = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts    = models.PositiveSmallIntegerField(default=0)
+    updated_at  = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table        = "backfill_filings"
+        ordering        = ["-filing_date"]
+        unique_together = [("cik", "accession")]
+        indexes = [
+            models.Index(fields=["status", "filing_date"]),
+            models.Index(fields=["ticker"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.ticker} {self.accession} ({self.status})"
+
+
+class XbrlFact(models.Model):
+    """
+    One XBRL fact from SEC companyfacts – the latest filed value per
+    (cik, concept, unit, period). Instant facts (balance‑sheet items) store
+    period_start == period_end.
+    """
+    id           = models.BigAutoField(primary_key=True)
+    cik          = models.CharField(max_length=10)
+    ticker       = models.CharField(max_length=12)
+    concept      = models.CharField(max_length=150)           # "us-gaap:Revenues"
+    unit         = models.CharField(max_length=30)            # "USD", "USD/shares", "shares"
+    period_start = models.DateField()
+    period_end   = models.DateField()
+    value        = models.FloatField()
+    fy           = models.PositiveSmallIntegerField(null=True, blank=True)
+    fp           = models.CharField(max_length=4, blank=True)  # "Q1".."Q4", "FY"
+    form         = models.CharField(max_length=20, blank=True)
+    filed        = models.DateField()
+    accession    = models.CharField(max_length=20)
+
+    class Meta:
+        db_table        = "xbrl_facts"
+        unique_together = [("cik", "concept", "unit", "period_start", "period_end")]
+        indexes = [
+            models.Index(fields=["ticker", "concept", "period_end"]),
+            models.Index(fields=["cik", "concept", "period_end"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.ticker} {self.concept} {self.period_end} = {self.value}"
+
+
+class XbrlSync(models.Model):
+    """
+    Per‑CIK companyfacts sync cursor: HTTP validators for the conditional GET
+    and the newest `filed` date already stored (incremental upserts).
+    """
+    id            = models.BigAutoField(primary_key=True)
+    cik           = models.CharField(max_length=10, unique=True)
+    etag          = models.CharField(max_length=200, blank=True)
+    last_modified = models.CharField(max_length=100, blank=True)
+    last_filed    = models.DateField(null=True, blank=True)
+    facts         = models.PositiveIntegerField(default=0)
+    synced_at     = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "xbrl_sync"
+
+    def __str__(self) -> str:
+        return f"{self.cik} (filed ≤ {self.last_filed})"
+
+
+class WorkerLease(models.Model):
+    """
+    Named, expiring lease – EDGAR poller shards ("edgar-shard-7") and worker
+    heartbeats ("edgar-worker-<id>"). Claimed with a compare‑and‑set UPDATE.
+    """
+    id         = models.BigAutoField(primary_key=True)
+    name       = models.CharField(max_length=100, unique=True)
+    owner      = models.CharField(max_length=100, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "edgar_leases"
+
+    def __str__(self) -> str:
+        return f"{self.name} → {self.owner or '-'}"
+
+
+class SharedRateClock(models.Model):
+    """
+    Cross‑process rate limiter state (GCRA): the earliest wall‑clock time,
+    in epoch seconds, at which the next request may start.
+    """
+    id   = models.BigAutoField(primary_key=True)
+    name = models.CharField(max_length=50, unique=True)
+    tat  = models.FloatField(default=0.0)
+
+    class Meta:
+        db_table = "edgar_rate_clocks"
+
+    def __str__(self) -> str:
+        return self.name
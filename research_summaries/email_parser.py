@@ -1,4 +1,5 @@
 from research_summaries.models import ResearchNote
+from research_summaries.processors.pipeline_events import notify
 from django.utils.timezone import now
 import os, ssl, datetime, email, pandas as pd, io, re
 from email.utils import parsedate_to_datetime
@@ -219,6 +220,9 @@ def fetch_research_summaries():
                 except Exception as e:
                     yield {"status": "error", "message": f"❌ Error processing email UID {uid}: {str(e)}"}
 
+            if total_records_created:
+                notify()                                # wake the download stage
+
             yield {"status": "success", "message": f"🎉 Processing complete!"}
             yield {"status": "success",
                    "message": f"📧 Processed {processed_count} CSV attachments from {len(uids)} emails"}
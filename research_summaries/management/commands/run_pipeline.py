@@ -1,21 +1,60 @@
 # research_summaries/management/commands/run_pipeline.py
+import signal
+import threading
 import time
 from django.core.management.base import BaseCommand
 from django.core.management import call_command
 from django.utils import timezone
 from research_summaries.models import ResearchNote
+from research_summaries.processors.pipeline_events import EVENTS
+from research_summaries.processors.pipeline_runner import PERIODIC_SECONDS, PipelineRunner
+
+STATUS_EVERY_SECONDS = 5 * 60
 
 
 class Command(BaseCommand):
-    help = 'Run complete research pipeline continuously with smart sleep logic'
+    help = 'Run complete research pipeline continuously (one worker pool per stage)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sequential',
+            action='store_true',
+            help='Use the legacy single loop (every step in turn, then sleep)'
+        )
 
     def handle(self, *args, **options):
+        if options['sequential']:
+            return self.run_sequential()
+
+        self.stdout.write(
+            self.style.SUCCESS('🚀 Starting concurrent research pipeline...')
+        )
+        runner = PipelineRunner()
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+
+        runner.start()
+        while not stop.wait(STATUS_EVERY_SECONDS):
+            try:
+                self.stdout.write(f'📊 {runner.status_line()}')
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'❌ Status query failed: {e}'))
+
+        self.stdout.write('🛑 Stopping pipeline - waiting for in-flight notes...')
+        runner.shutdown()
+        self.stdout.write('🛑 Pipeline stopped')
+
+    def run_sequential(self):
         self.stdout.write(
             self.style.SUCCESS('🚀 Starting continuous research pipeline...')
         )
 
         loop_counter = 0
         EXPIRATION_FREQUENCY = 16  # Run expiration every 20 loops
+        # idle: wake on pipeline events, but re-check the mailbox at the email interval
+        IDLE_SECONDS = PERIODIC_SECONDS['process_emails']
+        EVENTS.start()
 
         while True:
             try:
@@ -39,6 +78,7 @@ class Command(BaseCommand):
                 )
 
                 pending_count = pending_notes.count()
+                seen = EVENTS.generation
                 advanced_count = advanced_ready_notes.count()
                 vectorization_count = vectorization_ready_notes.count()
 
@@ -72,9 +112,10 @@ class Command(BaseCommand):
                         self.style.SUCCESS(f'✅ Email processing completed in {elapsed.total_seconds():.1f}s')
                     )
                     self.stdout.write(
-                        self.style.WARNING('📭 No pending work found - sleeping for 20 minutes...')
+                        self.style.WARNING(f'📭 No pending work found - waiting up to {IDLE_SECONDS:.0f}s for new work...')
                     )
-                    time.sleep(20 * 60)  # 20 minutes
+                    if EVENTS.wait(seen, IDLE_SECONDS):
+                        self.stdout.write('🔔 Woken by a pipeline event')
                     continue
 
                 self.stdout.write('📝 Summarizing documents...')
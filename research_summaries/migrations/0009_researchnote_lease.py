@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('research_summaries', '0008_alter_researchnote_is_active'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='researchnote',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, help_text='Lease expiry; an expired lease is free to reclaim', null=True),
+        ),
+        migrations.AddField(
+            model_name='researchnote',
+            name='lease_owner',
+            field=models.CharField(blank=True, help_text='Worker currently processing this note', max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='researchnote',
+            index=models.Index(fields=['status', 'lease_expires_at'], name='research_su_status_b8451b_idx'),
+        ),
+    ]
@@ -49,6 +49,10 @@ class ResearchNote(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)  # when the DB row was created
     updated_at = models.DateTimeField(auto_now=True)  # whenever the DB row was updated
 
+    # --- Worker lease (processors/note_leases.py)
+    lease_owner = models.CharField(max_length=255, null=True, blank=True, help_text="Worker currently processing this note")
+    lease_expires_at = models.DateTimeField(null=True, blank=True, help_text="Lease expiry; an expired lease is free to reclaim")
+
     # --- Status tracking ---
     STATUS_CHOICES = [
         (0, "Not Downloaded"),
@@ -73,6 +77,7 @@ class ResearchNote(models.Model):
             models.Index(fields=['is_vectorized']),
             models.Index(fields=['is_persistent_document']),
             models.Index(fields=['status', '-file_download_time']),
+            models.Index(fields=['status', 'lease_expires_at']),
         ]
 
 
@@ -2,7 +2,10 @@
 OpenAI client utilities for Gamma Intelligence
 """
 import os
-from openai import OpenAI
+import random
+import threading
+import time
+from openai import APIConnectionError, InternalServerError, OpenAI, RateLimitError
 from django.conf import settings
 
 
@@ -15,4 +18,85 @@ def get_openai_client():
     if not api_key:
         raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY in settings or environment variables.")
 
-    return OpenAI(api_key=api_key)
\ No newline at end of file
+    return OpenAI(api_key=api_key)
+
+
+class RateBudget:
+    """
+    Requests‑per‑minute and tokens‑per‑minute budget shared by every thread
+    of a process. Callers reserve before each request and sleep outside the
+    lock; a 429 pauses everyone, not just the thread that hit it.
+    A budget of 0 disables that dimension; a reservation larger than the
+    whole TPM budget is capped at it, so it waits one minute, not forever.
+    """
+
+    def __init__(self, rpm: float, tpm: float):
+        self.rpm = float(rpm)
+        self.tpm = float(tpm)
+        self._requests = self.rpm
+        self._tokens = self.tpm
+        self._stamp = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            elapsed, self._stamp = now - self._stamp, now
+            wait = max(0.0, self._paused_until - now)
+            if self.rpm > 0:
+                self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60) - 1
+                wait = max(wait, -self._requests * 60 / self.rpm)
+            if self.tpm > 0 and tokens:
+                tokens = min(tokens, self.tpm)
+                self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60) - tokens
+                wait = max(wait, -self._tokens * 60 / self.tpm)
+            return wait
+
+    def acquire(self, tokens: float = 0) -> None:
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def _retry_after(error) -> float | None:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+def call_with_backoff(budget: RateBudget, fn, *args, tokens: float = 0, retries: int = 6, **kwargs):
+    """
+    Call *fn* within *budget*, retrying 429s with jittered exponential
+    back‑off (or the server's Retry‑After). Exhausted quota is not retried.
+    Connection errors, timeouts and 5xx are retried on the same schedule
+    without pausing the budget – pass a client built with max_retries=0 so
+    the SDK does not retry them (and 429s) a second time underneath.
+    """
+    for attempt in range(retries + 1):
+        budget.acquire(tokens)
+        try:
+            return fn(*args, **kwargs)
+        except RateLimitError as e:
+            if getattr(e, "code", None) == "insufficient_quota" or attempt == retries:
+                raise
+            delay = _retry_after(e) or min(60.0, 2.0 ** attempt) * random.uniform(0.5, 1.0)
+            budget.pause(delay)
+            print(f"⏳ OpenAI rate limited - backing off {delay:.1f}s (retry {attempt + 1}/{retries})")
+        except (APIConnectionError, InternalServerError) as e:     # APITimeoutError included
+            if attempt == retries:
+                raise
+            delay = _retry_after(e) or min(60.0, 2.0 ** attempt) * random.uniform(0.5, 1.0)
+            print(f"⚠️ OpenAI request failed ({type(e).__name__}) - retrying in {delay:.1f}s "
+                  f"(retry {attempt + 1}/{retries})")
+            time.sleep(delay)
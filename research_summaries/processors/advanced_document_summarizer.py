@@ -13,6 +13,7 @@ from django.utils.timezone import now
 from utils.file_utils import get_or_upload_file_to_openai
 from research_summaries.openai_utils import get_openai_client
 from research_summaries.models import ResearchNote
+from research_summaries.processors.note_leases import drain
 from research_summaries.OpenAI_toolbox.prompts import (
     CATEGORIZATION_INSTRUCTIONS,
     ADVANCED_SUMMARY_INSTRUCTIONS,
@@ -133,11 +134,70 @@ def summarize_document(client, model: str, file_id: str, instructions: str, sche
 
 
 # ── MAIN TASK -----------------------------------------------------------------
+def summarize_note_advanced(client, note) -> bool:
+    """Advanced‑summarize one status‑3 note; True once it is status 4."""
+    try:
+        # Get or upload file to OpenAI (reuse existing if possible)
+        file_id = get_or_upload_file_to_openai(
+            s3_key=note.file_directory,
+            existing_file_id=note.openai_file_id
+        )
+
+        # Save the file_id if it's new
+        if not note.openai_file_id:
+            note.openai_file_id = file_id
+            note.save(update_fields=['openai_file_id'])
+
+        # Categorize if needed (should rarely be needed for status=3)
+        if not note.report_type:
+            print(f"🔖 Categorizing {note.file_id}...")
+            note.report_type = categorize_document(
+                client, MODEL, file_id, note.raw_company_count or 0,
+                                        note.raw_companies or "", note.raw_title or ""
+            )
+            note.save(update_fields=["report_type"])
+            print(f"🔖 Categorized {note.file_id} → {note.report_type}")
+
+        if note.report_type == "Invalid":
+            print(f"⚠️  Skipping invalid report: {note.file_id}")
+            note.status = 10  # Invalid
+            note.save(update_fields=["status"])
+            return False
+
+        print(f"🧠 Advanced summarizing {note.file_id} with GPT o3-mini...")
+        summary_instructions = ADVANCED_SUMMARY_INSTRUCTIONS.get(note.report_type, DEFAULT_SUMMARY_PROMPT)
+        summary_schema = ADVANCED_SCHEMAS.get(note.report_type)
+
+        if not summary_schema:
+            print(f"⚠️  No schema found for report type: {note.report_type}")
+            return False
+
+        summary_json = summarize_document(client, MODEL, file_id, summary_instructions, summary_schema)
+
+        ticker = clean_ticker(summary_json.get("stock_ticker"))
+        note.report_summary = summary_json
+        note.parsed_ticker = ticker
+        note.status = 4  # Advanced Summarized
+        note.file_summary_time = now()
+        note.save(update_fields=[
+            "report_summary", "parsed_ticker",
+            "status", "file_summary_time"
+        ])
+        print(f"✅ Advanced summarized {note.file_id}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error processing {note.file_id}: {e}")
+        note.status = 11  # Error status
+        note.save(update_fields=["status"])
+        return False
+
+
 def summarize_documents_advanced():
     """
     Advanced summarization using GPT o3-mini for documents with status=3 AND is_advanced_summary=True
     """
-    notes = ResearchNote.objects.filter(status=3, is_advanced_summary=True)
+    notes = ResearchNote.objects.filter(status=3, is_advanced_summary=True).order_by("id")
     if not notes.exists():
         print("✅ No documents awaiting advanced summarization.")
         return
@@ -146,65 +206,13 @@ def summarize_documents_advanced():
 
     client = get_openai_client()
     success_count = 0
+    processed = 0
 
-    for note in notes:
-
-        try:
-            # Get or upload file to OpenAI (reuse existing if possible)
-            file_id = get_or_upload_file_to_openai(
-                s3_key=note.file_directory,
-                existing_file_id=note.openai_file_id
-            )
-
-            # Save the file_id if it's new
-            if not note.openai_file_id:
-                note.openai_file_id = file_id
-                note.save(update_fields=['openai_file_id'])
-
-            # Categorize if needed (should rarely be needed for status=3)
-            if not note.report_type:
-                print(f"🔖 Categorizing {note.file_id}...")
-                note.report_type = categorize_document(
-                    client, MODEL, file_id, note.raw_company_count or 0,
-                                            note.raw_companies or "", note.raw_title or ""
-                )
-                note.save(update_fields=["report_type"])
-                print(f"🔖 Categorized {note.file_id} → {note.report_type}")
-
-            if note.report_type == "Invalid":
-                print(f"⚠️  Skipping invalid report: {note.file_id}")
-                note.status = 10  # Invalid
-                note.save(update_fields=["status"])
-                continue
-
-            print(f"🧠 Advanced summarizing {note.file_id} with GPT o3-mini...")
-            summary_instructions = ADVANCED_SUMMARY_INSTRUCTIONS.get(note.report_type, DEFAULT_SUMMARY_PROMPT)
-            summary_schema = ADVANCED_SCHEMAS.get(note.report_type)
-
-            if not summary_schema:
-                print(f"⚠️  No schema found for report type: {note.report_type}")
-                continue
-
-            summary_json = summarize_document(client, MODEL, file_id, summary_instructions, summary_schema)
-
-            ticker = clean_ticker(summary_json.get("stock_ticker"))
-            note.report_summary = summary_json
-            note.parsed_ticker = ticker
-            note.status = 4  # Advanced Summarized
-            note.file_summary_time = now()
-            note.save(update_fields=[
-                "report_summary", "parsed_ticker",
-                "status", "file_summary_time"
-            ])
-            success_count += 1
-            print(f"✅ Advanced summarized {note.file_id}")
-
-        except Exception as e:
-            print(f"❌ Error processing {note.file_id}: {e}")
-            note.status = 11  # Error status
-            note.save(update_fields=["status"])
+    for note, ok in drain(notes, lambda n: summarize_note_advanced(client, n)):
+        processed += 1
+        success_count += ok
 
-    print(f"🏁 Advanced summarization task finished. {success_count}/{notes.count()} documents processed successfully.")
+    print(f"🏁 Advanced summarization task finished. {success_count}/{processed} documents processed successfully.")
 
 
 def process_single_document_advanced(note):
@@ -17,6 +17,7 @@ import hashlib
 from django.utils.timezone import now
 from django.conf import settings
 from research_summaries.models import ResearchNote
+from research_summaries.processors.note_leases import drain
 
 # ── HEADINGS CONFIG ──────────────────────────────────────────────
 DEFAULT_HEADINGS = ("Required Disclosures", "Important Disclosures")
@@ -209,45 +210,55 @@ def clean_pdf_from_s3(s3_key: str):
             pass
 
 
+def clean_note(note) -> bool:
+    """Clean one status‑1 note in place on S3 and move it to status 2."""
+    try:
+        # Extract S3 key from file_directory
+        s3_key = note.file_directory
+        if s3_key.startswith('https://'):
+            # Extract key from URL if it's a full S3 URL
+            s3_key = s3_key.split('amazonaws.com/')[-1]
+        elif s3_key.startswith('s3://'):
+            # Extract key from s3:// URL
+            s3_key = s3_key.split('/', 3)[-1]
+
+        print(f"🔄 Processing {note.file_id}: {s3_key}")
+
+        success, file_hash = clean_pdf_from_s3(s3_key)
+
+        if success:
+            note.status = 2
+            note.file_update_time = now()
+            note.file_hash_id = file_hash
+            note.save(update_fields=["status", "file_update_time", "file_hash_id"])
+            print(f"✅ Cleaned & updated {note.file_id} with hash: {file_hash}")
+            return True
+
+        print(f"❌ Failed to clean {note.file_id}")
+        return False
+
+    except Exception as e:
+        print(f"❌ Error processing {note.file_id}: {e}")
+        return False
+
+
 def clean_documents():
     """Main function to clean all documents with status == 1"""
-    notes = ResearchNote.objects.filter(status=1)
+    notes = ResearchNote.objects.filter(status=1).order_by("id")
     if not notes.exists():
         print("✅ No PDFs awaiting cleaning.")
         return
 
     print(f"🧹 Cleaning {notes.count()} research PDFs from S3...")
     success_count = 0
+    processed = 0
 
-    for note in notes:
-        try:
-            # Extract S3 key from file_directory
-            s3_key = note.file_directory
-            if s3_key.startswith('https://'):
-                # Extract key from URL if it's a full S3 URL
-                s3_key = s3_key.split('amazonaws.com/')[-1]
-            elif s3_key.startswith('s3://'):
-                # Extract key from s3:// URL
-                s3_key = s3_key.split('/', 3)[-1]
-
-            print(f"🔄 Processing {note.file_id}: {s3_key}")
-
-            success, file_hash = clean_pdf_from_s3(s3_key)
-
-            if success:
-                note.status = 2
-                note.file_update_time = now()
-                note.file_hash_id = file_hash
-                note.save(update_fields=["status", "file_update_time", "file_hash_id"])
-                success_count += 1
-                print(f"✅ Cleaned & updated {note.file_id} with hash: {file_hash}")
-            else:
-                print(f"❌ Failed to clean {note.file_id}")
-
-        except Exception as e:
-            print(f"❌ Error processing {note.file_id}: {e}")
-
-    print(f"🏁 Cleaning task finished. {success_count}/{notes.count()} files processed successfully.")
+    # leased in small batches – notes another worker holds are skipped
+    for note, ok in drain(notes, clean_note):
+        processed += 1
+        success_count += ok
+
+    print(f"🏁 Cleaning task finished. {success_count}/{processed} files processed successfully.")
 
 
 def process_single_document(note):
@@ -5,12 +5,22 @@ Loop through ResearchNote objects with status == 2.
 • Always run a summarization prompt based on report_type
 • Save the JSON response in report_summary
 • On success: status = 3 and file_summary_time = now()
+• Each note is written once, with a single save(update_fields=...)
+
+summarize_documents runs SUMMARY_WORKERS notes at a time (leased, so other
+dynos skip them); every OpenAI call goes through OPENAI_BUDGET, a per‑process
+requests/tokens‑per‑minute budget with 429 back‑off that pipeline_runner's
+summarize workers share.
 """
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connection
 from django.utils.timezone import now
 from utils.file_utils import get_or_upload_file_to_openai
-from research_summaries.openai_utils import get_openai_client
+from research_summaries.openai_utils import RateBudget, call_with_backoff, get_openai_client
 from research_summaries.models import ResearchNote
+from research_summaries.processors.note_leases import drain
 from research_summaries.OpenAI_toolbox.prompts import (
     CATEGORIZATION_INSTRUCTIONS,
     SUMMARY_INSTRUCTIONS,
@@ -21,6 +31,16 @@ from research_summaries.OpenAI_toolbox.structured_outputs import SCHEMAS
 MODEL_ONE = 'gpt-4.1-mini-2025-04-14'
 MODEL = 'gpt-5-mini-2025-08-07'
 
+# ── CONCURRENCY / BUDGET ------------------------------------------------------
+SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", "4"))
+OPENAI_RPM = float(os.getenv("OPENAI_SUMMARY_RPM", "500"))
+OPENAI_TPM = float(os.getenv("OPENAI_SUMMARY_TPM", "400000"))
+TOKENS_PER_PAGE = 1_000         # PDF input estimate (text + page image)
+OUTPUT_TOKENS = 4_000           # reasoning + structured output allowance
+DEFAULT_PAGES = 10
+
+OPENAI_BUDGET = RateBudget(OPENAI_RPM, OPENAI_TPM)
+
 TICKER_OVERRIDES = {
     "2330": "TSMC",
     "2330 TT": "TSMC",
@@ -204,110 +224,149 @@ def summarize_document(client, model: str, file_id: str, instructions: str, sche
     return json.loads(response.output_text)
 
 
+def _estimate_tokens(note) -> int:
+    return (note.raw_page_count or DEFAULT_PAGES) * TOKENS_PER_PAGE + OUTPUT_TOKENS
+
+
 # ── MAIN TASK -----------------------------------------------------------------
+def summarize_note(client, note) -> bool:
+    """
+    Categorize (if needed) and summarize one status‑2 note; True once it is status 3.
+    All field changes are written in one save at the end – on failure too, so
+    an upload or categorization already paid for is kept for the retry.
+    """
+    client = client.with_options(max_retries=0)     # call_with_backoff owns 429 / transient retries
+    tokens = _estimate_tokens(note)
+    changed = set()
+    try:
+        # Get or upload file to OpenAI (reuse existing if possible)
+        file_id = get_or_upload_file_to_openai(
+            s3_key=note.file_directory,
+            existing_file_id=note.openai_file_id
+        )
+
+        if not note.openai_file_id:
+            note.openai_file_id = file_id
+            changed.add('openai_file_id')
+
+        # Categorize if needed
+        # if not note.report_type:
+        #     print(f"🔖 Categorizing {note.file_id}...")
+        #     note.report_type = categorize_document(
+        #         client, MODEL, file_id, note.raw_company_count or 0,
+        #                                 note.raw_companies or "", note.raw_title or ""
+        #     )
+        #     note.save(update_fields=["report_type"])
+        #     print(f"🔖 Categorized {note.file_id} → {note.report_type}")
+
+        # Categorize if needed - using the new v2 function
+        if not note.report_type:
+            print(f"🔖 Categorizing {note.file_id}...")
+            report_type, vector_group_id = call_with_backoff(
+                OPENAI_BUDGET, categorize_document_v2,
+                client, MODEL, file_id, note.raw_company_count or 0,
+                note.raw_companies or "", note.raw_title or "",
+                tokens=tokens,
+            )
+            note.report_type = report_type
+            note.vector_group_id = vector_group_id
+            changed.update(["report_type", "vector_group_id"])
+            print(f"🔖 Categorized {note.file_id} → {note.report_type} (Vector Group: {note.vector_group_id})")
+
+        if note.report_type == "Invalid":
+            print(f"⚠️  Skipping invalid report: {note.file_id}")
+            note.status = 10  # Invalid
+            changed.add("status")
+            note.save(update_fields=sorted(changed))
+            return False
+
+        print(f"📝 Summarizing {note.file_id}...")
+        summary_instructions = SUMMARY_INSTRUCTIONS.get(note.report_type, DEFAULT_SUMMARY_PROMPT)
+        summary_schema = SCHEMAS.get(note.report_type)
+
+        if not summary_schema:
+            print(f"⚠️  No schema found for report type: {note.report_type}")
+            if changed:
+                note.save(update_fields=sorted(changed))
+            return False
+
+        summary_json = call_with_backoff(
+            OPENAI_BUDGET, summarize_document,
+            client, MODEL, file_id, summary_instructions, summary_schema,
+            tokens=tokens,
+        )
+
+        # Check if note.vector_group_id is empty and summary_json contains one
+        if not note.vector_group_id and summary_json.get("vector_group_id"):
+            note.vector_group_id = summary_json.get("vector_group_id")
+            # Remove vector_group_id from summary_json since we're storing it separately
+            summary_json.pop("vector_group_id", None)
+            print(f"📍 Extracted vector_group_id {note.vector_group_id} from summary")
+
+        ticker = clean_ticker(summary_json.get("stock_ticker"))
+        note.report_summary = summary_json
+        note.parsed_ticker = ticker
+        note.status = 3
+        note.file_summary_time = now()
+        changed.update(["report_summary", "parsed_ticker", "status", "file_summary_time", "vector_group_id"])
+        note.save(update_fields=sorted(changed))
+
+        print(f"✅ Summarized {note.file_id}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error processing {note.file_id}: {e}")
+        if changed:
+            try:
+                note.save(update_fields=sorted(changed))
+            except Exception as save_error:
+                print(f"⚠️  Could not keep partial progress for {note.file_id}: {save_error}")
+        return False
+
+    # finally:
+    #     # Clean up OpenAI file
+    #     if file_id:
+    #         try:
+    #             client.files.delete(file_id=file_id)
+    #         except Exception as e:
+    #             print(f"⚠️  Failed to delete OpenAI file {file_id}: {e}")
+    #
+    #     # Clean up temporary file
+    #     if temp_pdf_path and os.path.exists(temp_pdf_path):
+    #         try:
+    #             os.unlink(temp_pdf_path)
+    #         except Exception as e:
+    #             print(f"⚠️  Failed to delete temp file {temp_pdf_path}: {e}")
+
+
 def summarize_documents():
-    notes = ResearchNote.objects.filter(status=2)
+    notes = ResearchNote.objects.filter(status=2).order_by("id")
     if not notes.exists():
         print("✅ No documents awaiting summarization.")
         return
 
-    print(f"📝 Summarizing {notes.count()} research notes …")
+    workers = max(1, SUMMARY_WORKERS)
+    print(f"📝 Summarizing {notes.count()} research notes with {workers} worker(s) …")
 
     client = get_openai_client()
-    success_count = 0
-
-    for note in notes:
 
+    def _worker(_):
+        # every thread leases one note at a time until the queue is empty
+        processed = succeeded = 0
         try:
-            # Get or upload file to OpenAI (reuse existing if possible)
-            file_id = get_or_upload_file_to_openai(
-                s3_key=note.file_directory,
-                existing_file_id=note.openai_file_id
-            )
-
-            # Save the file_id if it's new
-            if not note.openai_file_id:
-                note.openai_file_id = file_id
-                note.save(update_fields=['openai_file_id'])
-
-            # Categorize if needed
-            # if not note.report_type:
-            #     print(f"🔖 Categorizing {note.file_id}...")
-            #     note.report_type = categorize_document(
-            #         client, MODEL, file_id, note.raw_company_count or 0,
-            #                                 note.raw_companies or "", note.raw_title or ""
-            #     )
-            #     note.save(update_fields=["report_type"])
-            #     print(f"🔖 Categorized {note.file_id} → {note.report_type}")
-
-            # Categorize if needed - using the new v2 function
-            if not note.report_type:
-                print(f"🔖 Categorizing {note.file_id}...")
-                report_type, vector_group_id = categorize_document_v2(
-                    client, MODEL, file_id, note.raw_company_count or 0,
-                                            note.raw_companies or "", note.raw_title or ""
-                )
-                note.report_type = report_type
-                note.vector_group_id = vector_group_id
-                note.save(update_fields=["report_type", "vector_group_id"])
-                print(f"🔖 Categorized {note.file_id} → {note.report_type} (Vector Group: {note.vector_group_id})")
-
-            if note.report_type == "Invalid":
-                print(f"⚠️  Skipping invalid report: {note.file_id}")
-                note.status = 10  # Invalid
-                note.save(update_fields=["status"])
-                continue
-
-            print(f"📝 Summarizing {note.file_id}...")
-            summary_instructions = SUMMARY_INSTRUCTIONS.get(note.report_type, DEFAULT_SUMMARY_PROMPT)
-            summary_schema = SCHEMAS.get(note.report_type)
-
-            if not summary_schema:
-                print(f"⚠️  No schema found for report type: {note.report_type}")
-                continue
-
-            summary_json = summarize_document(client, MODEL, file_id, summary_instructions, summary_schema)
-
-            # Check if note.vector_group_id is empty and summary_json contains one
-            if not note.vector_group_id and summary_json.get("vector_group_id"):
-                note.vector_group_id = summary_json.get("vector_group_id")
-                # Remove vector_group_id from summary_json since we're storing it separately
-                summary_json.pop("vector_group_id", None)
-                print(f"📍 Extracted vector_group_id {note.vector_group_id} from summary")
-
-            ticker = clean_ticker(summary_json.get("stock_ticker"))
-            note.report_summary = summary_json
-            note.parsed_ticker = ticker
-            note.status = 3
-            note.file_summary_time = now()
-            note.save(update_fields=[
-                "report_summary", "parsed_ticker",
-                "status", "file_summary_time", "vector_group_id"  # Added vector_group_id to update_fields
-            ])
-
-            success_count += 1
-            print(f"✅ Summarized {note.file_id}")
-
-
-        except Exception as e:
-            print(f"❌ Error processing {note.file_id}: {e}")
-
-        # finally:
-        #     # Clean up OpenAI file
-        #     if file_id:
-        #         try:
-        #             client.files.delete(file_id=file_id)
-        #         except Exception as e:
-        #             print(f"⚠️  Failed to delete OpenAI file {file_id}: {e}")
-        #
-        #     # Clean up temporary file
-        #     if temp_pdf_path and os.path.exists(temp_pdf_path):
-        #         try:
-        #             os.unlink(temp_pdf_path)
-        #         except Exception as e:
-        #             print(f"⚠️  Failed to delete temp file {temp_pdf_path}: {e}")
-
-    print(f"🏁 Summarization task finished. {success_count}/{notes.count()} documents processed successfully.")
+            for _note, ok in drain(notes, lambda n: summarize_note(client, n), batch=1):
+                processed += 1
+                succeeded += ok
+        finally:
+            connection.close()
+        return processed, succeeded
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summarize") as pool:
+        results = list(pool.map(_worker, range(workers)))
+
+    processed = sum(p for p, _ in results)
+    success_count = sum(s for _, s in results)
+    print(f"🏁 Summarization task finished. {success_count}/{processed} documents processed successfully.")
 
 
 def process_single_document(note):
@@ -14,6 +14,7 @@ from typing import Set, Optional
 from datetime import datetime
 
 from research_summaries.models import ResearchNote
+from research_summaries.processors.note_leases import drain
 from agents.models import StockTicker, KnowledgeBase
 from utils.file_utils import get_or_upload_file_to_openai
 from utils.vector_store import file_exists_in_vector_store
@@ -310,10 +311,10 @@ def vectorize_documents():
     client = get_openai_client()
 
     success_count = 0
-    for i, note in enumerate(eligible_notes, 1):
-        logger.info(f"\n📄 Processing {i}/{count}: {note.file_id}")
+    processed = 0
+    for note, ok in drain(eligible_notes, lambda n: vectorize_research_note(n, client)):
+        processed += 1
+        logger.info(f"📄 {processed}/{count}: {note.file_id} {'✅' if ok else '❌'}")
+        success_count += ok
 
-        if vectorize_research_note(note, client):
-            success_count += 1
-
-    logger.info(f"\n🏁 Vectorization complete: {success_count}/{count} documents processed successfully")
\ No newline at end of file
+    logger.info(f"\n🏁 Vectorization complete: {success_count}/{processed} documents processed successfully")
\ No newline at end of file
@@ -8,6 +8,7 @@ from django.conf import settings
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from research_summaries.models import ResearchNote
+from research_summaries.processors.note_leases import claim, release
 from research_summaries.utils import extract_publication_date_from_filename
 import boto3
 from botocore.exceptions import ClientError
@@ -237,6 +238,100 @@ def download_single_file(driver, download_link, download_dir, file_id):
         return None
 
 
+def download_note(note):
+    """
+    Download one note's PDF with a fresh browser, upload it to S3 and mark it
+    status 1. Generator of status updates; returns True on success.
+    """
+    yield {"status": "info", "message": f"🔄 Processing: {note.file_id}"}
+
+    if not note.download_link:
+        yield {"status": "warning", "message": f"⚠️ {note.file_id} has no download link - skipped"}
+        return False
+
+    # Create unique temporary directory for this specific file
+    with tempfile.TemporaryDirectory(prefix=f"dl_{note.file_id[:8]}_") as temp_dir:
+        temp_path = Path(temp_dir)
+        driver = None
+
+        try:
+            # Create fresh driver instance
+            yield {"status": "info", "message": f"🌐 Starting browser..."}
+            driver = make_chrome(temp_path)
+
+            # Login
+            login_success = True
+            for login_update in login_to_alphasense(driver):
+                yield login_update
+                if login_update["status"] == "error":
+                    login_success = False
+                    break
+
+            if not login_success:
+                yield {"status": "error", "message": f"❌ Could not login"}
+                return False
+
+            time.sleep(2)  # Brief pause after login
+
+            # Download the file
+            pdf_path = None
+            for download_update in download_single_file(driver, note.download_link, temp_path, note.file_id):
+                yield download_update
+                if download_update["status"] == "success" and "File downloaded:" in download_update["message"]:
+                    # Extract the file path from successful download
+                    pdfs = list(temp_path.glob("*.pdf"))
+                    if pdfs:
+                        pdf_path = pdfs[0]
+
+            if not pdf_path:
+                yield {"status": "error", "message": f"❌ No PDF file found"}
+                return False
+
+            # Upload to S3
+            yield {"status": "info", "message": f"☁️ Uploading to S3..."}
+
+            s3_key = f"{S3_DOCUMENTS_PREFIX}{note.file_id}/{pdf_path.name}"
+            s3_url = upload_to_s3(pdf_path, s3_key)
+
+            if note.publication_date is None:
+                publication_date = extract_publication_date_from_filename(pdf_path.name)
+            else:
+                publication_date = note.publication_date
+
+            # Update database
+            note.status = 1
+            note.file_directory = s3_url
+            note.file_download_time = now()
+            note.publication_date = publication_date
+            note.save(update_fields=[
+                "status",
+                "file_directory",
+                "file_download_time",
+                "publication_date"
+            ])
+
+            yield {"status": "success", "message": f"✅ Successfully processed {note.file_id}"}
+            return True
+
+        except Exception as exc:
+            yield {"status": "error", "message": f"❌ Error: {str(exc)[:100]}"}
+            logger.exception(f"Error processing {note.file_id}")
+            return False
+
+        finally:
+            # Always clean up driver immediately
+            if driver:
+                try:
+                    driver.quit()
+                    yield {"status": "info", "message": f"🧹 Browser closed"}
+                except:
+                    pass
+
+            # Force garbage collection
+            import gc
+            gc.collect()
+
+
 def download_documents():
     """
     Generator function that yields status updates during file downloading
@@ -248,118 +343,40 @@ def download_documents():
         'Expert Call',
     ]
 
+    queue = []
     try:
         # Process only 1 file at a time to minimize memory issues
         BATCH_SIZE = 8
-        queue = ResearchNote.objects.filter(status=0).exclude(
+        # lease the batch so a second dyno / pipeline worker skips these notes
+        queue = claim(ResearchNote.objects.filter(status=0).exclude(
             report_type__in=excluded_report_types
-        ).order_by("id")[:BATCH_SIZE]
+        ).order_by("id"), BATCH_SIZE)
 
-        if not queue.exists():
+        if not queue:
             yield {"status": "info", "message": "✅ No documents to download"}
             return
 
         total_pending = ResearchNote.objects.filter(status=0).exclude(
             report_type__in=excluded_report_types
         ).count()
-        yield {"status": "info", "message": f"📑 Processing {queue.count()} file"}
+        yield {"status": "info", "message": f"📑 Processing {len(queue)} file"}
         yield {"status": "info", "message": f"📊 Total pending downloads: {total_pending}"}
 
         downloaded_count = 0
         failed_count = 0
 
         # Process one file to minimize memory usage
-        for i, note in enumerate(queue, 1):
-            yield {"status": "info", "message": f"🔄 Processing: {note.file_id}"}
-
-            if not note.download_link:
-                yield {"status": "warning", "message": f"⚠️ {note.file_id} has no download link - skipped"}
-                continue
-
-            # Create unique temporary directory for this specific file
-            with tempfile.TemporaryDirectory(prefix=f"dl_{note.file_id[:8]}_") as temp_dir:
-                temp_path = Path(temp_dir)
-                driver = None
-                start_ts = time.time()
-
-                try:
-                    # Create fresh driver instance
-                    yield {"status": "info", "message": f"🌐 Starting browser..."}
-                    driver = make_chrome(temp_path)
-
-                    # Login
-                    login_success = True
-                    for login_update in login_to_alphasense(driver):
-                        yield login_update
-                        if login_update["status"] == "error":
-                            login_success = False
-                            break
-
-                    if not login_success:
-                        yield {"status": "error", "message": f"❌ Could not login"}
-                        failed_count += 1
-                        continue
-
-                    time.sleep(2)  # Brief pause after login
-
-                    # Download the file
-                    pdf_path = None
-                    for download_update in download_single_file(driver, note.download_link, temp_path, note.file_id):
-                        yield download_update
-                        if download_update["status"] == "success" and "File downloaded:" in download_update["message"]:
-                            # Extract the file path from successful download
-                            pdfs = list(temp_path.glob("*.pdf"))
-                            if pdfs:
-                                pdf_path = pdfs[0]
-
-                    if not pdf_path:
-                        yield {"status": "error", "message": f"❌ No PDF file found"}
-                        failed_count += 1
-                        continue
-
-                    # Upload to S3
-                    yield {"status": "info", "message": f"☁️ Uploading to S3..."}
-
-                    s3_key = f"{S3_DOCUMENTS_PREFIX}{note.file_id}/{pdf_path.name}"
-                    s3_url = upload_to_s3(pdf_path, s3_key)
-
-                    if note.publication_date is None:
-                        publication_date = extract_publication_date_from_filename(pdf_path.name)
-                    else:
-                        publication_date = note.publication_date
-
-                    # Update database
-                    note.status = 1
-                    note.file_directory = s3_url
-                    note.file_download_time = now()
-                    note.publication_date = publication_date
-                    note.save(update_fields=[
-                        "status",
-                        "file_directory",
-                        "file_download_time",
-                        "publication_date"
-                    ])
-
-                    downloaded_count += 1
-                    yield {"status": "success", "message": f"✅ Successfully processed {note.file_id}"}
-
-                except Exception as exc:
-                    yield {"status": "error", "message": f"❌ Error: {str(exc)[:100]}"}
-                    logger.exception(f"Error processing {note.file_id}")
-                    failed_count += 1
-
-                finally:
-                    # Always clean up driver immediately
-                    if driver:
-                        try:
-                            driver.quit()
-                            yield {"status": "info", "message": f"🧹 Browser closed"}
-                        except:
-                            pass
-
-                    # Force garbage collection
-                    import gc
-                    gc.collect()
+        while queue:
+            note = queue.pop(0)
+            ok = False
+            try:
+                ok = yield from download_note(note)
+            finally:
+                release(note, ok)
+            if ok:
+                downloaded_count += 1
+            elif note.download_link:
+                failed_count += 1
 
         remaining = ResearchNote.objects.filter(status=0).count()
 
@@ -370,4 +387,7 @@ def download_documents():
 
     except Exception as e:
         yield {"status": "error", "message": f"🚨 Critical error: {str(e)[:200]}"}
-        logger.exception("Critical error in download_documents")
\ No newline at end of file
+        logger.exception("Critical error in download_documents")
+    finally:
+        for note in queue:                  # stopped early – hand the rest back
+            release(note)
\ No newline at end of file
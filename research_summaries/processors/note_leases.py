@@ -0,0 +1,183 @@
+# research_summaries/processors/note_leases.py
+"""
+Multi-worker-safe claiming of ResearchNote rows.
+
+Every processor used to read `ResearchNote.objects.filter(status=N)` and
+work through the whole result, so two dynos (or two pipeline workers) ran
+the same note twice – duplicate OpenAI calls, racing status writes. Now a
+worker first *leases* a small batch:
+
+    SELECT … FOR UPDATE SKIP LOCKED LIMIT n      (Postgres; plain SELECT on sqlite)
+    UPDATE … SET lease_owner, lease_expires_at   (only if still free – compare-and-set)
+
+* a note is free when it has no lease or its lease has expired, so notes of
+  a crashed worker are picked up again once LEASE_SECONDS pass;
+* a background heartbeat renews the leases of notes still being worked on
+  every LEASE_SECONDS / 3, so a slow download or summary keeps its note;
+* on success the lease is cleared; on failure the note keeps an ownerless
+  lease for RETRY_SECONDS, which every worker honours as its retry back-off.
+
+    for note, ok in drain(ResearchNote.objects.filter(status=1), clean_note):
+        ...
+"""
+import os
+import socket
+import threading
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from research_summaries.models import ResearchNote
+from research_summaries.processors.pipeline_events import notify
+
+# ── CONFIG ────────────────────────────────────────────────────────────
+WORKER_ID     = os.getenv("DYNO") or f"{socket.gethostname()}-{os.getpid()}"
+LEASE_SECONDS = float(os.getenv("PIPELINE_LEASE_SECONDS", str(10 * 60)))  # renewed while in flight
+RETRY_SECONDS = float(os.getenv("PIPELINE_RETRY_SECONDS", "300"))         # back-off for a failed note
+CLAIM_BATCH   = int(os.getenv("PIPELINE_CLAIM_BATCH", "4"))
+
+
+def _free(now) -> Q:
+    return Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now)
+
+
+# ── HEARTBEAT ─────────────────────────────────────────────────────────
+class _Heartbeat:
+    """Keeps the leases of in-flight notes alive from one daemon thread."""
+
+    def __init__(self):
+        self._held = {}              # pk -> owner
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def hold(self, pks: Iterable[int], owner: str) -> None:
+        with self._lock:
+            self._held.update((pk, owner) for pk in pks)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="note-lease-heartbeat", daemon=True)
+                self._thread.start()
+
+    def drop(self, pks: Iterable[int]) -> None:
+        with self._lock:
+            for pk in pks:
+                self._held.pop(pk, None)
+
+    def renew(self) -> int:
+        with self._lock:
+            by_owner = {}
+            for pk, owner in self._held.items():
+                by_owner.setdefault(owner, []).append(pk)
+        expires = timezone.now() + timedelta(seconds=LEASE_SECONDS)
+        return sum(
+            ResearchNote.objects.filter(pk__in=pks, lease_owner=owner).update(lease_expires_at=expires)
+            for owner, pks in by_owner.items()
+        )
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(LEASE_SECONDS / 3)
+            close_old_connections()
+            try:
+                self.renew()
+            except Exception as e:
+                print(f"❌ Lease heartbeat failed: {e}")
+
+
+HEARTBEAT = _Heartbeat()
+
+
+# ── CLAIM / RELEASE ───────────────────────────────────────────────────
+def claim(queryset: QuerySet, limit: int = CLAIM_BATCH, owner: str = WORKER_ID) -> List[ResearchNote]:
+    """
+    Lease up to *limit* free notes of *queryset* (unsliced, in its order).
+    Rows locked by another worker's claim are skipped, not waited for.
+    """
+    now = timezone.now()
+    expires = now + timedelta(seconds=LEASE_SECONDS)
+    # without row locks (sqlite) the transaction buys nothing and its
+    # read→write lock upgrade fails under concurrency; the CAS below suffices
+    locking = connections[queryset.db].features.has_select_for_update
+    with transaction.atomic(using=queryset.db) if locking else nullcontext():
+        candidates = list(
+            queryset.filter(_free(now))
+            .select_for_update(skip_locked=True)
+            .values_list("pk", "lease_owner")[:limit]
+        )
+        won, recovered = [], 0
+        for pk, previous_owner in candidates:
+            # compare-and-set: a worker on a backend without row locks may have won it meanwhile
+            if queryset.filter(_free(now), pk=pk).update(lease_owner=owner, lease_expires_at=expires):
+                won.append(pk)
+                recovered += previous_owner is not None
+    if not won:
+        return []
+
+    if recovered:
+        print(f"♻️ Recovered {recovered} note(s) from expired worker lease(s)")
+    HEARTBEAT.hold(won, owner)
+    notes = {n.pk: n for n in ResearchNote.objects.filter(pk__in=won, lease_owner=owner)}
+    return [notes[pk] for pk in won if pk in notes]
+
+
+def release(note: ResearchNote, ok: bool = True, owner: str = WORKER_ID) -> None:
+    """
+    Hand *note* back; a failed note stays blocked for RETRY_SECONDS. A note
+    released ok has usually moved on a status, so the next stage is woken.
+    """
+    HEARTBEAT.drop([note.pk])
+    ResearchNote.objects.filter(pk=note.pk, lease_owner=owner).update(
+        lease_owner=None,
+        lease_expires_at=None if ok else timezone.now() + timedelta(seconds=RETRY_SECONDS),
+    )
+    if ok:
+        notify()
+
+
+def clear_backoff(pk: int) -> int:
+    """
+    Lift a failed note's RETRY_SECONDS back-off (an ownerless lease) after a
+    user re-queued it; a live worker's lease is left alone.
+    """
+    return ResearchNote.objects.filter(
+        pk=pk, lease_owner__isnull=True, lease_expires_at__isnull=False
+    ).update(lease_expires_at=None)
+
+
+def drain(
+    queryset: QuerySet,
+    process: Callable[[ResearchNote], bool],
+    limit: Optional[int] = None,
+    owner: str = WORKER_ID,
+    batch: int = CLAIM_BATCH,
+) -> Iterator[Tuple[ResearchNote, bool]]:
+    """
+    Claim-process-release notes of *queryset* in *batch*-sized claims until it
+    is empty (or *limit* notes were processed), yielding (note, ok) for each.
+    Failed notes are backed off, so they are not retried within one drain.
+    Several threads may drain the same queryset; each note goes to one.
+    """
+    done = 0
+    held = []
+    try:
+        while limit is None or done < limit:
+            held = claim(queryset, batch if limit is None else min(batch, limit - done), owner)
+            if not held:
+                return
+            while held:
+                note = held[0]
+                ok = False
+                try:
+                    ok = bool(process(note))
+                finally:
+                    held.pop(0)
+                    release(note, ok, owner)
+                done += 1
+                yield note, ok
+    finally:
+        for note in held:                 # consumer stopped early: hand back untouched notes
+            release(note, True, owner)
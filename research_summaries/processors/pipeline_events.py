@@ -0,0 +1,197 @@
+# research_summaries/processors/pipeline_events.py
+"""
+Wake-up channel for the research pipeline.
+
+Anything that creates or moves a ResearchNote (email intake, a finished
+pipeline step via note_leases.release, the `set_advanced_summary` /
+`flag_report` views) calls `notify()`; idle pipeline workers block in
+`EVENTS.wait(seen, timeout)` and re-check their queues as soon as
+something happened anywhere, instead of sleeping for a fixed interval.
+
+Backends (PIPELINE_EVENTS, default: postgres on PostgreSQL, else file):
+
+    postgres  NOTIFY research_pipeline – sent inside the caller's transaction
+              (delivered on commit), received by one LISTEN connection per
+              process blocked in select(); zero queries while idle
+    file      appends a byte to PIPELINE_EVENTS_FILE; the listener stat()s it
+              twice a second – single host only (local dev / tests)
+    off       no channel; waits simply run to their timeout
+
+Notifications are hints, never the source of truth: a missed one costs one
+timeout, after which the worker finds the work by querying as before.
+"""
+import os
+import select
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.db import connections
+
+# ── CONFIG ────────────────────────────────────────────────────────────
+CHANNEL     = "research_pipeline"
+BACKEND     = os.getenv("PIPELINE_EVENTS", "")     # "" → postgres / file by DB vendor
+EVENTS_FILE = Path(os.getenv("PIPELINE_EVENTS_FILE", Path(tempfile.gettempdir()) / f"{CHANNEL}.events"))
+FILE_POLL_SECONDS = 0.5
+
+
+def _backend() -> str:
+    if BACKEND:
+        return BACKEND
+    return "postgres" if connections["default"].vendor == "postgresql" else "file"
+
+
+# ── BACKENDS ──────────────────────────────────────────────────────────
+class _PostgresChannel:
+    def send(self) -> None:
+        with connections["default"].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, '')", [CHANNEL])
+
+    def listen(self, on_event, stop: threading.Event) -> None:
+        db = connections["default"]
+        while not stop.is_set():
+            conn = None
+            try:
+                # a private connection: Django's per-thread one would be
+                # recycled by close_old_connections under our feet
+                conn = db.get_new_connection(db.get_connection_params())
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                on_event()                       # anything sent while we were reconnecting
+                while not stop.is_set():
+                    if select.select([conn], [], [], 5.0)[0]:
+                        conn.poll()
+                        if conn.notifies:
+                            conn.notifies.clear()
+                            on_event()
+            except Exception as e:
+                print(f"❌ Pipeline LISTEN failed, reconnecting: {e}")
+                stop.wait(5.0)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+class _FileChannel:
+    def __init__(self, path: Path = None):
+        self.path = Path(path or EVENTS_FILE)
+
+    def _mark(self):
+        try:
+            st = self.path.stat()
+            return st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+
+    def send(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("ab") as fh:
+            fh.write(b".")
+            if fh.tell() > 64 * 1024:
+                fh.truncate(0)
+
+    def listen(self, on_event, stop: threading.Event) -> None:
+        last = self._mark()
+        while not stop.wait(FILE_POLL_SECONDS):
+            mark = self._mark()
+            if mark != last:
+                last = mark
+                on_event()
+
+
+class _NoChannel:
+    def send(self) -> None:
+        pass
+
+    def listen(self, on_event, stop: threading.Event) -> None:
+        stop.wait()
+
+
+def make_channel(backend: str = None):
+    backend = backend or _backend()
+    if backend == "postgres":
+        return _PostgresChannel()
+    if backend == "file":
+        return _FileChannel()
+    if backend == "off":
+        return _NoChannel()
+    raise ValueError(f"Unknown PIPELINE_EVENTS backend {backend!r} (expected postgres, file or off)")
+
+
+# ── EVENTS ────────────────────────────────────────────────────────────
+class PipelineEvents:
+    """
+    Process-wide wake-up counter fed by the channel listener.
+
+        seen = EVENTS.generation
+        ... query, find nothing ...
+        EVENTS.wait(seen, timeout)   # returns at once if anything arrived since *seen*
+    """
+
+    def __init__(self, channel=None):
+        self._channel = channel
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def channel(self):
+        if self._channel is None:
+            self._channel = make_channel()
+        return self._channel
+
+    @property
+    def generation(self) -> int:
+        with self._cond:
+            return self._generation
+
+    def _wake(self) -> None:
+        with self._cond:
+            self._generation += 1
+            self._cond.notify_all()
+
+    def notify(self) -> None:
+        """Tell every pipeline process (this one included) there may be new work."""
+        self._wake()
+        try:
+            self.channel.send()
+        except Exception as e:
+            print(f"⚠️ Pipeline notify failed (workers will pick it up on their next poll): {e}")
+
+    def wait(self, seen: int, timeout: float) -> bool:
+        """Block until an event newer than *seen* arrives or *timeout* passes."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._generation == seen:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.channel.listen, args=(self._wake, self._stop),
+            name="pipeline-events", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop listening and release anyone blocked in wait()."""
+        self._stop.set()
+        self._wake()
+        if self._thread is not None:
+            self._thread.join(10)
+
+
+EVENTS = PipelineEvents()
+
+
+def notify() -> None:
+    EVENTS.notify()
@@ -0,0 +1,245 @@
+# research_summaries/processors/pipeline_runner.py
+"""
+Concurrent research pipeline (`manage.py run_pipeline`).
+
+Instead of one loop that runs every step in sequence and then sleeps, each
+status transition gets its own worker thread(s) polling its own queue:
+
+    download    0 → 1     file_downloader.download_note
+    clean       1 → 2     document_cleaner.clean_note
+    summarize   2 → 3     document_summarizer.summarize_note
+    advanced    3 → 4     advanced_document_summarizer.summarize_note_advanced
+    vectorize   3/4 → is_vectorized    document_vectorizer.vectorize_research_note
+                (a note flagged is_advanced_summary waits for status 4, as
+                 run_pipeline's sequential loop vectorizes after advanced)
+
+An idle stage blocks on pipeline_events (Postgres LISTEN/NOTIFY in
+production) and is woken as soon as a note is created, moves a status or is
+changed from the web UI; PIPELINE_POLL_SECONDS is only the fallback re-check
+(missed events, expired retry back-offs). Per‑note latency is therefore the
+sum of the work rather than of the sleeps. Periodic jobs (email intake, temp
+cleanup, vector file expiry) run on their own timers.
+
+Stages lease their notes through note_leases (SELECT … FOR UPDATE SKIP
+LOCKED plus a lease_owner / lease_expires_at compare-and-set), so any number
+of run_pipeline processes can share the queues without processing a note
+twice. A note whose processing fails keeps its status and a back-off lease,
+and is retried by whichever worker claims it after PIPELINE_RETRY_SECONDS.
+"""
+import os
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Callable
+
+from django.core.management import call_command
+from django.db import close_old_connections
+from django.db.models import QuerySet
+
+from research_summaries.models import ResearchNote
+from research_summaries.processors import note_leases
+from research_summaries.processors.pipeline_events import EVENTS
+
+# ── CONFIG ────────────────────────────────────────────────────────────
+POLL_SECONDS  = float(os.getenv("PIPELINE_POLL_SECONDS", "60"))    # idle stage re-checks without an event
+
+STAGE_WORKERS = {
+    "download":  int(os.getenv("PIPELINE_DOWNLOAD_WORKERS", "1")),   # one headless Chrome each
+    "clean":     int(os.getenv("PIPELINE_CLEAN_WORKERS", "2")),
+    "summarize": int(os.getenv("PIPELINE_SUMMARIZE_WORKERS", "4")),
+    "advanced":  int(os.getenv("PIPELINE_ADVANCED_WORKERS", "2")),
+    "vectorize": int(os.getenv("PIPELINE_VECTORIZE_WORKERS", "2")),
+}
+
+PERIODIC_SECONDS = {
+    "process_emails":      float(os.getenv("PIPELINE_EMAIL_SECONDS", str(2 * 60))),
+    "clean_temp_documents": 30 * 60,
+    "expire_vector_files":  4 * 60 * 60,
+}
+
+# Temporary Fix for AlphaSense Rate Limitations (mirrors file_downloader)
+EXCLUDED_DOWNLOAD_TYPES = ["Expert Call"]
+
+
+# ── QUEUES ────────────────────────────────────────────────────────────
+def _download_queue() -> QuerySet:
+    return ResearchNote.objects.filter(status=0).exclude(
+        report_type__in=EXCLUDED_DOWNLOAD_TYPES
+    ).order_by("id")
+
+
+def _clean_queue() -> QuerySet:
+    return ResearchNote.objects.filter(status=1).order_by("id")
+
+
+def _summarize_queue() -> QuerySet:
+    return ResearchNote.objects.filter(status=2).order_by("id")
+
+
+def _advanced_queue() -> QuerySet:
+    return ResearchNote.objects.filter(status=3, is_advanced_summary=True).order_by("id")
+
+
+def _vectorize_queue() -> QuerySet:
+    # advanced notes are vectorized once, with their advanced summary
+    return ResearchNote.objects.filter(
+        status__in=[3, 4],
+        is_vectorized=False,
+        is_active=True,
+        vector_group_id__isnull=False,
+    ).exclude(status=3, is_advanced_summary=True).order_by("-file_summary_time")
+
+
+# ── PROCESSORS (imported lazily: selenium / fitz / openai are heavy) ──
+def _download(note) -> bool:
+    from research_summaries.processors.file_downloader import download_note
+
+    updates = download_note(note)
+    while True:
+        try:
+            update = next(updates)
+        except StopIteration as done:
+            return bool(done.value)
+        if update["status"] in ("error", "success"):
+            print(f"[download] {update['message']}")
+
+
+def _clean(note) -> bool:
+    from research_summaries.processors.document_cleaner import clean_note
+    return clean_note(note)
+
+
+def _summarize(note) -> bool:
+    from research_summaries.openai_utils import get_openai_client
+    from research_summaries.processors.document_summarizer import summarize_note
+    return summarize_note(get_openai_client(), note)
+
+
+def _advanced(note) -> bool:
+    from research_summaries.openai_utils import get_openai_client
+    from research_summaries.processors.advanced_document_summarizer import summarize_note_advanced
+    return summarize_note_advanced(get_openai_client(), note)
+
+
+def _vectorize(note) -> bool:
+    from research_summaries.processors.document_vectorizer import vectorize_research_note
+    return vectorize_research_note(note)
+
+
+# ── STAGE ─────────────────────────────────────────────────────────────
+@dataclass
+class Stage:
+    name: str
+    queue: Callable[[], QuerySet]
+    process: Callable[[ResearchNote], bool]
+    workers: int
+
+    done: int = 0
+    failed: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def claim(self):
+        """
+        Next note leased to the calling worker, or None. One note per idle
+        worker: nothing sits leased-but-idle where other dynos can't reach
+        it, and every note is read fresh from the queue when work starts.
+        """
+        notes = note_leases.claim(self.queue(), 1)
+        return notes[0] if notes else None
+
+    def release(self, note, ok: bool) -> None:
+        note_leases.release(note, ok)
+        with self._lock:
+            if ok:
+                self.done += 1
+            else:
+                self.failed += 1
+
+    def pending(self) -> int:
+        return self.queue().count()
+
+
+def build_stages() -> list:
+    return [
+        Stage("download", _download_queue, _download, STAGE_WORKERS["download"]),
+        Stage("clean", _clean_queue, _clean, STAGE_WORKERS["clean"]),
+        Stage("summarize", _summarize_queue, _summarize, STAGE_WORKERS["summarize"]),
+        Stage("advanced", _advanced_queue, _advanced, STAGE_WORKERS["advanced"]),
+        Stage("vectorize", _vectorize_queue, _vectorize, STAGE_WORKERS["vectorize"]),
+    ]
+
+
+# ── RUNNER ────────────────────────────────────────────────────────────
+class PipelineRunner:
+    def __init__(self, stages=None, periodic=None):
+        self.stages = stages if stages is not None else build_stages()
+        self.periodic = periodic if periodic is not None else dict(PERIODIC_SECONDS)
+        self.stop = threading.Event()
+        self._threads = []
+
+    def _stage_worker(self, stage: Stage) -> None:
+        while not self.stop.is_set():
+            close_old_connections()
+            seen = EVENTS.generation
+            try:
+                note = stage.claim()
+            except Exception as e:
+                print(f"❌ [{stage.name}] queue error: {e}")
+                self.stop.wait(POLL_SECONDS)
+                continue
+
+            if note is None:
+                EVENTS.wait(seen, POLL_SECONDS)
+                continue
+
+            ok = False
+            started = time.monotonic()
+            try:
+                ok = bool(stage.process(note))
+            except Exception:
+                print(f"❌ [{stage.name}] {note.file_id} crashed:\n{traceback.format_exc()}")
+            finally:
+                try:
+                    stage.release(note, ok)
+                except Exception as e:          # lease then simply expires
+                    print(f"❌ [{stage.name}] releasing {note.file_id}: {e}")
+            print(f"{'✅' if ok else '⚠️ '} [{stage.name}] {note.file_id} "
+                  f"{'done' if ok else 'failed'} in {time.monotonic() - started:.1f}s")
+
+    def _periodic_worker(self, command: str, every: float) -> None:
+        while not self.stop.is_set():
+            close_old_connections()
+            try:
+                call_command(command)
+            except Exception as e:
+                print(f"❌ [{command}] {e}")
+            self.stop.wait(every)
+
+    def status_line(self) -> str:
+        return " | ".join(
+            f"{s.name}: {s.pending()} queued, {s.done} done, {s.failed} failed" for s in self.stages
+        )
+
+    def start(self) -> None:
+        EVENTS.start()
+        for stage in self.stages:
+            for i in range(max(0, stage.workers)):
+                self._threads.append(threading.Thread(
+                    target=self._stage_worker, args=(stage,), name=f"{stage.name}-{i}", daemon=True,
+                ))
+        for command, every in self.periodic.items():
+            self._threads.append(threading.Thread(
+                target=self._periodic_worker, args=(command, every), name=command, daemon=True,
+            ))
+        for t in self._threads:
+            t.start()
+        print("🚀 Pipeline stages: " + ", ".join(f"{s.name}×{s.workers}" for s in self.stages))
+
+    def shutdown(self, timeout: float = 25.0) -> None:
+        """Stop claiming new notes; give in-flight ones *timeout* seconds to finish."""
+        self.stop.set()
+        EVENTS.stop()                             # wakes idle workers so they see `stop`
+        deadline = time.monotonic() + timeout
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
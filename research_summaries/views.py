@@ -8,6 +8,7 @@ from django.views.decorators.http import require_POST, require_http_methods
 from django.views.generic import TemplateView
 from django.views.decorators.cache import cache_control
 import logging
+from django.db import transaction
 from django.db.models import Q
 from .email_parser import fetch_research_summaries
 from .file_downloader import download_documents
@@ -22,6 +23,8 @@ from django.utils.html import mark_safe
 from research_summaries.OpenAI_toolbox.prompts import AGGREGATE_SUMMARY_INSTRUCTION
 from research_summaries.openai_utils import get_openai_client
 from research_summaries.processors.file_downloader_2 import download_documents_playwright
+from research_summaries.processors.note_leases import clear_backoff
+from research_summaries.processors.pipeline_events import notify as notify_pipeline
 from agents.models import StockTicker
 
 
@@ -1016,15 +1019,18 @@ def flag_report(request, note_id):
         note.parsed_ticker = None
         note.file_summary_time = None
 
-        # Save the changes
-        note.save(update_fields=[
-            'report_type',
-            'status',
-            'file_update_time',
-            'report_summary',
-            'parsed_ticker',
-            'file_summary_time'
-        ])
+        # Save the changes (and lift any failure back-off so it is retried now)
+        with transaction.atomic():
+            note.save(update_fields=[
+                'report_type',
+                'status',
+                'file_update_time',
+                'report_summary',
+                'parsed_ticker',
+                'file_summary_time'
+            ])
+            clear_backoff(note.pk)
+        notify_pipeline()  # back in the summarize queue
 
         # Log the change
         logger.info(f"Report {note.file_id} flagged by user {request.user.username}: "
@@ -1293,7 +1299,12 @@ def set_advanced_summary(request, note_id):
 
         # Toggle the advanced summary flag
         note.is_advanced_summary = not note.is_advanced_summary
-        note.save(update_fields=['is_advanced_summary'])
+        with transaction.atomic():
+            note.save(update_fields=['is_advanced_summary'])
+            if note.is_advanced_summary:
+                clear_backoff(note.pk)
+        if note.is_advanced_summary:
+            notify_pipeline()  # advanced stage picks it up now
 
         return JsonResponse({
             'success': True,